@@ -1,86 +1,188 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script para analizar los cargos únicos de los dos carteles principales
-Cártel del Pacífico (Los Mayos) y Cártel del Pacífico (Los Chapitos)
+Script para clasificar los cargos / roles de los detenidos en una taxonomía
+(narcotráfico, homicidio, liderazgo, finanzas, logística, ...) y generar
+matrices grupo × categoría y estado × categoría para todos los grupos y estados
 """
 
 import pandas as pd
 from pathlib import Path
 
+from automata_palabras import AutomataPalabras
+from normalizacion_texto import normalizar_texto
+
+# Taxonomía de roles: categoría → palabras clave (minúsculas, sin acentos)
+# Las claves se buscan al inicio de palabra, por lo que sirven raíces ('financ', 'extorsi')
+TAXONOMIA_CARGOS = {
+    'liderazgo': [
+        'lider', 'jefe', 'jefa', 'cabecilla', 'fundador', 'segundo al mando', 'lugarteniente',
+        'mando', 'coordinador', 'coordinadora', 'coordinaba', 'dirigir', 'liderazgo', 'principal operador',
+        'encargado', 'encargada', 'primer nivel', 'alto nivel',
+    ],
+    'narcotrafico': [
+        'trafico de droga', 'trafico de drogas', 'trafico de narcotico', 'narcotrafico', 'narcotico',
+        'contra la salud', 'trasiego', 'venta de droga', 'distribucion de droga', 'distribucion de fentanilo',
+        'distribucion de cocaina', 'distribuidor de droga', 'distribuidora de droga', 'distributor de droga',
+        'fentanilo', 'metanfetamina', 'metafetamina', 'cocaina', 'marihuana', 'estupefaciente',
+        'drogas sinteticas', 'droga sintetica', 'laboratorio', 'precursores', 'elaboracion de',
+        'produccion de drogas', 'comercializacion de narcotico', 'comercializacion ilegal de drogas',
+        'sustancias ilicitas', 'narcoterror',
+    ],
+    'homicidio': [
+        'homicidio', 'ejecucion', 'ejecuciones', 'privar de la vida', 'asesinato', 'perdieron la vida', 'muerte',
+    ],
+    'secuestro_desaparicion': [
+        'secuestro', 'privacion ilegal de la libertad', 'privacion de la libertad', 'desaparicion',
+    ],
+    'extorsion': ['extorsi', 'cobro de piso'],
+    'finanzas': [
+        'financ', 'lavado de dinero', 'recursos de procedencia ilicita', 'operador financiero',
+        'operadora financiera', 'erario',
+    ],
+    'logistica': [
+        'logistic', 'rutas', 'vigilancia', 'halcon', 'transport', 'trasport', 'suministr',
+        'reclutamiento', 'adiestramiento',
+    ],
+    'armas': [
+        'armas', 'arma de fuego', 'arma larga', 'arma corta', 'armamento', 'ley federal de armas',
+        'trafico de armas',
+    ],
+    'robo_hidrocarburo': [
+        'hidrocarburo', 'huachicol', 'combustible', 'robo de gas', 'toma clandestina', 'tomas clandestinas',
+    ],
+    'violencia_agresiones': [
+        'generador de violencia', 'generadora de violencia', 'generadores de violencia',
+        'generadoras de violencia', 'generado de violencia', 'agresion', 'agresiones', 'ataque',
+        'ataques', 'atacar', 'hechos violentos', 'enfrentamiento',
+    ],
+    'trata_migrantes': [
+        'trafico de personas', 'trata de personas', 'migrantes', 'polleros',
+    ],
+    'seguridad_escolta': [
+        'seguridad del lider', 'jefe de seguridad', 'circulo de seguridad', 'escolta', 'persona de confianza',
+        'hombre de confianza',
+    ],
+    'corrupcion': [
+        'corrupcion', 'cohecho', 'alcalde', 'funcionario', 'servidor publico', 'servidores publicos',
+        'policias municipales como informantes', 'proteccion policial', 'policias coludidos',
+    ],
+    'pertenencia': [
+        'integrante', 'integrantes', 'perteneciente', 'pertenecientes', 'parte de', 'vinculad',
+        'relacionad', 'celula', 'grupo delictivo', 'grupo criminal', 'delincuencia organizada',
+        'asociacion delictuosa', 'operador', 'operadora', 'faccion', 'conspiracion',
+    ],
+}
+
+CATEGORIAS = list(TAXONOMIA_CARGOS)
+SIN_CLASIFICAR = 'sin_clasificar'
+
+CSV_ANALISIS = Path('data/analisis_detenidos.csv')
+CARGOS_CLASIFICADOS_FILE = Path('data/cargos_clasificados.csv')
+MATRIZ_GRUPO_FILE = Path('data/matriz_grupo_rol.csv')
+MATRIZ_ESTADO_FILE = Path('data/matriz_estado_rol.csv')
+
+# El autómata se construye una sola vez al importar el módulo
+AUTOMATA_CARGOS = AutomataPalabras(
+    (clave, categoria) for categoria, claves in TAXONOMIA_CARGOS.items() for clave in claves
+)
+
+
+def clasificar_cargo(texto):
+    """Devuelve la lista ordenada de categorías presentes en un texto de cargos"""
+    categorias = AUTOMATA_CARGOS.etiquetas(normalizar_texto(texto))
+    return [c for c in CATEGORIAS if c in categorias]
+
+
+def clasificar_cargos(cargos):
+    """
+    Clasifica una serie de textos de cargos; cada texto distinto se recorre una vez.
+    Devuelve un DataFrame booleano (fila × categoría) alineado con la serie.
+    """
+    cargos = cargos.fillna('')
+    unicos = pd.unique(cargos)
+    clasificacion = {texto: set(clasificar_cargo(texto)) for texto in unicos}
+    matriz_unicos = pd.DataFrame(
+        [[categoria in clasificacion[texto] for categoria in CATEGORIAS] for texto in unicos],
+        index=unicos, columns=CATEGORIAS,
+    )
+    matriz = matriz_unicos.loc[cargos.values].reset_index(drop=True)
+    matriz.index = cargos.index
+    # Con texto pero sin ninguna palabra clave
+    matriz[SIN_CLASIFICAR] = (cargos != '').values & ~matriz.any(axis=1).values
+    return matriz
+
+
+def matriz_por(df, columna, matriz_roles):
+    """Suma de detenidos por valor de la columna × categoría (filas con texto de cargos)"""
+    con_cargos = df['charges_or_supposed_role'].fillna('') != ''
+    claves = df[columna].fillna('Sin dato').where(df[columna].fillna('') != '', 'Sin dato')
+    resultado = matriz_roles[con_cargos].astype(int).groupby(claves[con_cargos]).sum()
+    resultado.insert(0, 'detenidos_con_cargos', con_cargos.groupby(claves).sum().reindex(resultado.index))
+    resultado.index.name = columna
+    return resultado.sort_values('detenidos_con_cargos', ascending=False)
+
+
 def analizar_cargos_carteles():
-    """Analiza los cargos únicos de los dos carteles principales"""
-    
+    """Clasifica los cargos de todos los detenidos y genera matrices grupo/estado × rol"""
+
     try:
-        print("🔄 Analizando cargos de carteles principales...")
-        
+        print("🔄 Clasificando cargos y roles de detenidos...")
+
         # Leer el CSV de análisis
-        csv_file = Path('data/analisis_detenidos.csv')
+        csv_file = CSV_ANALISIS
         df = pd.read_csv(csv_file, encoding='utf-8')
         print(f"✅ CSV leído: {len(df)} filas")
-        
-        # Filtrar solo registros con grupo criminal
-        df_con_grupo = df[df['criminal_group'] != '']
-        print(f"✅ Registros con grupo criminal: {len(df_con_grupo)}")
-        
-        # Definir los dos carteles principales
-        carteles_principales = [
-            'Cártel del Pacífico (Los Mayos)',
-            'Cártel del Pacífico (Los Chapitos)'
-        ]
-        
-        print(f"\n📊 ANÁLISIS DE CARGOS POR CARTEL:")
+
+        matriz_roles = clasificar_cargos(df['charges_or_supposed_role'])
+        con_cargos = df['charges_or_supposed_role'].fillna('') != ''
+        print(f"✅ Registros con cargos: {con_cargos.sum()}")
+        print(f"⚠️  Sin categoría reconocida: {matriz_roles[SIN_CLASIFICAR].sum()}")
+
+        # Clasificación por texto de cargo distinto (para revisar la taxonomía)
+        df_cargos = pd.DataFrame({
+            'charges_or_supposed_role': df['charges_or_supposed_role'],
+            'categorias': matriz_roles.apply(lambda fila: ', '.join(c for c in fila.index if fila[c]), axis=1),
+        })[con_cargos]
+        df_cargos = (
+            df_cargos.groupby(['charges_or_supposed_role', 'categorias']).size()
+            .reset_index(name='casos').sort_values('casos', ascending=False)
+        )
+        df_cargos.to_csv(CARGOS_CLASIFICADOS_FILE, index=False, encoding='utf-8')
+        print(f"💾 Cargos clasificados guardados en: {CARGOS_CLASIFICADOS_FILE}")
+
+        # Matrices grupo × rol y estado × rol
+        matriz_grupos = matriz_por(df, 'criminal_group', matriz_roles)
+        matriz_grupos.to_csv(MATRIZ_GRUPO_FILE, encoding='utf-8')
+        print(f"💾 Matriz grupo × rol guardada en: {MATRIZ_GRUPO_FILE} ({len(matriz_grupos)} grupos)")
+
+        matriz_estados = matriz_por(df, 'state_of_arrest', matriz_roles)
+        matriz_estados.to_csv(MATRIZ_ESTADO_FILE, encoding='utf-8')
+        print(f"💾 Matriz estado × rol guardada en: {MATRIZ_ESTADO_FILE} ({len(matriz_estados)} estados)")
+
+        # Resumen nacional por categoría
+        print(f"\n📊 DETENIDOS POR CATEGORÍA DE ROL:")
         print("=" * 60)
-        
-        for cartel in carteles_principales:
-            print(f"\n🔍 {cartel.upper()}")
-            print("-" * 50)
-            
-            # Filtrar registros del cartel específico
-            df_cartel = df_con_grupo[df_con_grupo['criminal_group'] == cartel]
-            
-            if len(df_cartel) == 0:
-                print(f"   ❌ No se encontraron registros para {cartel}")
-                continue
-            
-            print(f"   📈 Total de detenidos: {len(df_cartel)}")
-            
-            # Filtrar solo registros con cargos
-            df_cartel_con_cargos = df_cartel[df_cartel['charges_or_supposed_role'] != '']
-            print(f"   📋 Con cargos reportados: {len(df_cartel_con_cargos)} ({round((len(df_cartel_con_cargos)/len(df_cartel))*100, 1)}%)")
-            
-            if len(df_cartel_con_cargos) > 0:
-                # Obtener cargos únicos
-                cargos_unicos = df_cartel_con_cargos['charges_or_supposed_role'].value_counts()
-                
-                print(f"   🎯 Cargos únicos encontrados: {len(cargos_unicos)}")
-                print(f"\n   📝 LISTA DE CARGOS:")
-                
-                for i, (cargo, frecuencia) in enumerate(cargos_unicos.items(), 1):
-                    porcentaje = round((frecuencia / len(df_cartel_con_cargos)) * 100, 1)
-                    print(f"      {i:2d}. {cargo}")
-                    print(f"          └─ {frecuencia} casos ({porcentaje}% del cartel)")
-                    print()
-            else:
-                print(f"   ⚠️  No hay cargos reportados para {cartel}")
-        
-        # Análisis comparativo
-        print(f"\n📊 ANÁLISIS COMPARATIVO:")
+        totales = matriz_roles[con_cargos].sum().sort_values(ascending=False)
+        for categoria, casos in totales.items():
+            porcentaje = round((casos / con_cargos.sum()) * 100, 1)
+            print(f"   • {categoria}: {casos} ({porcentaje}%)")
+
+        # Perfil de los grupos con más detenidos
+        print(f"\n📊 PERFIL DE ROLES - TOP 5 GRUPOS:")
         print("=" * 60)
-        
-        for cartel in carteles_principales:
-            df_cartel = df_con_grupo[df_con_grupo['criminal_group'] == cartel]
-            df_cartel_con_cargos = df_cartel[df_cartel['charges_or_supposed_role'] != '']
-            
-            if len(df_cartel_con_cargos) > 0:
-                cargos_unicos = len(df_cartel_con_cargos['charges_or_supposed_role'].unique())
-                print(f"   • {cartel}: {cargos_unicos} tipos de cargos únicos")
-        
+        for grupo, fila in matriz_grupos.drop(index='Sin dato', errors='ignore').head(5).iterrows():
+            perfil = fila.drop('detenidos_con_cargos').sort_values(ascending=False)
+            perfil = ', '.join(f"{c} ({v})" for c, v in perfil.items() if v > 0)
+            print(f"\n🔍 {grupo.upper()} ({fila['detenidos_con_cargos']} con cargos)")
+            print(f"   {perfil}")
+
         return True
-        
+
     except Exception as e:
         print(f"❌ Error analizando cargos: {e}")
         return False
 
 if __name__ == "__main__":
-    analizar_cargos_carteles()
+    if not analizar_cargos_carteles():
+        exit(1)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para detectar anomalías en todas las series mensuales de incidencia (desde 2012)
+Todas las series entidad × LEY/CONCEPTO/TIPO se tratan como una sola matriz [serie, mes]:
+  - z estacional robusto: cada mes contra la mediana y el MAD del mismo mes calendario
+    en los VENTANA_ANIOS años previos
+  - cambios de nivel: diferencia de medias entre las ventanas antes/después de cada mes,
+    escalada por el ruido de la serie (MAD de las primeras diferencias)
+Publica una tabla de "movers" (meses recientes con |z| alto y volumen mínimo, para que
+los saltos de 1 a 2 casos no la llenen) y la lista de cambios de nivel.
+"""
+
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
+
+from cubo_ideff import cargar_cubo, etiquetas_series, meses_publicados, series_del_cubo
+
+MOVERS_FILE = Path('data/anomalias_movers.csv')
+CAMBIOS_FILE = Path('data/anomalias_cambios_nivel.csv')
+
+VENTANA_ANIOS = 5        # años previos con los que se compara cada mes calendario
+MINIMO_ANIOS = 3         # referencias válidas necesarias para calcular z
+ESCALA_MINIMA = 1.0      # las series son conteos: la escala nunca baja de un caso
+UMBRAL_Z = 3.5
+VOLUMEN_MINIMO = 20      # max(valor, mediana estacional) para entrar a la tabla de movers
+MESES_RECIENTES = 12     # meses publicados que se reportan en la tabla de movers
+
+VENTANA_CAMBIO = 6       # meses antes y después de un cambio de nivel
+UMBRAL_CAMBIO = 5.0
+
+# MAD → desviación estándar bajo normalidad
+FACTOR_MAD = 1.4826
+
+
+def mediana_validos(x):
+    """Mediana sobre el último eje ignorando NaN, sin advertencias; devuelve (mediana, n_validos)"""
+    n = (~np.isnan(x)).sum(axis=-1)
+    ordenados = np.sort(x, axis=-1)  # NaN al final
+    # Con n = 0 ambas posiciones caen en NaN y la mediana queda NaN
+    bajo = np.take_along_axis(ordenados, np.maximum((n - 1) // 2, 0)[..., None], axis=-1)[..., 0]
+    alto = np.take_along_axis(ordenados, (n // 2)[..., None], axis=-1)[..., 0]
+    return (bajo + alto) / 2, n
+
+
+def z_estacional(matriz, ventana=VENTANA_ANIOS, minimo=MINIMO_ANIOS):
+    """
+    matriz [serie, mes] (meses desde enero). Devuelve (z, mediana) [serie, mes]:
+    z = (x - mediana) / (FACTOR_MAD · MAD), con mediana y MAD del mismo mes calendario
+    en los `ventana` años anteriores; NaN si hay menos de `minimo` referencias.
+    """
+    n_series, n_meses = matriz.shape
+    anual = matriz.reshape(n_series, n_meses // 12, 12)
+    # previos[:, a] = año a - 1; la ventana a cubre los años a - ventana .. a - 1
+    previos = np.concatenate([np.full((n_series, ventana, 12), np.nan), anual[:, :-1]], axis=1)
+    referencias = sliding_window_view(previos, ventana, axis=1)  # [serie, año, mes, ventana]
+
+    mediana, n = mediana_validos(referencias)
+    mad, _ = mediana_validos(np.abs(referencias - mediana[..., None]))
+    escala = np.maximum(FACTOR_MAD * np.nan_to_num(mad), ESCALA_MINIMA)
+    mediana = np.where(n >= minimo, mediana, np.nan)
+    z = (anual - mediana) / escala
+    return z.reshape(n_series, n_meses), mediana.reshape(n_series, n_meses)
+
+
+def cambios_de_nivel(matriz, ventana=VENTANA_CAMBIO, umbral=UMBRAL_CAMBIO):
+    """
+    Estadístico de cambio de nivel en cada mes t (entre t - 1 y t):
+    (media[t, t + ventana) - media[t - ventana, t)) / (σ · √(2 / ventana)),
+    con σ robusto de las primeras diferencias. Se marcan los máximos locales de |estadístico|
+    (en ±ventana meses) que superan el umbral y tienen ambas ventanas completas.
+    Devuelve (cambio [serie, mes] bool, estadistico, media_antes, media_despues).
+    """
+    n_series, n_meses = matriz.shape
+    validos = ~np.isnan(matriz)
+    ceros = np.zeros((n_series, 1))
+    suma = np.concatenate([ceros, np.cumsum(np.where(validos, matriz, 0.0), axis=1)], axis=1)
+    conteo = np.concatenate([ceros, np.cumsum(validos, axis=1)], axis=1)
+
+    t = np.arange(ventana, n_meses - ventana + 1)
+    n_antes = conteo[:, t] - conteo[:, t - ventana]
+    n_despues = conteo[:, t + ventana] - conteo[:, t]
+    completas = (n_antes == ventana) & (n_despues == ventana)
+    media_antes = (suma[:, t] - suma[:, t - ventana]) / ventana
+    media_despues = (suma[:, t + ventana] - suma[:, t]) / ventana
+
+    diferencias = np.diff(matriz, axis=1)
+    centro, _ = mediana_validos(diferencias)
+    mad, _ = mediana_validos(np.abs(diferencias - centro[:, None]))
+    sigma = np.maximum(FACTOR_MAD * np.nan_to_num(mad) / np.sqrt(2), ESCALA_MINIMA)
+
+    estadistico = np.full((n_series, n_meses), np.nan)
+    estadistico[:, t] = np.where(completas, (media_despues - media_antes) / (sigma[:, None] * np.sqrt(2 / ventana)), np.nan)
+    magnitud = np.nan_to_num(np.abs(estadistico))
+    relleno = np.pad(magnitud, ((0, 0), (ventana, ventana)))
+    maximo_local = sliding_window_view(relleno, 2 * ventana + 1, axis=1).max(axis=2)
+    cambio = (magnitud >= umbral) & (magnitud == maximo_local)
+
+    antes = np.full((n_series, n_meses), np.nan)
+    despues = np.full((n_series, n_meses), np.nan)
+    antes[:, t], despues[:, t] = media_antes, media_despues
+    return cambio, estadistico, antes, despues
+
+
+def puntuar(matriz):
+    """Puntúa la matriz completa: (z, mediana, cambio, estadistico, antes, despues)"""
+    z, mediana = z_estacional(matriz)
+    return (z, mediana) + cambios_de_nivel(matriz)
+
+
+def tabla_movers(cubo, matriz, etiquetas, z, mediana, meses_recientes=MESES_RECIENTES,
+                 umbral=UMBRAL_Z, volumen=VOLUMEN_MINIMO):
+    """Meses recientes con |z| ≥ umbral y volumen suficiente, ordenados por mes y |z|"""
+    publicados = np.flatnonzero(meses_publicados(cubo))[-meses_recientes:]
+    recientes = np.zeros(matriz.shape[1], dtype=bool)
+    recientes[publicados] = True
+
+    candidato = (np.abs(np.nan_to_num(z)) >= umbral) & recientes[None, :] \
+        & (np.fmax(matriz, mediana) >= volumen)
+    series, meses = np.nonzero(candidato)
+    movers = etiquetas.iloc[series].reset_index(drop=True)
+    movers.insert(0, 'mes', np.array(cubo['meses'])[meses])
+    movers['valor'] = matriz[series, meses]
+    movers['mediana_estacional'] = mediana[series, meses]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacion = 100 * (matriz[series, meses] / mediana[series, meses] - 1)
+    movers['variacion_pct'] = np.where(np.isfinite(variacion), variacion, np.nan).round(1)
+    movers['z'] = z[series, meses].round(2)
+
+    movers = movers.assign(magnitud=movers['z'].abs()) \
+        .sort_values(['mes', 'magnitud'], ascending=[False, False]).drop(columns='magnitud')
+    movers.insert(1, 'rango', movers.groupby('mes').cumcount() + 1)
+    return movers.reset_index(drop=True)
+
+
+def tabla_cambios(cubo, etiquetas, cambio, estadistico, antes, despues, volumen=VOLUMEN_MINIMO):
+    """Cambios de nivel con volumen suficiente (media antes o después ≥ volumen)"""
+    series, meses = np.nonzero(cambio & (np.fmax(antes, despues) >= volumen))
+    cambios = etiquetas.iloc[series].reset_index(drop=True)
+    cambios.insert(0, 'mes', np.array(cubo['meses'])[meses])
+    cambios['media_antes'] = antes[series, meses].round(1)
+    cambios['media_despues'] = despues[series, meses].round(1)
+    cambios['estadistico'] = estadistico[series, meses].round(2)
+    return cambios.sort_values(['mes', 'estadistico'], ascending=[False, False]).reset_index(drop=True)
+
+
+def detectar_anomalias():
+    """Puntúa todas las series de IDEFF y publica movers y cambios de nivel"""
+
+    try:
+        print("🔄 Detectando anomalías en las series mensuales de incidencia...")
+
+        cubo = cargar_cubo()
+        matriz, claves, codigos_delito = series_del_cubo(cubo)
+        etiquetas = etiquetas_series(cubo, claves, codigos_delito)
+        print(f"✅ Matriz: {matriz.shape[0]} series × {matriz.shape[1]} meses "
+              f"({cubo['meses'][0]} - {cubo['meses'][-1]})")
+
+        inicio = time.perf_counter()
+        z, mediana, cambio, estadistico, antes, despues = puntuar(matriz)
+        print(f"⏱️  Matriz completa puntuada en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+        movers = tabla_movers(cubo, matriz, etiquetas, z, mediana)
+        movers.to_csv(MOVERS_FILE, index=False, encoding='utf-8')
+        print(f"💾 Movers guardados en: {MOVERS_FILE} ({len(movers)} filas)")
+
+        cambios = tabla_cambios(cubo, etiquetas, cambio, estadistico, antes, despues)
+        cambios.to_csv(CAMBIOS_FILE, index=False, encoding='utf-8')
+        print(f"💾 Cambios de nivel guardados en: {CAMBIOS_FILE} ({len(cambios)} filas)")
+
+        print(f"\n📊 MOVERS DEL ÚLTIMO MES:")
+        if len(movers):
+            ultimo = movers[movers['mes'] == movers['mes'].iloc[0]]
+            for _, fila in ultimo.head(10).iterrows():
+                print(f"   • {fila['mes']} {fila['ENTIDAD']} - {fila['TIPO']}: {fila['valor']:.0f} "
+                      f"(mediana {fila['mediana_estacional']:.0f}, z = {fila['z']:+.1f})")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error detectando anomalías: {e}")
+        return False
+
+
+def benchmark_anomalias(n_series=100_000, n_anios=14):
+    """Mide el puntaje completo sobre n_series series sintéticas de conteos"""
+    rng = np.random.default_rng(0)
+    niveles = rng.lognormal(2, 1.5, (n_series, 1))
+    matriz = rng.poisson(niveles, (n_series, n_anios * 12)).astype(float)
+    matriz[:, -5:] = np.nan
+    inicio = time.perf_counter()
+    puntuar(matriz)
+    duracion = time.perf_counter() - inicio
+    print(f"⏱️  Anomalías de {n_series:,} series × {n_anios * 12} meses: {duracion:.2f} s")
+    return duracion
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_anomalias()
+    else:
+        if not detectar_anomalias():
+            sys.exit(1)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para medir la autocorrelación espacial de la incidencia entre estados vecinos
+  - Adyacencia tipo reina (estados que comparten al menos un vértice de su frontera),
+    derivada una sola vez de estados_compressed.json con prefiltro por bbox y guardada
+    como matriz dispersa CSR en data/geojson/adyacencia_estados.npz
+  - I de Moran global y LISA (Moran local) para todos los cortes × periodos de incidencia
+    observada en data/mapas/ (las salidas de construir_geometrias; se excluyen pronósticos
+    y clases) en un solo producto matricial por lote
+  - Pseudo p-valores por permutaciones (condicionales para LISA), repartidos entre procesos,
+    con corrección de Benjamini–Hochberg (FDR): Moran global sobre todos los mapas y LISA
+    dentro de cada mapa (32 estados); entre mapas LISA no se corrige
+Salidas: data/moran_global.csv y data/lisa_significativos.csv
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from construir_geometrias import SALIDAS_ESTATALES
+from entidades import ENTIDADES
+
+GEOJSON_FILE = Path('data/geojson/estados_compressed.json')
+ADYACENCIA_FILE = Path('data/geojson/adyacencia_estados.npz')
+MAPAS_DIR = Path('data/mapas')
+MORAN_FILE = Path('data/moran_global.csv')
+LISA_FILE = Path('data/lisa_significativos.csv')
+
+# Las geometrías están simplificadas: dos fronteras se tocan si tienen vértices a menos de ~500 m
+TOLERANCIA_GRADOS = 0.005
+PERMUTACIONES = 999
+ALFA = 0.05
+SEMILLA = 0
+
+CLAVES = np.array(sorted(ENTIDADES))  # 1..32; posición = clave - 1
+
+
+# ---- Adyacencia ----
+
+def vertices_por_estado(geojson):
+    """{clave: arreglo [m, 2] de vértices}"""
+    vertices = {}
+    for feature in geojson['features']:
+        geometria = feature['geometry']
+        poligonos = geometria['coordinates'] if geometria['type'] == 'MultiPolygon' else [geometria['coordinates']]
+        vertices[feature['properties']['clave_entidad']] = np.array(
+            [punto for poligono in poligonos for anillo in poligono for punto in anillo])
+    return vertices
+
+
+def celdas(vertices, tolerancia, vecindad=False):
+    """Celdas de una rejilla de lado `tolerancia` que ocupan los vértices (con sus 8 vecinas si vecindad)"""
+    base = np.unique(np.floor(vertices / tolerancia).astype(np.int64), axis=0)
+    if vecindad:
+        desplazamientos = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+        base = np.unique((base[:, None, :] + desplazamientos[None, :, :]).reshape(-1, 2), axis=0)
+    return set(map(tuple, base))
+
+
+def construir_adyacencia(geojson, tolerancia=TOLERANCIA_GRADOS):
+    """
+    Matriz de adyacencia reina en formato CSR (indptr, indices) sobre CLAVES.
+    Solo se comparan vértices de los pares cuyos bbox (ampliados por la tolerancia) se intersectan.
+    """
+    vertices = vertices_por_estado(geojson)
+    n = len(CLAVES)
+    cajas = np.array([[*vertices[c].min(axis=0), *vertices[c].max(axis=0)] for c in CLAVES])
+    cajas[:, :2] -= tolerancia
+    cajas[:, 2:] += tolerancia
+    se_tocan = (
+        (cajas[:, None, 0] <= cajas[None, :, 2]) & (cajas[None, :, 0] <= cajas[:, None, 2])
+        & (cajas[:, None, 1] <= cajas[None, :, 3]) & (cajas[None, :, 1] <= cajas[:, None, 3])
+    )
+    candidatos = np.argwhere(np.triu(se_tocan, k=1))
+
+    celdas_estado = {}
+    vecinos = [[] for _ in range(n)]
+    for a, b in candidatos:
+        if a not in celdas_estado:
+            celdas_estado[a] = (celdas(vertices[CLAVES[a]], tolerancia, vecindad=True),
+                                celdas(vertices[CLAVES[a]], tolerancia))
+        if b not in celdas_estado:
+            celdas_estado[b] = (celdas(vertices[CLAVES[b]], tolerancia, vecindad=True),
+                                celdas(vertices[CLAVES[b]], tolerancia))
+        if celdas_estado[a][0] & celdas_estado[b][1]:
+            vecinos[a].append(b)
+            vecinos[b].append(a)
+
+    indptr = np.concatenate([[0], np.cumsum([len(v) for v in vecinos])]).astype(np.int32)
+    indices = np.concatenate([sorted(v) for v in vecinos]).astype(np.int32)
+    return indptr, indices, len(candidatos)
+
+
+def cargar_adyacencia():
+    """
+    CSR de adyacencia desde el caché, o construida desde el GeoJSON si no existe o es más viejo.
+    Devuelve (indptr, indices, candidatos); candidatos es None si se leyó del caché.
+    """
+    if ADYACENCIA_FILE.exists() and ADYACENCIA_FILE.stat().st_mtime >= GEOJSON_FILE.stat().st_mtime:
+        with np.load(ADYACENCIA_FILE) as datos:
+            return datos['indptr'], datos['indices'], None
+    with open(GEOJSON_FILE, encoding='utf-8') as f:
+        indptr, indices, candidatos = construir_adyacencia(json.load(f))
+    np.savez(ADYACENCIA_FILE, indptr=indptr, indices=indices, claves=CLAVES)
+    return indptr, indices, candidatos
+
+
+def pesos_por_fila(indptr, indices):
+    """Matriz densa W estandarizada por fila (n = 32, cabe de sobra en memoria)"""
+    n = len(indptr) - 1
+    w = np.zeros((n, n))
+    filas = np.repeat(np.arange(n), np.diff(indptr))
+    w[filas, indices] = 1.0
+    grado = w.sum(axis=1, keepdims=True)
+    return np.divide(w, grado, out=np.zeros_like(w), where=grado > 0)
+
+
+# ---- Moran global y local ----
+
+def estandarizar(valores):
+    """Desviaciones respecto a la media por fila y segundo momento m2"""
+    z = valores - valores.mean(axis=1, keepdims=True)
+    m2 = (z * z).mean(axis=1, keepdims=True)
+    return z, m2
+
+
+def moran_lote(valores, w):
+    """
+    I de Moran global y LISA para un lote [cortes, n] con un solo producto matricial.
+    Con W estandarizada por fila S0 = n, así que I = Σ z_i (Wz)_i / Σ z_i².
+    """
+    z, m2 = estandarizar(valores)
+    rezago = z @ w.T
+    global_i = (z * rezago).sum(axis=1) / (z * z).sum(axis=1)
+    local_i = z * rezago / m2
+    return global_i, local_i, z, rezago
+
+
+def _muestras_condicionales(n, k_max, permutaciones, semilla):
+    """
+    Para cada permutación y cada estado i, k_max índices de otros estados sin reemplazo
+    (i nunca se elige): [permutaciones, n, k_max]. Se comparten entre todos los cortes.
+    """
+    rng = np.random.default_rng(semilla)
+    llaves = rng.random((permutaciones, n, n))
+    llaves[:, np.arange(n), np.arange(n)] = np.inf
+    return np.argsort(llaves, axis=2)[:, :, :k_max]
+
+
+def _permutaciones_bloque(args):
+    """Pseudo p-valores de un bloque de cortes (se ejecuta en un proceso aparte)"""
+    valores, w, indptr, indices, permutaciones, semilla = args
+    n = valores.shape[1]
+    global_i, local_i, z, _ = moran_lote(valores, w)
+    _, m2 = estandarizar(valores)
+    rng = np.random.default_rng(semilla)
+    # Margen relativo para que los empates no dependan del redondeo del producto matricial
+    umbral_global = np.abs(global_i) * (1 - 1e-9)
+    umbral_local = np.abs(local_i) * (1 - 1e-9)
+
+    # Global: permutaciones completas; la misma secuencia para todos los cortes, así el
+    # resultado no depende de cómo se repartan los cortes entre procesos
+    extremos_global = np.zeros(len(valores), dtype=np.int64)
+    for _ in range(permutaciones):
+        zp = z[:, rng.permutation(n)]
+        ip = (zp * (zp @ w.T)).sum(axis=1) / (zp * zp).sum(axis=1)
+        extremos_global += np.abs(ip) >= umbral_global
+
+    # Local: z_i fijo y sus vecinos tomados al azar de los demás estados
+    grado = np.diff(indptr)
+    k_max = int(grado.max())
+    muestras = _muestras_condicionales(n, k_max, permutaciones, semilla + 1)  # compartidas por todos los cortes
+    tomar = (np.arange(k_max)[None, :] < grado[:, None]) / np.maximum(grado, 1)[:, None]  # [n, k_max]
+    extremos_local = np.zeros_like(local_i, dtype=np.int64)
+    for p in range(permutaciones):
+        rezago_p = (z[:, muestras[p]] * tomar[None, :, :]).sum(axis=2)  # [cortes, n]
+        ip = z * rezago_p / m2
+        extremos_local += np.abs(ip) >= umbral_local
+
+    return (extremos_global + 1) / (permutaciones + 1), (extremos_local + 1) / (permutaciones + 1)
+
+
+def permutaciones_en_paralelo(valores, w, indptr, indices, permutaciones=PERMUTACIONES, procesos=None):
+    """Reparte los cortes en bloques, uno por proceso; devuelve (p_global, p_local)"""
+    procesos = procesos or os.cpu_count() or 1
+    bloques = np.array_split(np.arange(len(valores)), procesos)
+    tareas = [(valores[b], w, indptr, indices, permutaciones, SEMILLA) for b in bloques if len(b)]
+    if len(tareas) == 1:
+        resultados = [_permutaciones_bloque(tareas[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=len(tareas)) as ejecutor:
+            resultados = list(ejecutor.map(_permutaciones_bloque, tareas))
+    return (np.concatenate([r[0] for r in resultados]),
+            np.concatenate([r[1] for r in resultados], axis=0))
+
+
+def fdr_benjamini_hochberg(p_valores):
+    """
+    p-valores ajustados por Benjamini–Hochberg a lo largo del último eje: cada fila es una
+    familia de pruebas (los 32 estados de un mapa para LISA; todos los mapas para Moran global)
+    """
+    p_valores = np.asarray(p_valores, dtype=float)
+    m = p_valores.shape[-1]
+    orden = np.argsort(p_valores, axis=-1, kind='stable')
+    escalados = np.take_along_axis(p_valores, orden, axis=-1) * m / np.arange(1, m + 1)
+    escalados = np.minimum.accumulate(escalados[..., ::-1], axis=-1)[..., ::-1]
+    ajustados = np.empty_like(p_valores)
+    np.put_along_axis(ajustados, orden, np.minimum(escalados, 1.0), axis=-1)
+    return ajustados
+
+
+def cuadrante(z, rezago):
+    """HH / LL / HL / LH según el signo del valor y de su rezago espacial"""
+    return np.where(z > 0, np.where(rezago > 0, 'HH', 'HL'), np.where(rezago > 0, 'LH', 'LL'))
+
+
+# ---- Cortes de data/mapas/ ----
+
+def cortes_de_mapas():
+    """
+    Matriz [cortes, 32] de todos los cortes × periodos completos y su descripción.
+    Solo lee los arreglos de incidencia observada (SALIDAS_ESTATALES de construir_geometrias);
+    pronosticos_incidencia.json y los clases_*.json no son observaciones y quedan fuera.
+    """
+    bloques, descripcion = [], []
+    for nombre in sorted(SALIDAS_ESTATALES):
+        archivo = MAPAS_DIR / nombre.replace('.csv', '.json')
+        if not archivo.exists():
+            print(f"⚠️  No existe {archivo}, se omite")
+            continue
+        with open(archivo, encoding='utf-8') as f:
+            datos = json.load(f)
+        valores = np.array(datos['valores'], dtype=float)[:, :, CLAVES]  # [corte, periodo, 32]
+        planos = valores.reshape(-1, len(CLAVES))
+        # Solo cortes con las 32 entidades y alguna variación
+        completos = ~np.isnan(planos).any(axis=1)
+        completos[completos] = planos[completos].std(axis=1) > 0
+        etiquetas = [(datos['fuente'], c, p) for c in datos['cortes'] for p in datos['periodos']]
+        bloques.append(planos[completos])
+        descripcion.extend(e for e, ok in zip(etiquetas, completos) if ok)
+    return np.vstack(bloques), pd.DataFrame(descripcion, columns=['fuente', 'corte', 'periodo'])
+
+
+def calcular_autocorrelacion_espacial(permutaciones=PERMUTACIONES):
+    """Adyacencia, Moran global y LISA para todos los cortes de incidencia observada de data/mapas/"""
+
+    try:
+        print("🔄 Calculando autocorrelación espacial entre estados...")
+
+        indptr, indices, candidatos = cargar_adyacencia()
+        if candidatos is None:
+            print(f"✅ Adyacencia reina: {len(indices) // 2} pares de vecinos (caché {ADYACENCIA_FILE})")
+        else:
+            print(f"💾 Adyacencia reina: {len(indices) // 2} pares de vecinos "
+                  f"({candidatos} candidatos tras el prefiltro bbox) en {ADYACENCIA_FILE}")
+        w = pesos_por_fila(indptr, indices)
+
+        valores, descripcion = cortes_de_mapas()
+        print(f"✅ Cortes × periodos completos: {len(valores)}")
+
+        inicio = time.perf_counter()
+        global_i, local_i, z, rezago = moran_lote(valores, w)
+        p_global, p_local = permutaciones_en_paralelo(valores, w, indptr, indices, permutaciones)
+        print(f"✅ Moran y LISA con {permutaciones} permutaciones: {time.perf_counter() - inicio:.1f} s")
+
+        # La significancia se decide con p ajustado por FDR (LISA: una familia por mapa)
+        p_global_ajustado = fdr_benjamini_hochberg(p_global)
+        p_local_ajustado = fdr_benjamini_hochberg(p_local)
+
+        moran = descripcion.assign(
+            moran_i=global_i.round(4),
+            esperanza=round(-1 / (len(CLAVES) - 1), 4),
+            p_valor=p_global.round(4),
+            p_ajustado=p_global_ajustado.round(4),
+        )
+        moran.to_csv(MORAN_FILE, index=False, encoding='utf-8')
+        print(f"💾 Moran global guardado en: {MORAN_FILE}")
+
+        fila, estado = np.nonzero(p_local_ajustado <= ALFA)
+        lisa = descripcion.iloc[fila].reset_index(drop=True).assign(
+            clave_entidad=CLAVES[estado],
+            entidad=[ENTIDADES[c] for c in CLAVES[estado]],
+            lisa_i=local_i[fila, estado].round(4),
+            p_valor=p_local[fila, estado].round(4),
+            p_ajustado=p_local_ajustado[fila, estado].round(4),
+            cuadrante=cuadrante(z[fila, estado], rezago[fila, estado]),
+        )
+        lisa.to_csv(LISA_FILE, index=False, encoding='utf-8')
+        print(f"💾 LISA significativos (p ajustado por FDR dentro de cada mapa ≤ {ALFA}) "
+              f"guardados en: {LISA_FILE} ({len(lisa)} filas)")
+        print(f"⚠️  Sin corrección entre los {len(valores)} mapas: sin autocorrelación real, hasta "
+              f"~{len(valores) * ALFA:.0f} mapas podrían mostrar algún LISA significativo por azar")
+
+        significativos = moran[moran['p_ajustado'] <= ALFA]
+        print(f"\n📊 RESUMEN:")
+        print(f"   • Cortes con autocorrelación global significativa (FDR): {len(significativos)} de {len(moran)}")
+        focos = lisa[lisa['cuadrante'] == 'HH'].groupby('entidad').size().sort_values(ascending=False)
+        for entidad, casos in focos.head(5).items():
+            print(f"   • Foco alto-alto: {entidad} en {casos} cortes")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error calculando autocorrelación espacial: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    permutaciones = PERMUTACIONES
+    if '--permutaciones' in sys.argv:
+        permutaciones = int(sys.argv[sys.argv.index('--permutaciones') + 1])
+    if not calcular_autocorrelacion_espacial(permutaciones):
+        sys.exit(1)
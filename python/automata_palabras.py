@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Autómata Aho-Corasick para buscar muchas palabras clave en una sola pasada
+El tiempo de búsqueda es lineal en la longitud del texto, sin importar cuántas claves haya
+"""
+
+from collections import deque
+
+
+class AutomataPalabras:
+    """Autómata de búsqueda multipatrón (Aho-Corasick) sobre texto ya normalizado"""
+
+    def __init__(self, claves):
+        """
+        claves: iterable de (palabra_clave, etiqueta). La misma etiqueta puede
+        tener varias claves; una clave puede repetirse con etiquetas distintas.
+        """
+        self.transiciones = [{}]
+        self.fallo = [0]
+        self.salidas = [[]]
+
+        for clave, etiqueta in claves:
+            estado = 0
+            for caracter in clave:
+                siguiente = self.transiciones[estado].get(caracter)
+                if siguiente is None:
+                    siguiente = len(self.transiciones)
+                    self.transiciones[estado][caracter] = siguiente
+                    self.transiciones.append({})
+                    self.fallo.append(0)
+                    self.salidas.append([])
+                estado = siguiente
+            self.salidas[estado].append((clave, etiqueta))
+
+        # Enlaces de fallo por recorrido en anchura
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for caracter, siguiente in self.transiciones[estado].items():
+                cola.append(siguiente)
+                respaldo = self.fallo[estado]
+                while respaldo and caracter not in self.transiciones[respaldo]:
+                    respaldo = self.fallo[respaldo]
+                destino = self.transiciones[respaldo].get(caracter, 0)
+                self.fallo[siguiente] = destino if destino != siguiente else 0
+                self.salidas[siguiente] = self.salidas[siguiente] + self.salidas[self.fallo[siguiente]]
+
+    def buscar(self, texto, inicio_palabra=True):
+        """
+        Genera (posicion_inicio, clave, etiqueta) para cada coincidencia.
+        Con inicio_palabra=True solo se aceptan coincidencias que empiezan
+        al inicio de una palabra ('arma' no coincide dentro de 'desarmado').
+        """
+        estado = 0
+        for posicion, caracter in enumerate(texto):
+            while estado and caracter not in self.transiciones[estado]:
+                estado = self.fallo[estado]
+            estado = self.transiciones[estado].get(caracter, 0)
+            for clave, etiqueta in self.salidas[estado]:
+                inicio = posicion - len(clave) + 1
+                if inicio_palabra and inicio > 0 and texto[inicio - 1].isalnum():
+                    continue
+                yield inicio, clave, etiqueta
+
+    def etiquetas(self, texto, inicio_palabra=True):
+        """Conjunto de etiquetas encontradas en el texto"""
+        return {etiqueta for _, _, etiqueta in self.buscar(texto, inicio_palabra)}
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de agregaciones (sumas agrupadas) sobre las bases de incidencia
+Las mismas sumas se repiten entre scripts: (ENTIDAD, CONCEPTO, AÑO) en los dos análisis por
+entidad y concepto, (CONCEPTO, AÑO) en los dos análisis nacionales, y el servidor las vuelve a pedir.
+Cada resultado se guarda con la firma de la consulta:
+  (hash del contenido de la fuente, dimensiones, filtros, meses)
+  - en memoria, un LRU con presupuesto de bytes
+  - lo que sale del LRU (y todo al terminar el proceso) se escribe en data/cache_agregaciones/
+    como JSON, así el pipeline, el servidor y la CLI reutilizan los resultados del otro
+Si la fuente cambia, su hash cambia y las entradas viejas simplemente dejan de usarse.
+pandas se importa solo al calcular una agregación: leer una entrada del disco no lo necesita.
+"""
+
+import sys
+import json
+import atexit
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR = Path('data/cache_agregaciones')
+
+PRESUPUESTO_MEMORIA = 64 * 1024 ** 2
+PRESUPUESTO_DISCO = 512 * 1024 ** 2
+
+OPERADORES = {
+    '==': lambda columna, valor: columna == valor,
+    '!=': lambda columna, valor: columna != valor,
+    '>=': lambda columna, valor: columna >= valor,
+    '<=': lambda columna, valor: columna <= valor,
+    'in': lambda columna, valor: columna.isin(valor),
+}
+
+_FIRMAS = {}  # (archivo, tamaño, mtime) → hash del contenido
+
+
+def firma_fuente(archivo):
+    """Hash del contenido del archivo; se recalcula solo si cambia su tamaño o fecha de modificación"""
+    archivo = Path(archivo)
+    estado = archivo.stat()
+    llave = (str(archivo.resolve()), estado.st_size, estado.st_mtime_ns)
+    if llave not in _FIRMAS:
+        _FIRMAS[llave] = hashlib.blake2b(archivo.read_bytes(), digest_size=16).hexdigest()
+    return _FIRMAS[llave]
+
+
+def normalizar_filtros(filtros):
+    """Filtros (columna, operador, valor) en orden canónico, con listas como tuplas"""
+    normalizados = []
+    for columna, operador, valor in filtros or ():
+        if operador not in OPERADORES:
+            raise ValueError(f'operador no soportado: {operador}')
+        if operador == 'in':
+            valor = tuple(sorted(valor))
+        normalizados.append((columna, operador, valor))
+    return tuple(sorted(normalizados, key=repr))
+
+
+def clave_consulta(archivo, dimensiones, meses, filtros=None):
+    """(hash de la fuente, dimensiones, filtros, meses)"""
+    return (firma_fuente(archivo), tuple(dimensiones), normalizar_filtros(filtros), tuple(meses))
+
+
+def leer_fuente(archivo):
+    """CSV de incidencia en UTF-8 o latin-1, con la primera columna como 'AÑO'"""
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(archivo, encoding='utf-8')
+    except UnicodeDecodeError:
+        df = pd.read_csv(archivo, encoding='latin-1')
+    return df.rename(columns={df.columns[0]: 'AÑO'})
+
+
+class CacheAgregaciones:
+    """LRU de DataFrames en memoria con presupuesto de bytes y respaldo en disco para lo que se desaloja"""
+
+    def __init__(self, directorio=CACHE_DIR, presupuesto=PRESUPUESTO_MEMORIA, presupuesto_disco=PRESUPUESTO_DISCO):
+        self.directorio = Path(directorio)
+        self.presupuesto = presupuesto
+        self.presupuesto_disco = presupuesto_disco
+        self.entradas = OrderedDict()  # clave → (valor, bytes), de la menos a la más reciente
+        self.bytes_memoria = 0
+        self.estadisticas = {'aciertos_memoria': 0, 'aciertos_disco': 0, 'fallos': 0, 'desalojos': 0}
+
+    def _archivo(self, clave):
+        return self.directorio / f"{hashlib.sha256(repr(clave).encode('utf-8')).hexdigest()[:32]}.json"
+
+    def leer_de_disco(self, clave):
+        """{'columnas', 'filas'} guardado en disco para la clave, o None (no usa pandas)"""
+        archivo = self._archivo(clave)
+        try:
+            with open(archivo, encoding='utf-8') as f:
+                guardado = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if guardado.get('clave') != repr(clave):
+            return None
+        archivo.touch()  # recortar_disco borra primero lo usado hace más tiempo
+        return guardado
+
+    def obtener(self, clave):
+        """DataFrame guardado o None; un acierto en disco vuelve a subir a memoria"""
+        if clave in self.entradas:
+            self.entradas.move_to_end(clave)
+            self.estadisticas['aciertos_memoria'] += 1
+            return self.entradas[clave][0]
+        guardado = self.leer_de_disco(clave)
+        if guardado is not None:
+            import pandas as pd
+
+            valor = pd.DataFrame(guardado['filas'], columns=guardado['columnas'])
+            self.estadisticas['aciertos_disco'] += 1
+            self._en_memoria(clave, valor)
+            return valor
+        self.estadisticas['fallos'] += 1
+        return None
+
+    def guardar(self, clave, valor):
+        self._en_memoria(clave, valor)
+
+    def _en_memoria(self, clave, valor):
+        if clave in self.entradas:
+            self.bytes_memoria -= self.entradas.pop(clave)[1]
+        tamano = int(valor.memory_usage(index=True, deep=True).sum())
+        self.entradas[clave] = (valor, tamano)
+        self.bytes_memoria += tamano
+        # Desalojar las menos recientes (nunca la que se acaba de guardar)
+        while self.bytes_memoria > self.presupuesto and len(self.entradas) > 1:
+            vieja, (valor_viejo, tamano_viejo) = self.entradas.popitem(last=False)
+            self.bytes_memoria -= tamano_viejo
+            self.estadisticas['desalojos'] += 1
+            self._a_disco(vieja, valor_viejo)
+
+    def _a_disco(self, clave, valor):
+        archivo = self._archivo(clave)
+        if archivo.exists():
+            return
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        separado = valor.to_dict(orient='split', index=False)
+        temporal = archivo.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'clave': repr(clave), 'columnas': separado['columns'], 'filas': separado['data']},
+                      f, ensure_ascii=False)
+        temporal.replace(archivo)
+
+    def volcar(self):
+        """Escribe en disco todo lo que está en memoria y recorta el disco a su presupuesto"""
+        for clave, (valor, _) in self.entradas.items():
+            self._a_disco(clave, valor)
+        self.recortar_disco()
+
+    def recortar_disco(self):
+        """Borra los archivos usados hace más tiempo hasta quedar dentro de presupuesto_disco"""
+        if not self.directorio.exists():
+            return
+        archivos = sorted(self.directorio.glob('*.json'), key=lambda a: a.stat().st_mtime)
+        total = sum(a.stat().st_size for a in archivos)
+        for archivo in archivos:
+            if total <= self.presupuesto_disco:
+                break
+            total -= archivo.stat().st_size
+            archivo.unlink()
+
+    def resumen(self):
+        """Aciertos, fallos y tasa de aciertos, más el uso de memoria"""
+        aciertos = self.estadisticas['aciertos_memoria'] + self.estadisticas['aciertos_disco']
+        consultas = aciertos + self.estadisticas['fallos']
+        return dict(
+            self.estadisticas,
+            consultas=consultas,
+            tasa_aciertos=round(aciertos / consultas, 4) if consultas else None,
+            entradas_memoria=len(self.entradas),
+            bytes_memoria=self.bytes_memoria,
+            presupuesto=self.presupuesto,
+        )
+
+
+# Instancia compartida por los scripts del proceso; lo que tiene en memoria se escribe a disco al salir
+CACHE = CacheAgregaciones()
+atexit.register(CACHE.volcar)
+
+
+def suma_agrupada(archivo, dimensiones, meses, filtros=None, df=None, cache=CACHE):
+    """
+    Equivale a df[filtros].groupby(dimensiones)[meses].sum().reset_index() sobre `archivo`,
+    consultando primero la caché. `df` (el archivo ya leído) evita volver a leerlo en un fallo.
+    """
+    clave = clave_consulta(archivo, dimensiones, meses, filtros)
+    resultado = cache.obtener(clave)
+    if resultado is None:
+        if df is None:
+            df = leer_fuente(archivo)
+        for columna, operador, valor in clave[2]:
+            df = df[OPERADORES[operador](df[columna], valor)]
+        resultado = df.groupby(list(dimensiones))[list(meses)].sum().reset_index()
+        cache.guardar(clave, resultado)
+    # Copia: los scripts agregan columnas al resultado
+    return resultado.copy()
+
+
+if __name__ == "__main__":
+    if '--limpiar' in sys.argv:
+        archivos = list(CACHE_DIR.glob('*.json')) if CACHE_DIR.exists() else []
+        for archivo in archivos:
+            archivo.unlink()
+        print(f"🗑️  {len(archivos)} agregaciones borradas de {CACHE_DIR}")
+    else:
+        archivos = list(CACHE_DIR.glob('*.json')) if CACHE_DIR.exists() else []
+        total = sum(a.stat().st_size for a in archivos)
+        print(f"📊 {CACHE_DIR}: {len(archivos)} agregaciones, {total / 1024 ** 2:.1f} MB")
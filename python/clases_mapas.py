@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para precalcular los cortes de clase de los mapas coropléticos
+Para cada salida de data/mapas/ (generadas por construir_geometrias.py) y cada
+corte (CONCEPTO / CONCEPTO | TIPO) × periodo se calculan los límites de K_CLASES clases con:
+  - cuantiles
+  - intervalos iguales
+  - cortes naturales de Jenks (programación dinámica de Fisher)
+Todos los cortes se calculan a la vez con NumPy; el navegador solo busca el color.
+"""
+
+import sys
+import json
+import time
+import numpy as np
+from pathlib import Path
+
+MAPAS_DIR = Path('data/mapas')
+PREFIJO_CLASES = 'clases_'
+
+K_CLASES = 7
+METODOS = ['cuantiles', 'intervalos_iguales', 'jenks']
+
+
+def cortes_cuantiles(valores, k=K_CLASES):
+    """valores: [cortes, n] con NaN; devuelve [cortes, k + 1] límites (mínimo, ..., máximo)"""
+    return np.nanquantile(valores, np.linspace(0, 1, k + 1), axis=1).T
+
+
+def cortes_intervalos_iguales(valores, k=K_CLASES):
+    minimo = np.nanmin(valores, axis=1, keepdims=True)
+    maximo = np.nanmax(valores, axis=1, keepdims=True)
+    return minimo + (maximo - minimo) * np.linspace(0, 1, k + 1)[None, :]
+
+
+def _jenks_mismo_tamano(x, k):
+    """
+    Jenks para un lote de muestras ordenadas del mismo tamaño: x [lote, n].
+    costo[i, j] = suma de cuadrados de x[i..j] respecto a su media (sumas acumuladas);
+    error[c, j] = min_i error[c - 1, i - 1] + costo[i, j]. Se resuelve para todo el lote a la vez.
+    """
+    lote, n = x.shape
+    k = min(k, n)
+    s1 = np.concatenate([np.zeros((lote, 1)), np.cumsum(x, axis=1)], axis=1)
+    s2 = np.concatenate([np.zeros((lote, 1)), np.cumsum(x * x, axis=1)], axis=1)
+    i = np.arange(n)[:, None]
+    j = np.arange(n)[None, :]
+    tamano = np.maximum(j - i + 1, 1)
+    suma = s1[:, None, 1:] - s1[:, :-1, None]
+    costo = (s2[:, None, 1:] - s2[:, :-1, None]) - suma * suma / tamano
+    costo = np.where(i <= j, np.maximum(costo, 0.0), np.inf)
+
+    error = costo[:, 0, :]
+    inicios = []
+    for _ in range(1, k):
+        # anterior[i] = error con una clase menos que termina en i - 1
+        anterior = np.concatenate([np.full((lote, 1), np.inf), error[:, :-1]], axis=1)
+        total = anterior[:, :, None] + costo
+        inicio = np.argmin(total, axis=1)
+        error = np.take_along_axis(total, inicio[:, None, :], axis=1)[:, 0, :]
+        inicios.append(inicio)
+
+    # Reconstruir los límites superiores de cada clase desde el final
+    fin = np.full(lote, n - 1)
+    superiores = [x[np.arange(lote), fin]]
+    for inicio in reversed(inicios):
+        fin = inicio[np.arange(lote), fin] - 1
+        superiores.append(x[np.arange(lote), fin])
+    superiores.reverse()
+    return np.column_stack([x[:, 0]] + superiores)
+
+
+def cortes_jenks(valores, k=K_CLASES):
+    """Cortes naturales de Jenks por fila; las filas se agrupan por número de valores válidos"""
+    resultado = np.full((len(valores), k + 1), np.nan)
+    validos = (~np.isnan(valores)).sum(axis=1)
+    ordenados = np.sort(valores, axis=1)  # NaN al final
+    for n in np.unique(validos):
+        filas = validos == n
+        if n == 0:
+            continue
+        limites = _jenks_mismo_tamano(ordenados[filas, :n], k)
+        # Con menos valores que clases se repite el máximo
+        resultado[filas] = np.pad(limites, ((0, 0), (0, k + 1 - limites.shape[1])), mode='edge')
+    return resultado
+
+
+CALCULOS = {
+    'cuantiles': cortes_cuantiles,
+    'intervalos_iguales': cortes_intervalos_iguales,
+    'jenks': cortes_jenks,
+}
+
+
+def clases_de_mapa(datos, k=K_CLASES):
+    """Cortes [metodo][corte][periodo][k + 1] para un archivo de data/mapas/"""
+    valores = np.array(datos['valores'], dtype=float)  # [corte, periodo, clave]
+    n_cortes, n_periodos, _ = valores.shape
+    # Solo las claves de entidad (1-32); la posición 0 y 'Extranjero' no se colorean
+    planos = valores[:, :, 1:33].reshape(n_cortes * n_periodos, -1)
+    con_datos = ~np.isnan(planos).all(axis=1)
+    resultado = {}
+    for metodo in METODOS:
+        cortes = np.full((len(planos), k + 1), np.nan)
+        cortes[con_datos] = CALCULOS[metodo](planos[con_datos], k)
+        cortes = np.round(cortes, 4).reshape(n_cortes, n_periodos, k + 1)
+        resultado[metodo] = np.where(np.isnan(cortes), None, cortes).tolist()
+    return resultado, int(con_datos.sum())
+
+
+def calcular_clases_mapas(k=K_CLASES):
+    """Calcula los cortes de clase de todas las salidas de data/mapas/"""
+
+    try:
+        print("🔄 Calculando cortes de clase para los mapas...")
+
+        archivos = sorted(a for a in MAPAS_DIR.glob('*.json') if not a.name.startswith(PREFIJO_CLASES))
+        if not archivos:
+            print("❌ No hay arreglos en data/mapas/; ejecuta primero python/construir_geometrias.py")
+            return False
+
+        total = 0
+        for archivo in archivos:
+            with open(archivo, encoding='utf-8') as f:
+                datos = json.load(f)
+            clases, combinaciones = clases_de_mapa(datos, k)
+            salida = MAPAS_DIR / f'{PREFIJO_CLASES}{archivo.name}'
+            with open(salida, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'fuente': datos['fuente'],
+                    'k': k,
+                    'cortes': datos['cortes'],
+                    'periodos': datos['periodos'],
+                    # metodo → [corte][periodo] → [mínimo, límite 1, ..., máximo]
+                    'clases': clases,
+                }, f, ensure_ascii=False, separators=(',', ':'))
+            total += combinaciones
+            print(f"💾 {salida} ({combinaciones} combinaciones corte × periodo)")
+
+        print(f"\n📊 Total: {total} combinaciones × {len(METODOS)} métodos, {k} clases")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error calculando cortes de clase: {e}")
+        return False
+
+
+def benchmark_jenks(n_cortes=10_000, n=32, k=K_CLASES):
+    """Mide Jenks sobre n_cortes muestras aleatorias de n entidades"""
+    valores = np.random.default_rng(0).lognormal(3, 1.5, (n_cortes, n))
+    inicio = time.perf_counter()
+    cortes_jenks(valores, k)
+    duracion = time.perf_counter() - inicio
+    print(f"⏱️  Jenks de {n_cortes:,} cortes × {n} entidades, {k} clases: {duracion:.2f} s")
+    return duracion
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_jenks()
+    else:
+        if not calcular_clases_mapas():
+            sys.exit(1)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para preparar las geometrías de los mapas con claves enteras de entidad
+  - Agrega properties.clave_entidad (clave INEGI) a cada estado de estados_compressed.json
+  - Escribe un archivo por estado en data/geojson/estados/NN.json
+  - Escribe data/geojson/estados_indice.json con nombre, bbox y el rango de bytes de cada
+    estado dentro de estados_compressed.json (para pedir solo una geometría)
+  - Convierte las salidas estatales (ENTIDAD × CONCEPTO/TIPO × periodo) en arreglos indexados
+    por clave en data/mapas/, para colorear sin comparar NOMGEO contra ENTIDAD en el navegador
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from entidades import N_CLAVES, SIN_ENTIDAD, clave_entidad, codigos_entidad, nombre_entidad
+
+GEOJSON_FILE = Path('data/geojson/estados_compressed.json')
+ESTADOS_DIR = Path('data/geojson/estados')
+INDICE_FILE = Path('data/geojson/estados_indice.json')
+MAPAS_DIR = Path('data/mapas')
+
+# Salidas estatales con columnas ENTIDAD, dimensiones y una columna por periodo
+SALIDAS_ESTATALES = {
+    'entidad_concepto_analysis.csv': ['CONCEPTO'],
+    'entidad_concepto_percentage_analysis.csv': ['CONCEPTO'],
+    'entidad_tipo_analysis.csv': ['CONCEPTO', 'TIPO'],
+    'entidad_tipo_percentage_analysis.csv': ['CONCEPTO', 'TIPO'],
+    'monthly_entidad_concepto_analysis.csv': ['CONCEPTO'],
+    'monthly_entidad_concepto_percentage_analysis.csv': ['CONCEPTO'],
+    'monthly_entidad_tipo_analysis.csv': ['CONCEPTO', 'TIPO'],
+    'monthly_entidad_tipo_percentage_analysis.csv': ['CONCEPTO', 'TIPO'],
+    'estatal_concepto_tipo_analysis.csv': ['CONCEPTO', 'TIPO'],
+}
+
+SEPARADOR_CORTE = ' | '
+
+
+def json_compacto(datos):
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+
+
+def bbox(geometria):
+    """[oeste, sur, este, norte] de un Polygon o MultiPolygon"""
+    puntos = np.array([
+        punto
+        for poligono in (geometria['coordinates'] if geometria['type'] == 'MultiPolygon' else [geometria['coordinates']])
+        for anillo in poligono
+        for punto in anillo
+    ])
+    return [float(v) for v in (*puntos.min(axis=0), *puntos.max(axis=0))]
+
+
+def preparar_geometrias():
+    """
+    Reescribe el GeoJSON ordenado por clave con properties.clave_entidad, guarda un archivo
+    por estado y devuelve el índice {clave: {nombre, archivo, offset, longitud, bbox}}
+    """
+    with open(GEOJSON_FILE, encoding='utf-8') as f:
+        geojson = json.load(f)
+
+    estados = []
+    for feature in geojson['features']:
+        clave = clave_entidad(feature['properties']['NOMGEO'])
+        if clave == SIN_ENTIDAD:
+            raise ValueError(f"Entidad no reconocida en GeoJSON: {feature['properties']['NOMGEO']}")
+        feature['properties']['clave_entidad'] = clave
+        estados.append((clave, feature))
+    estados.sort(key=lambda par: par[0])
+
+    ESTADOS_DIR.mkdir(parents=True, exist_ok=True)
+    encabezado = '{"type":"FeatureCollection","features":['
+    partes = [encabezado]
+    offset = len(encabezado.encode('utf-8'))
+    indice = {}
+    for i, (clave, feature) in enumerate(estados):
+        texto = json_compacto(feature)
+        longitud = len(texto.encode('utf-8'))
+        archivo = ESTADOS_DIR / f'{clave:02d}.json'
+        archivo.write_text(texto, encoding='utf-8')
+        indice[clave] = {
+            'nombre': feature['properties']['NOMGEO'],
+            'archivo': archivo.as_posix(),
+            'offset': offset,
+            'longitud': longitud,
+            'bbox': bbox(feature['geometry']),
+        }
+        separador = ',' if i < len(estados) - 1 else ''
+        partes.append(texto + separador)
+        offset += longitud + len(separador)
+    partes.append(']}')
+
+    GEOJSON_FILE.write_text(''.join(partes), encoding='utf-8')
+    return indice
+
+
+def arreglos_por_clave(df, dimensiones):
+    """
+    Arreglo [corte, periodo, clave] a partir de una salida estatal en formato ancho.
+    Devuelve (cortes, periodos, valores) con NaN donde no hay dato.
+    """
+    periodos = [c for c in df.columns if c != 'ENTIDAD' and c not in dimensiones]
+    claves = codigos_entidad(df['ENTIDAD'])
+    corte_texto = df[dimensiones].astype(str).agg(SEPARADOR_CORTE.join, axis=1)
+    codigos_corte, cortes = pd.factorize(corte_texto)
+
+    valores = np.full((len(cortes), len(periodos), N_CLAVES), np.nan)
+    validas = claves >= 0
+    valores[codigos_corte[validas], :, claves[validas]] = df[periodos].to_numpy(dtype=float)[validas]
+    return list(cortes), periodos, valores
+
+
+def exportar_arreglos(nombre, dimensiones):
+    """Guarda data/mapas/<nombre>.json con los valores indexados por clave de entidad"""
+    df = pd.read_csv(Path('data') / nombre)
+    cortes, periodos, valores = arreglos_por_clave(df, dimensiones)
+    salida = {
+        'fuente': nombre,
+        'dimensiones': dimensiones,
+        'cortes': cortes,
+        'periodos': periodos,
+        # valores[corte][periodo][clave]; la posición 0 no se usa
+        'valores': np.where(np.isnan(valores), None, valores).tolist(),
+    }
+    archivo = MAPAS_DIR / nombre.replace('.csv', '.json')
+    archivo.write_text(json_compacto(salida), encoding='utf-8')
+    return archivo, len(cortes), len(periodos)
+
+
+def construir_geometrias():
+    """Prepara geometrías por clave de entidad y arreglos indexados para los mapas"""
+
+    try:
+        print("🔄 Preparando geometrías y arreglos por clave de entidad...")
+
+        indice = preparar_geometrias()
+        with open(INDICE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'claves': {clave: nombre_entidad(clave) for clave in indice},
+                'estados': indice,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"💾 GeoJSON con clave_entidad: {GEOJSON_FILE}")
+        print(f"💾 {len(indice)} geometrías por estado en: {ESTADOS_DIR}/")
+        print(f"💾 Índice de rangos de bytes: {INDICE_FILE}")
+
+        MAPAS_DIR.mkdir(parents=True, exist_ok=True)
+        for nombre, dimensiones in SALIDAS_ESTATALES.items():
+            if not (Path('data') / nombre).exists():
+                print(f"⚠️  No existe data/{nombre}, se omite")
+                continue
+            archivo, n_cortes, n_periodos = exportar_arreglos(nombre, dimensiones)
+            print(f"💾 {archivo} ({n_cortes} cortes × {n_periodos} periodos)")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error preparando geometrías: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if not construir_geometrias():
+        exit(1)
@@ -78,4 +78,5 @@ def crear_csv_analisis_detenidos():
         return False
 
 if __name__ == "__main__":
-    crear_csv_analisis_detenidos()
+    if not crear_csv_analisis_detenidos():
+        exit(1)
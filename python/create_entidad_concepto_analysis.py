@@ -8,6 +8,8 @@ para la Gráfica 4 (mapa de estados)
 import pandas as pd
 from pathlib import Path
 
+from cache_agregaciones import suma_agrupada
+
 def create_entidad_concepto_analysis():
     """
     Crea un CSV con la evolución temporal de incidencia delictiva
@@ -34,7 +36,7 @@ def create_entidad_concepto_analysis():
         
         # Agrupar por ENTIDAD, CONCEPTO y AÑO, sumando los meses
         print("🔄 Agrupando datos por entidad, concepto y año...")
-        df_grouped = df.groupby(['ENTIDAD', 'CONCEPTO', 'AÑO'])[month_columns].sum().reset_index()
+        df_grouped = suma_agrupada(csv_file, ['ENTIDAD', 'CONCEPTO', 'AÑO'], month_columns, df=df)
         
         # Crear un DataFrame pivoteado para el formato final
         result_data = []
@@ -124,3 +126,4 @@ if __name__ == "__main__":
         print(f"📁 Archivo generado: data/entidad_concepto_analysis.csv")
     else:
         print("\n❌ El análisis falló")
+        exit(1)
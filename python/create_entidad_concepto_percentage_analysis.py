@@ -7,6 +7,8 @@ Script para crear análisis de variación porcentual por entidad y concepto
 import pandas as pd
 from pathlib import Path
 
+from cache_agregaciones import suma_agrupada
+
 def create_entidad_concepto_percentage_analysis():
     """Crea análisis de variación porcentual por entidad y concepto"""
     
@@ -33,7 +35,9 @@ def create_entidad_concepto_percentage_analysis():
         meses = ['ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO', 'JULIO']
         
         # Agrupar por ENTIDAD, CONCEPTO y AÑO, sumando todos los meses
-        df_grouped = df_filtered.groupby(['ENTIDAD', 'CONCEPTO', 'AÑO'])[meses].sum().reset_index()
+        df_grouped = suma_agrupada(
+            csv_file, ['ENTIDAD', 'CONCEPTO', 'AÑO'], meses, df=df_original,
+            filtros=[('AÑO', '>=', 2018), ('AÑO', '<=', 2025), ('ENTIDAD', '!=', 'EXTRANJERO')])
         
         # Crear columna TOTAL sumando todos los meses
         df_grouped['TOTAL'] = df_grouped[meses].sum(axis=1)
@@ -140,3 +140,4 @@ if __name__ == "__main__":
         print(f"📁 Archivo generado: data/entidad_tipo_analysis.csv")
     else:
         print("\n❌ El análisis falló")
+        exit(1)
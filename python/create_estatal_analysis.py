@@ -8,7 +8,7 @@ def main():
     print("🏛️ Generando análisis estatal por concepto y tipo (Enero-Julio 2025)...")
     
     # Leer el dataset principal
-    df = pd.read_csv('../data/IDEFF_jul25.csv', encoding='latin-1')
+    df = pd.read_csv('data/IDEFF_jul25.csv', encoding='latin-1')
     
     # Corregir nombres de columnas
     df.columns = df.columns.str.replace('AÃ\x91O', 'AÑO')
@@ -75,7 +75,7 @@ def main():
         print(f"   Tipos: {sorted(concepto_data['TIPO'].unique())}")
     
     # Guardar archivo CSV
-    output_file = '../data/estatal_concepto_tipo_analysis.csv'
+    output_file = 'data/estatal_concepto_tipo_analysis.csv'
     df_resultado.to_csv(output_file, index=False, encoding='utf-8')
     
     print(f"\n✅ Archivo guardado: {output_file}")
@@ -24,10 +24,10 @@ def create_estatal_top10_monthly_analysis():
     print("🚀 Generando análisis mensual de top 10 entidades...")
     
     # Cargar datos
-    data_file = '../data/IDEFF_jul25.csv'
+    data_file = 'data/IDEFF_jul25.csv'
     if not os.path.exists(data_file):
         print(f"❌ Error: No se encontró {data_file}")
-        return
+        return False
     
     print(f"📂 Cargando datos desde {data_file}")
     
@@ -46,7 +46,7 @@ def create_estatal_top10_monthly_analysis():
     
     if df is None:
         print("❌ Error: No se pudo cargar el archivo con ningún encoding")
-        return
+        return False
     
     # Verificar y corregir columnas
     print(f"📋 Columnas en CSV: {list(df.columns)}")
@@ -62,7 +62,7 @@ def create_estatal_top10_monthly_analysis():
     missing_columns = [col for col in required_columns if col not in df.columns]
     if missing_columns:
         print(f"❌ Error: Faltan columnas básicas: {missing_columns}")
-        return
+        return False
     
     print(f"✅ Estructura de datos: {df.shape[0]} filas, {df.shape[1]} columnas")
     
@@ -173,7 +173,7 @@ def create_estatal_top10_monthly_analysis():
                 ]
     
     # Guardar estructura de datos
-    output_file = '../data/estatal_top10_monthly_analysis.json'
+    output_file = 'data/estatal_top10_monthly_analysis.json'
     print(f"💾 Guardando datos en {output_file}")
     
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -182,12 +182,12 @@ def create_estatal_top10_monthly_analysis():
     # Crear también CSV para tabla detallada (opcional)
     print("💾 Guardando CSV para tabla detallada...")
     df_long_sorted = df_long.sort_values(['ANIO_MES', 'CONCEPTO', 'CASOS'], ascending=[True, True, False])
-    df_long_sorted.to_csv('../data/estatal_top10_monthly_analysis.csv', index=False, encoding='utf-8')
+    df_long_sorted.to_csv('data/estatal_top10_monthly_analysis.csv', index=False, encoding='utf-8')
     
     print("✅ ¡Análisis mensual de top 10 entidades generado exitosamente!")
     print(f"📁 Archivos generados:")
     print(f"   - {output_file}")
-    print(f"   - ../data/estatal_top10_monthly_analysis.csv")
+    print(f"   - data/estatal_top10_monthly_analysis.csv")
     
     # Mostrar estadísticas finales
     print(f"\n📊 Resumen:")
@@ -206,5 +206,8 @@ def create_estatal_top10_monthly_analysis():
                 for i, item in enumerate(top3_todos, 1):
                     print(f"     {i}. {item['entidad']}: {item['casos']} casos")
 
+    return True
+
 if __name__ == "__main__":
-    create_estatal_top10_monthly_analysis()
+    if not create_estatal_top10_monthly_analysis():
+        exit(1)
@@ -176,4 +176,5 @@ if __name__ == "__main__":
         print(f"📁 Archivo generado: data/monthly_entidad_concepto_analysis.csv")
     else:
         print("\n❌ El análisis falló")
+        exit(1)
 
@@ -208,4 +208,5 @@ if __name__ == "__main__":
         print(f"📁 Archivo generado: data/monthly_entidad_concepto_percentage_analysis.csv")
     else:
         print("\n❌ El análisis falló")
+        exit(1)
 
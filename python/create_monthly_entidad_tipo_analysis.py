@@ -183,4 +183,5 @@ if __name__ == "__main__":
         print(f"📁 Archivo generado: data/monthly_entidad_tipo_analysis.csv")
     else:
         print("\n❌ El análisis falló")
+        exit(1)
 
@@ -8,6 +8,8 @@ Genera CSV con años como columnas y conceptos como filas
 import pandas as pd
 from pathlib import Path
 
+from cache_agregaciones import suma_agrupada
+
 def create_national_analysis():
     """Crea análisis nacional agrupado por concepto y año"""
     
@@ -27,7 +29,7 @@ def create_national_analysis():
                 'JULIO']
         
         # Agrupar por CONCEPTO y AÑO, sumando todos los meses
-        df_grouped = df.groupby(['CONCEPTO', 'AÑO'])[meses].sum().reset_index()
+        df_grouped = suma_agrupada(csv_file, ['CONCEPTO', 'AÑO'], meses, df=df)
         
         # Pivotar la tabla para tener años como columnas
         df_pivoted = df_grouped.pivot(index='CONCEPTO', columns='AÑO', values=meses[0])
@@ -72,4 +74,5 @@ def create_national_analysis():
         return False
 
 if __name__ == "__main__":
-    create_national_analysis()
\ No newline at end of file
+    if not create_national_analysis():
+        exit(1)
\ No newline at end of file
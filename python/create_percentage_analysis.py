@@ -9,6 +9,8 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from cache_agregaciones import suma_agrupada
+
 def process_ideff_database():
     """Procesa la base de datos IDEFF y crea una versión limpia"""
     
@@ -83,7 +85,7 @@ def create_national_analysis():
                 'JULIO']
         
         # Agrupar por CONCEPTO y AÑO, sumando todos los meses
-        df_grouped = df.groupby(['CONCEPTO', 'AÑO'])[meses].sum().reset_index()
+        df_grouped = suma_agrupada(csv_file, ['CONCEPTO', 'AÑO'], meses, df=df)
         
         # Pivotar la tabla para tener años como columnas
         df_pivoted = df_grouped.pivot(index='CONCEPTO', columns='AÑO', values=meses[0])
@@ -142,7 +142,9 @@ if __name__ == "__main__":
             print("\n🎉 Análisis completado exitosamente!")
         else:
             print("\n❌ Análisis falló")
+            exit(1)
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        print("Asegúrate de que el archivo 'data/IDEFF_jul25.csv' existe")
\ No newline at end of file
+        print("Asegúrate de que el archivo 'data/IDEFF_jul25.csv' existe")
+        exit(1)
\ No newline at end of file
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para cruzar la incidencia delictiva federal (IDEFF) con las detenciones y
+aseguramientos anunciados por el Gabinete de Seguridad, por entidad × mes
+Las tres fuentes se llevan a la clave INEGI con el índice de entidades.py y se combinan
+con llaves enteras (clave_entidad × mes), sin comparar nombres de estado como texto.
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from entidades import CLAVE_EXTRANJERO, N_CLAVES, codigos_entidad, expandir_entidades, nombre_entidad
+from latencia_detenciones import parsear_fechas
+
+IDEFF_FILE = Path('data/IDEFF_processed.csv')
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+ASEGURAMIENTOS_FILE = Path('data/aseguramientos_estado_mes.csv')
+CRUCE_FILE = Path('data/entidad_mes_cruce.csv')
+
+MESES = ['ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO', 'JULIO',
+         'AGOSTO', 'SEPTIEMBRE', 'OCTUBRE', 'NOVIEMBRE', 'DICIEMBRE']
+
+
+def indice_mes(anio, mes):
+    """Mes como entero consecutivo (año * 12 + mes - 1)"""
+    return np.asarray(anio, dtype=np.int64) * 12 + np.asarray(mes, dtype=np.int64) - 1
+
+
+def incidencia_por_entidad_mes(df):
+    """
+    Arreglo [clave, mes, concepto] con la suma de incidencia y máscara de meses reportados.
+    Devuelve (incidencia, meses_validos, mes_inicial, conceptos)
+    """
+    claves = codigos_entidad(df['ENTIDAD'])
+    codigos_concepto, conceptos = pd.factorize(df['CONCEPTO'])
+    valores = df[MESES].to_numpy(dtype=float)
+    reportado = ~np.isnan(valores)
+
+    mes_inicial = int(indice_mes(df['AÑO'].min(), 1))
+    meses = indice_mes(df['AÑO'].to_numpy()[:, None], np.arange(1, 13)[None, :]) - mes_inicial
+    n_meses = int(meses.max()) + 1
+
+    incidencia = np.zeros((N_CLAVES, n_meses, len(conceptos)))
+    filas = np.broadcast_to((claves >= 0)[:, None], valores.shape) & reportado
+    np.add.at(
+        incidencia,
+        (np.broadcast_to(claves[:, None], valores.shape)[filas], meses[filas],
+         np.broadcast_to(codigos_concepto[:, None], valores.shape)[filas]),
+        valores[filas],
+    )
+    meses_validos = np.zeros(n_meses, dtype=bool)
+    meses_validos[meses[reportado]] = True
+    return incidencia, meses_validos, mes_inicial, list(conceptos)
+
+
+def conteo_por_entidad_mes(claves, meses, n_meses, pesos=None):
+    """bincount sobre la llave entera clave × n_meses + mes (fuera de rango se descarta)"""
+    validos = (meses >= 0) & (meses < n_meses)
+    llaves = claves[validos].astype(np.int64) * n_meses + meses[validos]
+    pesos = None if pesos is None else pesos[validos]
+    return np.bincount(llaves, weights=pesos, minlength=N_CLAVES * n_meses).reshape(N_CLAVES, n_meses)
+
+
+def meses_de_texto(fechas, mes_inicial):
+    """Serie de fechas/meses en texto → índice de mes relativo (-1 si no hay fecha)"""
+    meses = parsear_fechas(fechas.astype('string').str.slice(0, 7) + '-01')
+    relativos = meses.astype('datetime64[M]').astype(np.int64) + 1970 * 12 - mes_inicial
+    return np.where(np.isnat(meses), -1, relativos)
+
+
+def construir_cruce():
+    """Tabla entidad × mes con incidencia por concepto, detenidos y aseguramientos"""
+    ideff = pd.read_csv(IDEFF_FILE)
+    incidencia, meses_validos, mes_inicial, conceptos = incidencia_por_entidad_mes(ideff)
+    n_meses = len(meses_validos)
+
+    # Detenidos del Gabinete: fecha de detención, o de la conferencia si no se reportó
+    detenidos = pd.read_csv(CSV_DETENIDOS, encoding='utf-8')
+    detenidos['fecha'] = detenidos['date_of_arrest'].where(
+        ~np.isnat(parsear_fechas(detenidos['date_of_arrest'])), detenidos['conference_date'])
+    detenidos = expandir_entidades(detenidos, 'state_of_arrest')
+    conteo_detenidos = conteo_por_entidad_mes(
+        detenidos['clave_entidad'].to_numpy(), meses_de_texto(detenidos['fecha'], mes_inicial), n_meses)
+
+    # Aseguramientos ya agregados por estado × mes
+    aseguramientos = expandir_entidades(pd.read_csv(ASEGURAMIENTOS_FILE, encoding='utf-8'), 'state_of_arrest')
+    claves_aseg = aseguramientos['clave_entidad'].to_numpy()
+    meses_aseg = meses_de_texto(aseguramientos['mes'], mes_inicial)
+    cantidad = aseguramientos['cantidad_total'].fillna(0).to_numpy()
+    es_arma = ((aseguramientos['categoria'] == 'arma') & (aseguramientos['unidad'] == 'armas')).to_numpy()
+    es_droga_kg = ((aseguramientos['categoria'] == 'droga') & (aseguramientos['unidad'] == 'kg')).to_numpy()
+    menciones = conteo_por_entidad_mes(
+        claves_aseg, meses_aseg, n_meses, aseguramientos['menciones'].to_numpy(dtype=float))
+    armas = conteo_por_entidad_mes(claves_aseg, meses_aseg, n_meses, np.where(es_arma, cantidad, 0.0))
+    droga_kg = conteo_por_entidad_mes(claves_aseg, meses_aseg, n_meses, np.where(es_droga_kg, cantidad, 0.0))
+
+    # Filas: todas las entidades con clave en los meses que IDEFF reporta, más meses con detenidos
+    claves, meses = np.meshgrid(np.arange(1, N_CLAVES), np.arange(n_meses), indexing='ij')
+    claves, meses = claves.ravel(), meses.ravel()
+    incluir = meses_validos[meses] | (conteo_detenidos[claves, meses] > 0)
+    # 'Extranjero' solo si la fuente IDEFF lo incluye
+    incluir &= (claves != CLAVE_EXTRANJERO) | incidencia[CLAVE_EXTRANJERO].any()
+    claves, meses = claves[incluir], meses[incluir]
+
+    absolutos = mes_inicial + meses
+    cruce = pd.DataFrame({
+        'clave_entidad': claves,
+        'entidad': [nombre_entidad(c) for c in claves],
+        'mes': [f'{a:04d}-{m:02d}' for a, m in zip(absolutos // 12, absolutos % 12 + 1)],
+    })
+    for c, concepto in enumerate(conceptos):
+        cruce[concepto] = np.where(meses_validos[meses], incidencia[claves, meses, c], np.nan)
+    cruce['INCIDENCIA_TOTAL'] = cruce[conceptos].sum(axis=1, min_count=1)
+    cruce['detenidos_gabinete'] = conteo_detenidos[claves, meses].astype(int)
+    cruce['aseguramientos_menciones'] = menciones[claves, meses].astype(int)
+    cruce['armas_aseguradas'] = armas[claves, meses].round(3)
+    cruce['droga_asegurada_kg'] = droga_kg[claves, meses].round(3)
+    return cruce
+
+
+def crear_cruce_entidad_mes():
+    """Genera el cruce IDEFF × Gabinete por entidad y mes"""
+
+    try:
+        print("🔄 Cruzando incidencia IDEFF con detenciones y aseguramientos del Gabinete...")
+
+        cruce = construir_cruce()
+        cruce.to_csv(CRUCE_FILE, index=False, encoding='utf-8')
+        print(f"💾 Cruce guardado en: {CRUCE_FILE} ({len(cruce)} filas)")
+
+        con_detenidos = cruce[cruce['detenidos_gabinete'] > 0]
+        print(f"\n📊 RESUMEN:")
+        print(f"   • Entidades: {cruce['clave_entidad'].nunique()}, meses: {cruce['mes'].nunique()} "
+              f"({cruce['mes'].min()} - {cruce['mes'].max()})")
+        print(f"   • Entidad-mes con detenidos del Gabinete: {len(con_detenidos)}")
+        top = con_detenidos.groupby('entidad')[['detenidos_gabinete', 'INCIDENCIA_TOTAL']].sum()
+        for entidad, fila in top.sort_values('detenidos_gabinete', ascending=False).head(5).iterrows():
+            print(f"   • {entidad}: {fila['detenidos_gabinete']:.0f} detenidos, "
+                  f"{fila['INCIDENCIA_TOTAL']:,.0f} delitos federales en esos meses")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creando cruce: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if not crear_cruce_entidad_mes():
+        exit(1)
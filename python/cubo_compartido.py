@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cubo IDEFF en memoria compartida para etapas que corren en procesos
+El proceso principal lee la base una sola vez y publica el cubo (cubo_ideff.py) en un
+segmento de multiprocessing.shared_memory:
+  - encabezado JSON con las dimensiones (delitos, meses, anio_inicial) y la forma del arreglo
+  - el arreglo valores[clave_entidad, delito, mes] alineado a 64 bytes
+Cada proceso trabajador se adjunta por nombre y obtiene vistas NumPy de solo lectura (sin copias),
+así que el costo de arranque y la memoria privada por trabajador no crecen con el número de procesos.
+Limpieza:
+  - solo el proceso que publica borra el segmento (al salir del `with`, en atexit, o el
+    resource_tracker de multiprocessing si el proceso muere sin llegar a ninguno de los dos)
+  - los trabajadores no registran el segmento, así que si uno falla no se borra para los demás
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+from cubo_ideff import cargar_cubo
+
+ALINEACION = 64
+BYTES_LARGO = 8  # largo del encabezado JSON, little-endian
+
+_ADJUNTOS = {}  # nombre → (segmento, cubo) ya adjuntos en el proceso actual
+_CUBO_TRABAJADOR = None
+
+
+def _desplazamiento(largo_encabezado):
+    return -(-(BYTES_LARGO + largo_encabezado) // ALINEACION) * ALINEACION
+
+
+class CuboCompartido:
+    """Segmento con el cubo publicado; usar con `with` (o llamar cerrar) en el proceso principal"""
+
+    def __init__(self, cubo):
+        valores = np.ascontiguousarray(cubo['valores'])
+        encabezado = json.dumps({
+            'forma': valores.shape,
+            'dtype': valores.dtype.str,
+            'delitos': cubo['delitos'],
+            'meses': cubo['meses'],
+            'anio_inicial': cubo['anio_inicial'],
+        }, ensure_ascii=False).encode('utf-8')
+        inicio = _desplazamiento(len(encabezado))
+
+        self.segmento = shared_memory.SharedMemory(create=True, size=inicio + valores.nbytes)
+        self.nombre = self.segmento.name
+        self.segmento.buf[:BYTES_LARGO] = len(encabezado).to_bytes(BYTES_LARGO, 'little')
+        self.segmento.buf[BYTES_LARGO:BYTES_LARGO + len(encabezado)] = encabezado
+        destino = np.ndarray(valores.shape, dtype=valores.dtype, buffer=self.segmento.buf, offset=inicio)
+        destino[...] = valores
+        del destino
+        atexit.register(self.cerrar)
+
+    def cerrar(self):
+        """Borra el segmento; los procesos que ya lo tienen adjunto conservan su mapeo hasta terminar"""
+        if self.segmento is None:
+            return
+        try:
+            self.segmento.close()
+        except BufferError:
+            pass  # quedan vistas vivas en este proceso; el mapeo se libera con ellas
+        self.segmento.unlink()
+        self.segmento = None
+        atexit.unregister(self.cerrar)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def publicar_cubo(cubo=None):
+    """Publica el cubo (por defecto cargar_cubo()) y devuelve el CuboCompartido"""
+    return CuboCompartido(cargar_cubo() if cubo is None else cubo)
+
+
+def _abrir_sin_registro(nombre):
+    # Antes de Python 3.13 adjuntarse también registra el segmento en el resource_tracker,
+    # que lo borraría al terminar este proceso; solo quien lo publica debe registrarlo
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    registrar = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=nombre)
+    finally:
+        resource_tracker.register = registrar
+
+
+def adjuntar_cubo(nombre):
+    """Cubo {valores, delitos, anio_inicial, meses} con valores como vista de solo lectura del segmento"""
+    if nombre not in _ADJUNTOS:
+        segmento = _abrir_sin_registro(nombre)
+        largo = int.from_bytes(segmento.buf[:BYTES_LARGO], 'little')
+        encabezado = json.loads(bytes(segmento.buf[BYTES_LARGO:BYTES_LARGO + largo]).decode('utf-8'))
+        valores = np.ndarray(tuple(encabezado['forma']), dtype=np.dtype(encabezado['dtype']),
+                             buffer=segmento.buf, offset=_desplazamiento(largo))
+        valores.flags.writeable = False
+        cubo = {
+            'valores': valores,
+            'delitos': [tuple(d) for d in encabezado['delitos']],
+            'anio_inicial': encabezado['anio_inicial'],
+            'meses': encabezado['meses'],
+        }
+        _ADJUNTOS[nombre] = (segmento, cubo)
+    return _ADJUNTOS[nombre][1]
+
+
+# ---- Pool de procesos ----
+
+def inicializar_trabajador(nombre):
+    """initializer de ProcessPoolExecutor: adjunta el cubo una vez por proceso"""
+    global _CUBO_TRABAJADOR
+    _CUBO_TRABAJADOR = adjuntar_cubo(nombre)
+
+
+def cubo_del_trabajador():
+    if _CUBO_TRABAJADOR is None:
+        raise RuntimeError('este proceso no se inició con inicializar_trabajador')
+    return _CUBO_TRABAJADOR
+
+
+def _ejecutar(tarea):
+    funcion, argumento = tarea
+    return funcion(cubo_del_trabajador(), argumento)
+
+
+def mapear_con_cubo(funcion, argumentos, procesos=None, cubo=None):
+    """
+    [funcion(cubo, a) for a in argumentos] en un pool de procesos que comparten un solo cubo.
+    `funcion` debe estar definida a nivel de módulo (se envía por pickle, el cubo no).
+    """
+    with publicar_cubo(cubo) as compartido, ProcessPoolExecutor(
+            max_workers=procesos, initializer=inicializar_trabajador, initargs=(compartido.nombre,)) as ejecutor:
+        return list(ejecutor.map(_ejecutar, [(funcion, a) for a in argumentos]))
+
+
+# ---- Benchmark ----
+
+def _memoria_privada_kb():
+    """RssAnon del proceso actual (Linux); None si no está disponible"""
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('RssAnon:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _arranque(cargar):
+    # Arranque de un trabajador: tiempo y memoria privada agregada por obtener el cubo
+    antes = _memoria_privada_kb()
+    inicio = time.perf_counter()
+    cubo = cargar()
+    cubo['valores'].sum()  # toca todas las páginas
+    duracion = time.perf_counter() - inicio
+    despues = _memoria_privada_kb()
+    return os.getpid(), duracion, None if antes is None else despues - antes
+
+
+def _arranque_compartido(nombre, _):
+    return _arranque(lambda: adjuntar_cubo(nombre))
+
+
+def _arranque_recargando(_, __):
+    return _arranque(cargar_cubo)
+
+
+def benchmark_cubo_compartido(lista_procesos=(1, 2, 4, 8)):
+    """Arranque por trabajador: adjuntar el cubo compartido contra volver a leer la base"""
+    print("⏱️  Arranque por trabajador: cubo compartido contra recargar la base")
+    with publicar_cubo() as compartido:
+        for procesos in lista_procesos:
+            for nombre, funcion in [('compartido', _arranque_compartido), ('recargando', _arranque_recargando)]:
+                with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+                    resultados = list(ejecutor.map(funcion, [compartido.nombre] * procesos, range(procesos)))
+                por_proceso = {pid: (t, kb) for pid, t, kb in resultados}
+                tiempos = [t for t, _ in por_proceso.values()]
+                memoria = [kb for _, kb in por_proceso.values() if kb is not None]
+                print(f"   • {procesos} procesos, {nombre}: {np.mean(tiempos) * 1000:.1f} ms por trabajador"
+                      + (f", +{np.mean(memoria) / 1024:.1f} MB privados" if memoria else ""))
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_cubo_compartido()
+    else:
+        with publicar_cubo() as compartido:
+            cubo = adjuntar_cubo(compartido.nombre)
+            print(f"✅ Cubo publicado en '{compartido.nombre}': {cubo['valores'].shape} "
+                  f"({cubo['valores'].nbytes / 1024 ** 2:.1f} MB)")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cubo mensual de incidencia delictiva federal (IDEFF) desde 2012
+Lee la base original (data/IDEFF_jul25.csv) y la lleva a un arreglo
+valores[clave_entidad, delito, mes], donde:
+  - clave_entidad es la clave INEGI (entidades.py; 33 = Extranjero)
+  - delito es cada combinación LEY → CONCEPTO → TIPO, en el orden de la fuente
+  - mes es consecutivo desde enero del primer año (NaN = mes no publicado o serie inexistente)
+Los análisis de series (anomalías, pronósticos, rankings, jerarquía) parten de este cubo.
+El cubo se arma desde el lector rápido (lector_ideff.py) sin pasar por un DataFrame.
+"""
+
+import numpy as np
+import pandas as pd
+
+from entidades import N_CLAVES, SIN_ENTIDAD, codigos_entidad, nombre_entidad
+from lector_ideff import IDEFF_ORIGINAL, MESES, leer_ideff_rapido
+
+DIMENSIONES = ['LEY', 'CONCEPTO', 'TIPO']
+
+
+def leer_ideff(archivo=IDEFF_ORIGINAL):
+    df = pd.read_csv(archivo, encoding='latin-1')
+    # La primera columna es el año ('AÑO' en la fuente)
+    return df.rename(columns={df.columns[0]: 'AÑO'})
+
+
+def _armar_cubo(anios, claves, codigos_delito, delitos, meses_fila):
+    anio_inicial = int(anios.min())
+    n_anios = int(anios.max()) - anio_inicial + 1
+
+    valores = np.full((N_CLAVES, len(delitos), n_anios, 12), np.nan)
+    filas = claves != SIN_ENTIDAD
+    valores[claves[filas], codigos_delito[filas], anios[filas] - anio_inicial] = meses_fila[filas]
+
+    meses = [f'{anio_inicial + m // 12:04d}-{m % 12 + 1:02d}' for m in range(n_anios * 12)]
+    return {
+        'valores': valores.reshape(N_CLAVES, len(delitos), n_anios * 12),
+        'delitos': [tuple(d) for d in delitos],
+        'anio_inicial': anio_inicial,
+        'meses': meses,
+    }
+
+
+def cubo_desde_lectura(lectura):
+    """
+    Cubo {valores, delitos, anio_inicial, meses} desde el resultado de lector_ideff.leer_ideff_rapido.
+    valores: [N_CLAVES, delito, mes] float con NaN; delitos: lista de (LEY, CONCEPTO, TIPO)
+    """
+    # Las cabezas (INEGI, ENTIDAD, LEY, CONCEPTO, TIPO) vienen en orden de aparición,
+    # así que factorizarlas conserva el orden de delitos de la fuente
+    cabezas = lectura['cabezas']
+    claves_cabeza = codigos_entidad(pd.Series([c[1] for c in cabezas]))
+    delito_cabeza, delitos = pd.factorize(pd.MultiIndex.from_tuples([c[2:] for c in cabezas]))
+    codigos = lectura['codigos']
+    meses_fila = np.where(lectura['publicado'], lectura['meses'], np.nan)
+    return _armar_cubo(lectura['anios'].astype(np.int64), claves_cabeza[codigos], delito_cabeza[codigos],
+                       delitos, meses_fila)
+
+
+def cargar_cubo(archivo=IDEFF_ORIGINAL):
+    return cubo_desde_lectura(leer_ideff_rapido(archivo))
+
+
+def meses_publicados(cubo):
+    """Máscara de meses con al menos un dato publicado"""
+    return ~np.isnan(cubo['valores']).all(axis=(0, 1))
+
+
+def series_del_cubo(cubo):
+    """
+    Matriz [serie, mes] con las combinaciones entidad × delito que tienen algún dato.
+    Devuelve (matriz, claves, codigos_delito) con la clave y el delito de cada serie.
+    """
+    valores = cubo['valores']
+    existe = ~np.isnan(valores).all(axis=2)
+    claves, codigos_delito = np.nonzero(existe)
+    return valores[claves, codigos_delito], claves.astype(np.int16), codigos_delito.astype(np.int16)
+
+
+def etiquetas_series(cubo, claves, codigos_delito):
+    """DataFrame clave_entidad, ENTIDAD, LEY, CONCEPTO, TIPO para cada serie"""
+    etiquetas = pd.DataFrame([cubo['delitos'][d] for d in codigos_delito], columns=DIMENSIONES)
+    etiquetas.insert(0, 'ENTIDAD', [nombre_entidad(c) for c in claves])
+    etiquetas.insert(0, 'clave_entidad', claves)
+    return etiquetas
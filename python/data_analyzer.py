@@ -70,4 +70,5 @@ def generate_stats_json():
     return None
 
 if __name__ == "__main__":
-    generate_stats_json()
\ No newline at end of file
+    if generate_stats_json() is None:
+        exit(1)
\ No newline at end of file
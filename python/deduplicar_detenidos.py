@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para detectar detenidos duplicados entre conferencias del Gabinete de Seguridad
+La misma persona puede anunciarse en varias conferencias con nombres ligeramente distintos.
+Para no comparar todos contra todos (O(n²)) se agrupan los registros en bloques por
+estado de detención + primer nombre, y dentro de cada bloque solo se comparan los registros
+cuya fecha de detención difiere en a lo más VENTANA_DIAS (ventana deslizante sobre fechas ordenadas).
+Salidas:
+  - data/detenidos_clusters.csv: cluster_id por registro
+  - data/detenidos_deduplicados.csv: un registro por persona con sus menciones
+"""
+
+import re
+import sys
+import time
+import numpy as np
+import pandas as pd
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from normalizacion_texto import normalizar_texto
+
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+CLUSTERS_FILE = Path('data/detenidos_clusters.csv')
+DEDUPLICADOS_FILE = Path('data/detenidos_deduplicados.csv')
+
+VENTANA_DIAS = 15
+UMBRAL_SIMILITUD = 0.85
+
+# Nombres que no identifican a una persona ('Otra persona 3', '5 personas', 'Identidad desconocida')
+PATRON_GENERICO = re.compile(r'^(\d|otra persona|identidad desconocida)')
+# 'N' de los apellidos reservados y comillas
+PATRON_MARCA_N = re.compile(r'[“”"]|\bn\b')
+
+
+def clave_nombre(nombre):
+    """'José Luis “N”' → 'jose luis'; nombres genéricos → ''"""
+    texto = normalizar_texto(nombre)
+    if not texto or PATRON_GENERICO.match(texto):
+        return ''
+    return ' '.join(PATRON_MARCA_N.sub(' ', texto).split())
+
+
+def claves_alias(alias):
+    """'El Cuza, El Cha' → {'el cuza', 'el cha'}"""
+    return {' '.join(PATRON_MARCA_N.sub(' ', a).split()) for a in normalizar_texto(alias).split(',')} - {''}
+
+
+def preparar_registros(df):
+    """Columnas de bloqueo y comparación calculadas una vez (vectorizado sobre valores únicos)"""
+    nombres = df['detainee_name'].fillna('')
+    unicos = pd.unique(nombres)
+    claves = dict(zip(unicos, map(clave_nombre, unicos)))
+    registros = pd.DataFrame({
+        'nombre_clave': nombres.map(claves),
+        'estado_clave': df['state_of_arrest'].fillna('').map(normalizar_texto),
+        'grupo': df['criminal_group'].fillna(''),
+        'original_row_id': df['original_row_id'],
+        'alias': df['detainee_alias'].fillna('').map(claves_alias),
+    }, index=df.index)
+    registros['primer_nombre'] = registros['nombre_clave'].str.split().str[0].fillna('')
+    registros['palabras_nombre'] = registros['nombre_clave'].str.split().str.len().fillna(0).astype(int)
+    # Fecha de detención; si no se reportó, la de la conferencia
+    fecha = pd.to_datetime(df['date_of_arrest'], errors='coerce').fillna(
+        pd.to_datetime(df['conference_date'], errors='coerce'))
+    registros['dia'] = (fecha - pd.Timestamp('1970-01-01')).dt.days
+    return registros
+
+
+def similitud(a, b):
+    """
+    Similitud de nombres (0..1); un alias en común cuenta como coincidencia total.
+    Un nombre de una sola palabra ('Pedro "N"' → 'pedro') no identifica a nadie por sí solo:
+    sin alias en común solo se compara si ambos registros tienen el mismo grupo criminal.
+    """
+    if a['alias'] & b['alias']:
+        return 1.0
+    if min(a['palabras_nombre'], b['palabras_nombre']) < 2 and not (a['grupo'] and a['grupo'] == b['grupo']):
+        return 0.0
+    return SequenceMatcher(None, a['nombre_clave'], b['nombre_clave']).ratio()
+
+
+def pares_candidatos(registros, ventana_dias=VENTANA_DIAS):
+    """
+    Genera (i, j) a comparar: mismo bloque (estado, primer nombre) y |día_i - día_j| <= ventana.
+    Los registros de la misma fila de la hoja son personas distintas y no se comparan; los que
+    no tienen estado no forman bloque.
+    """
+    validos = registros[
+        (registros['primer_nombre'] != '') & (registros['estado_clave'] != '') & registros['dia'].notna()
+    ]
+    for _, bloque in validos.groupby(['estado_clave', 'primer_nombre'], sort=False):
+        if len(bloque) < 2:
+            continue
+        bloque = bloque.sort_values('dia', kind='stable')
+        dias = bloque['dia'].to_numpy()
+        indices = bloque.index.to_numpy()
+        filas = bloque['original_row_id'].to_numpy()
+        # Fin de la ventana de cada registro con búsqueda binaria sobre las fechas ordenadas
+        fin = np.searchsorted(dias, dias + ventana_dias, side='right')
+        for p in range(len(bloque)):
+            for q in range(p + 1, fin[p]):
+                if filas[p] != filas[q]:
+                    yield indices[p], indices[q]
+
+
+class UnionFind:
+    """
+    Conjuntos disjuntos con compresión de caminos; el representante es el índice menor.
+    Cada raíz guarda los grupos criminales de su conjunto para no encadenar A–B–C
+    cuando A y C pertenecen a grupos distintos.
+    """
+
+    def __init__(self, elementos, grupos=None):
+        self.padre = {e: e for e in elementos}
+        grupos = grupos or {}
+        self.grupos = {e: {grupos[e]} if grupos.get(e) else set() for e in self.padre}
+
+    def raiz(self, e):
+        while self.padre[e] != e:
+            self.padre[e] = self.padre[self.padre[e]]
+            e = self.padre[e]
+        return e
+
+    def unir(self, a, b):
+        """Une los conjuntos de a y b; devuelve False si mezclaría grupos criminales distintos"""
+        ra, rb = self.raiz(a), self.raiz(b)
+        if ra == rb:
+            return True
+        if len(self.grupos[ra] | self.grupos[rb]) > 1:
+            return False
+        menor, mayor = min(ra, rb), max(ra, rb)
+        self.padre[mayor] = menor
+        self.grupos[menor] |= self.grupos.pop(mayor)
+        return True
+
+
+def detectar_duplicados(df, ventana_dias=VENTANA_DIAS, umbral=UMBRAL_SIMILITUD):
+    """
+    Devuelve (cluster_id por registro alineado con df, DataFrame de pares unidos con su similitud).
+    Dos registros se unen si comparten bloque, caen en la ventana de fechas, su similitud supera
+    el umbral y el cluster resultante no mezcla grupos criminales distintos.
+    """
+    registros = preparar_registros(df)
+    datos = registros.to_dict('index')
+    conjuntos = UnionFind(df.index, registros['grupo'].to_dict())
+    pares = []
+    for i, j in pares_candidatos(registros, ventana_dias):
+        a, b = datos[i], datos[j]
+        if a['grupo'] and b['grupo'] and a['grupo'] != b['grupo']:
+            continue
+        puntaje = similitud(a, b)
+        if puntaje >= umbral and conjuntos.unir(i, j):
+            pares.append((i, j, round(puntaje, 3)))
+    cluster_id = pd.Series([conjuntos.raiz(i) for i in df.index], index=df.index, name='cluster_id')
+    return cluster_id, pd.DataFrame(pares, columns=['registro_a', 'registro_b', 'similitud'])
+
+
+def vista_deduplicada(df, cluster_id):
+    """Un registro por cluster (la primera mención) con número de menciones y conferencias"""
+    con_cluster = df.assign(cluster_id=cluster_id)
+    resumen = con_cluster.groupby('cluster_id').agg(
+        menciones=('conference_id', 'size'),
+        conferencias=('conference_id', lambda c: ', '.join(map(str, pd.unique(c)))),
+    )
+    primeros = con_cluster.drop_duplicates('cluster_id').set_index('cluster_id')
+    return primeros.join(resumen).reset_index()
+
+
+def deduplicar_detenidos():
+    """Detecta duplicados entre conferencias y guarda clusters y vista deduplicada"""
+
+    try:
+        print("🔄 Detectando detenidos duplicados entre conferencias...")
+
+        df = pd.read_csv(CSV_DETENIDOS, encoding='utf-8')
+        print(f"✅ CSV leído: {len(df)} filas")
+
+        cluster_id, pares = detectar_duplicados(df)
+
+        clusters = df[['conference_id', 'original_row_id', 'detainee_name', 'detainee_alias',
+                       'state_of_arrest', 'date_of_arrest']].copy()
+        clusters.insert(0, 'registro', df.index)
+        clusters['cluster_id'] = cluster_id
+        clusters['es_representante'] = clusters['registro'] == clusters['cluster_id']
+        clusters.to_csv(CLUSTERS_FILE, index=False, encoding='utf-8')
+        print(f"💾 Clusters guardados en: {CLUSTERS_FILE}")
+
+        deduplicados = vista_deduplicada(df, cluster_id)
+        deduplicados.to_csv(DEDUPLICADOS_FILE, index=False, encoding='utf-8')
+        print(f"💾 Vista deduplicada guardada en: {DEDUPLICADOS_FILE}")
+
+        print(f"\n📊 RESUMEN:")
+        print(f"   • Registros: {len(df)}")
+        print(f"   • Personas únicas: {len(deduplicados)}")
+        print(f"   • Registros duplicados: {len(df) - len(deduplicados)}")
+        for _, par in pares.iterrows():
+            a, b = df.loc[par['registro_a']], df.loc[par['registro_b']]
+            print(f"   • {a['detainee_name']} (conf. {a['conference_id']}) ≈ "
+                  f"{b['detainee_name']} (conf. {b['conference_id']}): {par['similitud']}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error detectando duplicados: {e}")
+        return False
+
+
+def benchmark_deduplicacion(n_filas=100_000):
+    """Mide la detección sobre n_filas sintéticas con nombres, estados y fechas aleatorios"""
+    df = pd.read_csv(CSV_DETENIDOS, encoding='utf-8')
+    rng = np.random.default_rng(0)
+    primeros = pd.Series(df['detainee_name'].map(clave_nombre).str.split().str[0].dropna().unique()).str.title()
+    silabas = pd.Series(['ra', 'mo', 'li', 'sa', 'ne', 'to', 'gu', 'be', 'ca', 'di'])
+    segundos = (silabas.sample(2000, replace=True, random_state=1).values
+                + silabas.sample(2000, replace=True, random_state=2).values
+                + silabas.sample(2000, replace=True, random_state=3).values)
+    nombres = (primeros.values[rng.integers(0, len(primeros), n_filas)] + ' '
+               + pd.Series(segundos).str.title().values[rng.integers(0, len(segundos), n_filas)] + ' "N"')
+    dias = rng.integers(0, 5 * 365, n_filas)
+    df_sintetico = pd.DataFrame({
+        'conference_id': rng.integers(1, 1000, n_filas),
+        'conference_date': (pd.Timestamp('2020-01-01') + pd.to_timedelta(dias + 5, 'D')).strftime('%Y-%m-%d'),
+        'detainee_name': nombres,
+        'detainee_alias': '',
+        'criminal_group': '',
+        'date_of_arrest': (pd.Timestamp('2020-01-01') + pd.to_timedelta(dias, 'D')).strftime('%Y-%m-%d'),
+        'state_of_arrest': rng.choice(df['state_of_arrest'].dropna().unique(), n_filas),
+        'original_row_id': np.arange(n_filas),
+    })
+
+    inicio = time.perf_counter()
+    cluster_id, pares = detectar_duplicados(df_sintetico)
+    duracion = time.perf_counter() - inicio
+
+    print(f"⏱️  Deduplicación de {n_filas:,} filas: {duracion:.2f} s "
+          f"({len(pares):,} pares unidos, {cluster_id.nunique():,} clusters)")
+    return duracion
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_deduplicacion()
+    else:
+        if not deduplicar_detenidos():
+            sys.exit(1)
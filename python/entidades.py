@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice canónico de entidades federativas
+Cada fuente escribe los estados de forma distinta:
+  - IDEFF: 'CIUDAD DE MEXICO', 'MEXICO', 'COAHUILA' (mayúsculas sin acentos)
+  - Gabinete: 'Ciudad de México', 'Estado de México', 'CDMX', 'Natyarit' (y varios estados por fila)
+  - GeoJSON (NOMGEO): 'México', 'Coahuila de Zaragoza', 'Veracruz de Ignacio de la Llave'
+Todas se resuelven a la clave INEGI (1-32) con el mismo índice, construido una sola vez al importar.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+from normalizacion_texto import normalizar_texto
+
+# Clave INEGI → nombre canónico
+ENTIDADES = {
+    1: 'Aguascalientes',
+    2: 'Baja California',
+    3: 'Baja California Sur',
+    4: 'Campeche',
+    5: 'Coahuila',
+    6: 'Colima',
+    7: 'Chiapas',
+    8: 'Chihuahua',
+    9: 'Ciudad de México',
+    10: 'Durango',
+    11: 'Guanajuato',
+    12: 'Guerrero',
+    13: 'Hidalgo',
+    14: 'Jalisco',
+    15: 'Estado de México',
+    16: 'Michoacán',
+    17: 'Morelos',
+    18: 'Nayarit',
+    19: 'Nuevo León',
+    20: 'Oaxaca',
+    21: 'Puebla',
+    22: 'Querétaro',
+    23: 'Quintana Roo',
+    24: 'San Luis Potosí',
+    25: 'Sinaloa',
+    26: 'Sonora',
+    27: 'Tabasco',
+    28: 'Tamaulipas',
+    29: 'Tlaxcala',
+    30: 'Veracruz',
+    31: 'Yucatán',
+    32: 'Zacatecas',
+}
+
+# IDEFF reporta delitos cometidos fuera del país como una entidad más (sin clave INEGI)
+CLAVE_EXTRANJERO = 33
+SIN_ENTIDAD = -1
+
+# Tamaño de los arreglos indexados directamente por clave (0 no se usa)
+N_CLAVES = CLAVE_EXTRANJERO + 1
+
+# Variantes adicionales (ya normalizadas: minúsculas, sin acentos) → clave
+ALIAS_ENTIDADES = {
+    'mexico': 15,
+    'edomex': 15,
+    'edo mex': 15,
+    'edo de mexico': 15,
+    'estado de mexico': 15,
+    'cdmx': 9,
+    'df': 9,
+    'distrito federal': 9,
+    'coahuila de zaragoza': 5,
+    'michoacan de ocampo': 16,
+    'veracruz de ignacio de la llave': 30,
+    'natyarit': 18,
+    'extranjero': CLAVE_EXTRANJERO,
+}
+
+# Separadores entre estados en una misma celda ('Michoacán y Veracruz', 'Puebla, Tlaxcala')
+PATRON_SEPARADOR = re.compile(r',|\s+y\s+|/')
+PATRON_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def plegar(texto):
+    """'  Nuevo León ' → 'nuevo leon' (minúsculas, sin acentos, sin puntuación)"""
+    return ' '.join(PATRON_NO_ALFANUMERICO.sub(' ', normalizar_texto(texto)).split())
+
+
+def _construir_indice():
+    indice = {plegar(nombre): clave for clave, nombre in ENTIDADES.items()}
+    indice.update(ALIAS_ENTIDADES)
+    return indice
+
+
+INDICE_ENTIDADES = _construir_indice()
+
+
+def clave_entidad(texto):
+    """Clave INEGI de un nombre de entidad en cualquiera de sus variantes (SIN_ENTIDAD si no se reconoce)"""
+    return INDICE_ENTIDADES.get(plegar(texto), SIN_ENTIDAD)
+
+
+def claves_entidades(texto):
+    """Claves de todas las entidades de una celda con varios estados, en orden y sin repetir"""
+    claves = []
+    for fragmento in PATRON_SEPARADOR.split(normalizar_texto(texto)):
+        clave = clave_entidad(fragmento)
+        if clave != SIN_ENTIDAD and clave not in claves:
+            claves.append(clave)
+    return claves
+
+
+def codigos_entidad(serie):
+    """Clave por fila (int16); cada texto distinto se resuelve una sola vez"""
+    codigos, unicos = pd.factorize(serie)
+    claves_unicas = np.array([clave_entidad(t) for t in unicos], dtype=np.int16)
+    return np.where(codigos >= 0, claves_unicas[codigos], SIN_ENTIDAD).astype(np.int16)
+
+
+def expandir_entidades(df, columna):
+    """
+    Una fila por (fila original, entidad) para celdas con varios estados.
+    Agrega la columna 'clave_entidad'; las filas sin entidad reconocida se descartan.
+    """
+    unicos = pd.unique(df[columna].dropna())
+    claves = {texto: claves_entidades(texto) for texto in unicos}
+    expandido = df.assign(clave_entidad=df[columna].map(claves)).explode('clave_entidad')
+    expandido = expandido[expandido['clave_entidad'].notna()]
+    return expandido.astype({'clave_entidad': np.int16})
+
+
+def nombre_entidad(clave):
+    if clave == CLAVE_EXTRANJERO:
+        return 'Extranjero'
+    return ENTIDADES.get(int(clave), 'Sin entidad')
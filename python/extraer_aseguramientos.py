@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para extraer cantidades estructuradas de los aseguramientos (items_seized)
+Separa las viñetas '—', identifica cantidad, unidad y artículo/sustancia y normaliza unidades
+Genera una tabla larga de aseguramientos y agregados por estado × mes × artículo
+"""
+
+import re
+import sys
+import time
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+from normalizacion_texto import quitar_acentos
+
+# Cantidad: número con separador de miles, decimal o expresión en palabras
+# ("Un", "Mil", "4 mil", "Un millón 197 mil 750")
+PATRON_ASEGURAMIENTO = re.compile(
+    r'^(?:(?:mas de|aproximadamente|alrededor de|cerca de)\s+)?'
+    r'(?P<cantidad>(?:(?:\d[\d,]*(?:\.\d+)?|un|una|uno)\s*(?:millon(?:es)?\s*)?(?:\d[\d,]*\s*)?(?:mil\s*)?(?:\d[\d,]*)?'
+    r'|mil(?:\s+\d+)?))?\s*'
+    r'(?P<unidad>kilogramos?|kilos?|kgs?\.?|gramos?|grs?\.?|toneladas?|litros?|lts?\.?|dosis|pastillas|pastilla)?(?![a-z])\s*'
+    r'(?:de\s+)?(?P<articulo>.*)$'
+)
+
+# Unidad de medida → (unidad normalizada, factor)
+UNIDADES = {
+    'kilogramo': ('kg', 1.0), 'kilogramos': ('kg', 1.0), 'kilo': ('kg', 1.0), 'kilos': ('kg', 1.0),
+    'kg': ('kg', 1.0), 'kg.': ('kg', 1.0), 'kgs': ('kg', 1.0), 'kgs.': ('kg', 1.0),
+    'gramo': ('kg', 0.001), 'gramos': ('kg', 0.001), 'gr': ('kg', 0.001), 'gr.': ('kg', 0.001),
+    'grs': ('kg', 0.001), 'grs.': ('kg', 0.001),
+    'tonelada': ('kg', 1000.0), 'toneladas': ('kg', 1000.0),
+    'litro': ('litros', 1.0), 'litros': ('litros', 1.0), 'lt': ('litros', 1.0), 'lt.': ('litros', 1.0),
+    'lts': ('litros', 1.0), 'lts.': ('litros', 1.0),
+    'dosis': ('dosis', 1.0),
+    'pastilla': ('pastillas', 1.0), 'pastillas': ('pastillas', 1.0),
+}
+
+# Artículo normalizado: (patrón sobre el texto sin acentos, artículo, categoría)
+# El orden importa: gana el primer patrón que coincide ("laboratorio ... de metanfetamina" es un
+# laboratorio, "réplicas de armas largas" no son armas)
+ARTICULOS = [
+    (r'laboratorio', 'laboratorios', 'infraestructura'),
+    (r'replica', 'réplicas de armas', 'otros'),
+    (r'fe?n?ta?nilo|fetanilo', 'fentanilo', 'droga'),
+    (r'meta?n?fetamina|metafetamina|mentanfetamina|cristal', 'metanfetamina', 'droga'),
+    (r'cocaina', 'cocaína', 'droga'),
+    (r'marihuana|mariguana', 'marihuana', 'droga'),
+    (r'heroina', 'heroína', 'droga'),
+    (r'precursor', 'precursores químicos', 'droga'),
+    (r'droga|narcotico|estupefaciente', 'droga (sin especificar)', 'droga'),
+    (r'hidrocarburo|combustible|gasolina|diesel', 'hidrocarburo', 'hidrocarburo'),
+    (r'arma[s]? corta|pistola', 'armas cortas', 'arma'),
+    (r'arma[s]? (?:de fuego )?larga|fusil|rifle|ametralladora|barret', 'armas largas', 'arma'),
+    (r'lanzagranada|granada|explosivo', 'explosivos', 'arma'),
+    (r'arma', 'armas (sin especificar)', 'arma'),
+    (r'cartucho|municion', 'cartuchos', 'equipo'),
+    (r'cargador', 'cargadores', 'equipo'),
+    (r'chaleco|equipo tactico|casco', 'equipo táctico', 'equipo'),
+    (r'celular|telefon|radio', 'equipos de comunicación', 'equipo'),
+    (r'vehiculo|camioneta|motocicleta|cuatrimoto|tractocamion|automovil|monstruo', 'vehículos', 'vehículo'),
+    (r'dolar', 'dinero (dólares)', 'dinero'),
+    (r'pesos|dinero|efectivo', 'dinero', 'dinero'),
+]
+
+# Símbolos de moneda antes de la cantidad ('$800,000 pesos', 'US$ 20,000')
+PATRON_MONEDA = re.compile(r'(?:us|mxn)?\$\s*')
+
+ARTICULOS_COMPILADOS = [(re.compile(patron), articulo, categoria) for patron, articulo, categoria in ARTICULOS]
+
+# Sin unidad de medida explícita: armas y dinero tienen su propia unidad, lo demás se cuenta en piezas
+UNIDAD_SIN_MEDIDA = {'armas cortas': 'armas', 'armas largas': 'armas', 'explosivos': 'armas',
+                     'armas (sin especificar)': 'armas', 'dinero': 'pesos', 'dinero (dólares)': 'dólares'}
+
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+OUTPUT_LARGO = Path('data/aseguramientos_detalle.csv')
+OUTPUT_AGREGADO = Path('data/aseguramientos_estado_mes.csv')
+
+
+def convertir_cantidad(texto):
+    """Convierte la expresión de cantidad a número ('40,540' → 40540, 'Un millón 197 mil 750' → 1197750)"""
+    if not texto:
+        return np.nan
+    texto = texto.strip()
+    palabras = re.findall(r'\d[\d,]*(?:\.\d+)?|millon(?:es)?|mil|una?|uno', texto)
+    total = 0.0
+    actual = 0.0
+    for palabra in palabras:
+        if palabra in ('un', 'una', 'uno'):
+            actual = 1.0
+        elif palabra.startswith('millon'):
+            total += (actual or 1.0) * 1_000_000
+            actual = 0.0
+        elif palabra == 'mil':
+            total += (actual or 1.0) * 1_000
+            actual = 0.0
+        else:
+            # La coma en estas fuentes siempre es separador de miles
+            actual = float(palabra.replace(',', ''))
+    total += actual
+    return total if palabras else np.nan
+
+
+def clasificar_articulo(texto):
+    """Devuelve (artículo normalizado, categoría) para el texto del artículo"""
+    for patron, articulo, categoria in ARTICULOS_COMPILADOS:
+        if patron.search(texto):
+            return articulo, categoria
+    return 'otros', 'otros'
+
+
+def _parsear_vinetas_unicas(vinetas_unicas):
+    """Parsea cada texto de viñeta distinto una sola vez (cantidad, unidad, artículo)"""
+    normalizado = pd.Series([PATRON_MONEDA.sub('', quitar_acentos(t).lower()) for t in vinetas_unicas], dtype=object)
+    partes = normalizado.str.extract(PATRON_ASEGURAMIENTO)
+
+    unidades = partes['unidad'].fillna('').str.rstrip()
+    unidad_factor = unidades.map(lambda u: UNIDADES.get(u, (None, 1.0)))
+    # El artículo se clasifica sobre todo el texto para no perder "kilos de fentanilo"
+    clasificados = normalizado.map(clasificar_articulo)
+
+    parseado = pd.DataFrame({
+        'cantidad': partes['cantidad'].fillna('').map(convertir_cantidad),
+        'unidad_original': unidades,
+        'articulo': clasificados.str[0],
+        'categoria': clasificados.str[1],
+    })
+    piezas = parseado['articulo'].map(UNIDAD_SIN_MEDIDA).fillna('piezas')
+    parseado['unidad'] = unidad_factor.str[0].fillna(piezas)
+    parseado['cantidad_normalizada'] = parseado['cantidad'] * unidad_factor.str[1]
+    return parseado
+
+
+def extraer_aseguramientos(df):
+    """
+    Extrae la tabla larga de aseguramientos de un DataFrame con items_seized.
+    Las filas con el mismo original_row_id comparten aseguramientos (una fila de
+    la hoja con varios detenidos), por lo que se cuentan una sola vez.
+    """
+    columnas_base = ['original_row_id', 'conference_id', 'conference_date', 'date_of_arrest', 'state_of_arrest']
+    df_base = df.drop_duplicates('original_row_id')[columnas_base + ['items_seized']]
+    df_base = df_base[df_base['items_seized'].notna()].copy()
+
+    # Mes de la detención (o de la conferencia si no hay fecha de detención)
+    fechas = pd.to_datetime(df_base['date_of_arrest'], errors='coerce')
+    fechas = fechas.fillna(pd.to_datetime(df_base['conference_date'], errors='coerce'))
+    df_base['mes'] = fechas.dt.strftime('%Y-%m')
+
+    # Una fila por viñeta
+    vinetas = df_base['items_seized'].str.split('—').explode().str.strip()
+    vinetas = vinetas[vinetas != '']
+    df_largo = df_base.loc[vinetas.index, columnas_base + ['mes']].reset_index(drop=True)
+    df_largo['texto_original'] = vinetas.values
+
+    # Los textos se repiten mucho ("Cargadores", "Un arma corta"): se parsean solo los distintos
+    codigos, vinetas_unicas = pd.factorize(vinetas)
+    parseado = _parsear_vinetas_unicas(vinetas_unicas)
+    for columna in parseado.columns:
+        df_largo[columna] = parseado[columna].values[codigos]
+
+    return df_largo
+
+
+def agregar_por_estado_mes(df_largo):
+    """Agrega cantidades por estado × mes × artículo × unidad"""
+    df_agregado = (
+        df_largo
+        .groupby(['state_of_arrest', 'mes', 'categoria', 'articulo', 'unidad'], dropna=False)
+        .agg(
+            menciones=('texto_original', 'size'),
+            menciones_con_cantidad=('cantidad_normalizada', 'count'),
+            cantidad_total=('cantidad_normalizada', 'sum'),
+        )
+        .reset_index()
+        .sort_values(['mes', 'state_of_arrest', 'categoria', 'articulo'])
+    )
+    df_agregado['cantidad_total'] = df_agregado['cantidad_total'].round(3)
+    return df_agregado
+
+
+def crear_analisis_aseguramientos():
+    """Genera la tabla larga de aseguramientos y sus agregados por estado y mes"""
+
+    try:
+        print("🔄 Extrayendo aseguramientos de items_seized...")
+
+        df = pd.read_csv(CSV_DETENIDOS, encoding='utf-8')
+        print(f"✅ CSV leído: {len(df)} filas")
+
+        df_largo = extraer_aseguramientos(df)
+        print(f"✅ Aseguramientos extraídos: {len(df_largo)} viñetas")
+        print(f"   • Con cantidad: {df_largo['cantidad'].notna().sum()}")
+        print(f"   • Sin clasificar: {(df_largo['articulo'] == 'otros').sum()}")
+
+        df_largo.to_csv(OUTPUT_LARGO, index=False, encoding='utf-8')
+        print(f"💾 Tabla larga guardada en: {OUTPUT_LARGO}")
+
+        df_agregado = agregar_por_estado_mes(df_largo)
+        df_agregado.to_csv(OUTPUT_AGREGADO, index=False, encoding='utf-8')
+        print(f"💾 Agregados estado × mes guardados en: {OUTPUT_AGREGADO}")
+
+        # Totales por artículo y unidad
+        print("\n📊 TOTALES POR ARTÍCULO:")
+        totales = df_largo.groupby(['articulo', 'unidad'])['cantidad_normalizada'].sum().sort_values(ascending=False)
+        for (articulo, unidad), total in totales.head(15).items():
+            print(f"   • {articulo}: {total:,.1f} {unidad}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error extrayendo aseguramientos: {e}")
+        return False
+
+
+def benchmark_extraccion(n_filas=100_000):
+    """Mide la extracción sobre un archivo sintético de n_filas remuestreado del real"""
+    df = pd.read_csv(CSV_DETENIDOS, encoding='utf-8')
+    df_sintetico = df.sample(n=n_filas, replace=True, random_state=0).reset_index(drop=True)
+    # Cada fila sintética es una fila distinta de la hoja
+    df_sintetico['original_row_id'] = np.arange(n_filas)
+
+    inicio = time.perf_counter()
+    df_largo = extraer_aseguramientos(df_sintetico)
+    agregar_por_estado_mes(df_largo)
+    duracion = time.perf_counter() - inicio
+
+    print(f"⏱️  Extracción de {n_filas:,} filas ({len(df_largo):,} viñetas): {duracion:.2f} s "
+          f"({n_filas / duracion:,.0f} filas/s)")
+    return duracion
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_extraccion()
+    else:
+        if not crear_analisis_aseguramientos():
+            sys.exit(1)
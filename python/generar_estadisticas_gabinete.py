@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para generar en una sola pasada todas las estadísticas del Gabinete de Seguridad:
+  - data/gabinete_age_stats.json
+  - data/gabinete_extradition_stats.json
+  - data/gabinete_criminal_groups_stats.json
+  - data/all_criminal_groups.json
+Lee gabinete_detenidos_final.csv una vez con columnas tipadas y acumula todo en un estado
+persistido; cuando solo se agregan filas nuevas al final del CSV, procesa únicamente esas filas
+"""
+
+import csv
+import io
+import sys
+import json
+import math
+import hashlib
+import numpy as np
+from collections import Counter
+from datetime import date
+from pathlib import Path
+
+from jerarquia_grupos import RANGOS_EDAD, cargar_overrides, analisis_grupos_json
+
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+ESTADO_FILE = Path('data/gabinete_estadisticas_estado.json')
+EDAD_FILE = Path('data/gabinete_age_stats.json')
+EXTRADICION_FILE = Path('data/gabinete_extradition_stats.json')
+GRUPOS_STATS_FILE = Path('data/gabinete_criminal_groups_stats.json')
+ALL_GRUPOS_FILE = Path('data/all_criminal_groups.json')
+
+VERSION_ESTADO = 3
+
+# Tamaño de bloque al calcular la huella del tramo ya procesado
+TAMANO_BLOQUE_HUELLA = 1 << 20
+
+SIN_ESPECIFICAR = 'No especificado'
+
+
+def parsear_fecha(texto):
+    """'2024-10-29' → date; vacío o inválido → None"""
+    try:
+        return date.fromisoformat(texto.strip()) if texto else None
+    except ValueError:
+        return None
+
+
+def parsear_edad(texto):
+    """Edad como entero; vacío o inválido → None"""
+    try:
+        edad = float(texto)
+    except (TypeError, ValueError):
+        return None
+    return int(edad) if not math.isnan(edad) else None
+
+
+def parsear_extradicion(texto):
+    """'Sí' → True, 'No' → False, otro → None"""
+    texto = (texto or '').strip()
+    if texto == 'Sí':
+        return True
+    if texto == 'No':
+        return False
+    return None
+
+
+def filas_tipadas(lector):
+    """Convierte cada fila del CSV a los tipos usados por los acumuladores"""
+    for fila in lector:
+        yield {
+            'conference_id': fila.get('conference_id', ''),
+            'original_row_id': int(fila['original_row_id']) if fila.get('original_row_id') else None,
+            'conference_date': parsear_fecha(fila.get('conference_date')),
+            'date_of_arrest': parsear_fecha(fila.get('date_of_arrest')),
+            'detainee_age': parsear_edad(fila.get('detainee_age')),
+            'criminal_group': (fila.get('criminal_group') or '').strip() or None,
+            'US_request_extradition': parsear_extradicion(fila.get('US_request_extradition')),
+        }
+
+
+class EstadisticasGabinete:
+    """Acumuladores de todas las estadísticas; se pueden ampliar con filas nuevas"""
+
+    def __init__(self):
+        self.total_registros = 0
+        self.edades = Counter()
+        self.extradicion = Counter()
+        # grupo → {'casos', 'si', 'no', 'edades': Counter}
+        self.grupos = {}
+        self.conferencias = set()
+        self.fecha_minima = None
+        self.fecha_maxima = None
+        # Marca de agua: mayor original_row_id ya acumulado
+        self.marca_agua = -1
+
+    def agregar(self, fila):
+        self.total_registros += 1
+        edad = fila['detainee_age']
+        if edad is not None:
+            self.edades[edad] += 1
+
+        extradicion = fila['US_request_extradition']
+        self.extradicion['Sí' if extradicion else ('No' if extradicion is False else SIN_ESPECIFICAR)] += 1
+
+        grupo = fila['criminal_group']
+        if grupo:
+            acumulado = self.grupos.setdefault(grupo, {'casos': 0, 'si': 0, 'no': 0, 'edades': Counter()})
+            acumulado['casos'] += 1
+            acumulado['si'] += extradicion is True
+            acumulado['no'] += extradicion is False
+            if edad is not None:
+                acumulado['edades'][edad] += 1
+
+        if fila['conference_id']:
+            self.conferencias.add(fila['conference_id'])
+        if fila['original_row_id'] is not None:
+            self.marca_agua = max(self.marca_agua, fila['original_row_id'])
+        fecha = fila['conference_date']
+        if fecha:
+            self.fecha_minima = min(self.fecha_minima or fecha, fecha)
+            self.fecha_maxima = max(self.fecha_maxima or fecha, fecha)
+
+    # ---- Resúmenes (mismo formato que los JSON existentes) ----
+
+    def resumen_edades(self):
+        valores = np.repeat(np.array(list(self.edades.keys()), dtype=float),
+                            np.array(list(self.edades.values()), dtype=int))
+        con_edad = len(valores)
+        rangos = {nombre: int(((valores >= minimo) & (valores < maximo)).sum()) for nombre, minimo, maximo in RANGOS_EDAD}
+        return {
+            'total_registros': self.total_registros,
+            'registros_con_edad': con_edad,
+            'registros_sin_edad': self.total_registros - con_edad,
+            'porcentaje_con_edad': round((con_edad / self.total_registros) * 100, 1) if self.total_registros else 0.0,
+            'promedio_edad': round(float(valores.mean()), 1) if con_edad else None,
+            'mediana_edad': round(float(np.median(valores)), 1) if con_edad else None,
+            'edad_minima': int(valores.min()) if con_edad else None,
+            'edad_maxima': int(valores.max()) if con_edad else None,
+            'desviacion_std': round(float(valores.std(ddof=1)), 1) if con_edad > 1 else None,
+            'distribución_rangos': rangos,
+            'distribución_rangos_porcentaje': {
+                nombre: round((casos / con_edad) * 100, 1) if con_edad else 0.0 for nombre, casos in rangos.items()
+            },
+        }
+
+    def resumen_extradicion(self):
+        total = self.total_registros
+        si = self.extradicion['Sí']
+        no = self.extradicion['No']
+        con_dato = si + no
+        sin_dato = self.extradicion[SIN_ESPECIFICAR]
+
+        distribucion_valida = dict(sorted({'No': no, 'Sí': si}.items(), key=lambda par: -par[1]))
+
+        def pct(valor, base):
+            return round((valor / base) * 100, 1) if base else 0.0
+
+        return {
+            'total_registros': total,
+            'registros_con_dato': con_dato,
+            'registros_sin_dato': sin_dato,
+            'porcentaje_con_dato': pct(con_dato, total),
+            'solicitudes_si': si,
+            'solicitudes_no': no,
+            'porcentaje_si_del_total': pct(si, total),
+            'porcentaje_no_del_total': pct(no, total),
+            'porcentaje_si_con_dato': pct(si, con_dato),
+            'porcentaje_no_con_dato': pct(no, con_dato),
+            'distribucion_completa': {**distribucion_valida, SIN_ESPECIFICAR: sin_dato},
+            'distribucion_valida': distribucion_valida,
+        }
+
+    def resumen_grupos(self):
+        casos = sorted(((g, a['casos']) for g, a in self.grupos.items()), key=lambda par: -par[1])
+        valores = np.array([c for _, c in casos])
+        con_grupo = int(valores.sum()) if len(valores) else 0
+        return {
+            'total_registros': self.total_registros,
+            'registros_con_grupo': con_grupo,
+            'registros_sin_grupo': self.total_registros - con_grupo,
+            'porcentaje_con_grupo': round((con_grupo / self.total_registros) * 100, 1) if self.total_registros else 0.0,
+            'grupos_unicos': len(casos),
+            'top_grupos': [[g, c] for g, c in casos[:10]],
+            'promedio_casos_por_grupo': round(float(valores.mean()), 1) if len(valores) else 0.0,
+            'mediana_casos_por_grupo': float(np.median(valores)) if len(valores) else 0.0,
+            'max_casos_grupo': int(valores.max()) if len(valores) else 0,
+            'min_casos_grupo': int(valores.min()) if len(valores) else 0,
+        }
+
+    def analisis_grupos(self):
+        """all_criminal_groups.json (ranking + jerarquía) desde los acumuladores por grupo"""
+        grupos = list(self.grupos)
+        agregados = {
+            'casos': np.array([self.grupos[g]['casos'] for g in grupos], dtype=np.int64),
+            'extradicion_si': np.array([self.grupos[g]['si'] for g in grupos], dtype=np.int64),
+            'extradicion_no': np.array([self.grupos[g]['no'] for g in grupos], dtype=np.int64),
+            'edad_conteo': np.array([sum(self.grupos[g]['edades'].values()) for g in grupos], dtype=np.int64),
+            'edad_suma': np.array([float(sum(e * c for e, c in self.grupos[g]['edades'].items())) for g in grupos]),
+            'edad_rangos': np.array([
+                [sum(c for e, c in self.grupos[g]['edades'].items() if minimo <= e < maximo)
+                 for _, minimo, maximo in RANGOS_EDAD]
+                for g in grupos
+            ], dtype=np.int64).reshape(len(grupos), len(RANGOS_EDAD)),
+        }
+        return analisis_grupos_json(grupos, agregados, cargar_overrides())
+
+    # ---- Persistencia ----
+
+    def a_dict(self):
+        return {
+            'total_registros': self.total_registros,
+            'edades': {str(e): c for e, c in sorted(self.edades.items())},
+            'extradicion': dict(self.extradicion),
+            'grupos': {
+                g: {'casos': a['casos'], 'si': a['si'], 'no': a['no'],
+                    'edades': {str(e): c for e, c in sorted(a['edades'].items())}}
+                for g, a in self.grupos.items()
+            },
+            'conferencias': sorted(self.conferencias, key=lambda c: (len(c), c)),
+            'fecha_minima': self.fecha_minima.isoformat() if self.fecha_minima else None,
+            'fecha_maxima': self.fecha_maxima.isoformat() if self.fecha_maxima else None,
+            'marca_agua': self.marca_agua,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        estadisticas = cls()
+        estadisticas.total_registros = datos['total_registros']
+        estadisticas.edades = Counter({int(e): c for e, c in datos['edades'].items()})
+        estadisticas.extradicion = Counter(datos['extradicion'])
+        estadisticas.grupos = {
+            g: {'casos': a['casos'], 'si': a['si'], 'no': a['no'],
+                'edades': Counter({int(e): c for e, c in a['edades'].items()})}
+            for g, a in datos['grupos'].items()
+        }
+        estadisticas.conferencias = set(datos['conferencias'])
+        estadisticas.fecha_minima = parsear_fecha(datos['fecha_minima'])
+        estadisticas.fecha_maxima = parsear_fecha(datos['fecha_maxima'])
+        estadisticas.marca_agua = datos['marca_agua']
+        return estadisticas
+
+
+def huella(f, offset):
+    """Hash de todos los bytes antes de offset (detecta cualquier reescritura del tramo procesado)"""
+    f.seek(0)
+    digest = hashlib.sha256()
+    pendientes = offset
+    while pendientes > 0:
+        bloque = f.read(min(TAMANO_BLOQUE_HUELLA, pendientes))
+        if not bloque:
+            break
+        digest.update(bloque)
+        pendientes -= len(bloque)
+    return digest.hexdigest()
+
+
+def cargar_estado(csv_file, f):
+    """
+    Estado previo si sigue siendo válido para el CSV actual; None si hay que recalcular:
+    no existe, cambió el encabezado, el archivo se acortó o se reescribió antes del avance
+    """
+    if not ESTADO_FILE.exists():
+        return None
+    with open(ESTADO_FILE, encoding='utf-8') as g:
+        estado = json.load(g)
+    if estado.get('version') != VERSION_ESTADO or estado.get('archivo') != str(csv_file):
+        return None
+    offset = estado['offset_bytes']
+    f.seek(0)
+    encabezado = f.readline()
+    if encabezado.decode('utf-8') != estado['encabezado']:
+        return None
+    if Path(csv_file).stat().st_size < offset or huella(f, offset) != estado['huella']:
+        return None
+    return estado
+
+
+def actualizar_estadisticas(csv_file=CSV_DETENIDOS, completo=False):
+    """
+    Pliega en el estado las filas que aún no se procesaron y devuelve
+    (EstadisticasGabinete, filas_nuevas, recalculo_completo)
+    """
+    with open(csv_file, 'rb') as f:
+        estado = None if completo else cargar_estado(csv_file, f)
+        f.seek(0)
+        encabezado = f.readline()
+        if estado is None:
+            estadisticas = EstadisticasGabinete()
+            offset = len(encabezado)
+        else:
+            estadisticas = EstadisticasGabinete.desde_dict(estado['estadisticas'])
+            offset = estado['offset_bytes']
+
+        # Solo los bytes nuevos; una última línea incompleta se deja para la siguiente vez
+        f.seek(offset)
+        nuevos = f.read()
+        fin = nuevos.rfind(b'\n') + 1
+        nuevos = nuevos[:fin]
+
+        columnas = next(csv.reader([encabezado.decode('utf-8')]))
+        lector = csv.DictReader(io.StringIO(nuevos.decode('utf-8'), newline=''), fieldnames=columnas)
+        filas_nuevas = 0
+        for fila in filas_tipadas(lector):
+            estadisticas.agregar(fila)
+            filas_nuevas += 1
+
+        offset += fin
+        nuevo_estado = {
+            'version': VERSION_ESTADO,
+            'archivo': str(csv_file),
+            'encabezado': encabezado.decode('utf-8'),
+            'offset_bytes': offset,
+            'huella': huella(f, offset),
+            'estadisticas': estadisticas.a_dict(),
+        }
+
+    with open(ESTADO_FILE, 'w', encoding='utf-8') as g:
+        json.dump(nuevo_estado, g, ensure_ascii=False)
+
+    return estadisticas, filas_nuevas, estado is None
+
+
+def recalcular_estadisticas(csv_file=CSV_DETENIDOS):
+    """Acumuladores desde la primera fila sin leer ni modificar el estado guardado"""
+    estadisticas = EstadisticasGabinete()
+    with open(csv_file, encoding='utf-8', newline='') as f:
+        for fila in filas_tipadas(csv.DictReader(f)):
+            estadisticas.agregar(fila)
+    return estadisticas
+
+
+def guardar_json(datos, archivo):
+    with open(archivo, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+def resumenes(estadisticas):
+    """{archivo: contenido} de los cuatro JSON de resumen"""
+    return {
+        EDAD_FILE: estadisticas.resumen_edades(),
+        EXTRADICION_FILE: estadisticas.resumen_extradicion(),
+        GRUPOS_STATS_FILE: estadisticas.resumen_grupos(),
+        ALL_GRUPOS_FILE: estadisticas.analisis_grupos(),
+    }
+
+
+def escribir_resumenes(estadisticas):
+    """Escribe los cuatro JSON de resumen a partir de los acumuladores"""
+    for archivo, datos in resumenes(estadisticas).items():
+        guardar_json(datos, archivo)
+
+
+def generar_estadisticas_gabinete(completo=False):
+    """Actualiza el estado con las filas nuevas y regenera todos los resúmenes"""
+
+    try:
+        print("🔄 Generando estadísticas del Gabinete de Seguridad...")
+
+        estadisticas, filas_nuevas, recalculo = actualizar_estadisticas(completo=completo)
+        modo = "recálculo completo" if recalculo else "incremental"
+        print(f"✅ Filas procesadas: {filas_nuevas} ({modo}); total acumulado: {estadisticas.total_registros}")
+
+        if filas_nuevas == 0 and not recalculo:
+            print("✅ Sin filas nuevas, los resúmenes ya están actualizados")
+            return True
+
+        escribir_resumenes(estadisticas)
+        for archivo in (EDAD_FILE, EXTRADICION_FILE, GRUPOS_STATS_FILE, ALL_GRUPOS_FILE):
+            print(f"💾 Guardado: {archivo}")
+
+        print(f"\n📊 RESUMEN:")
+        print(f"   • Conferencias: {len(estadisticas.conferencias)} "
+              f"({estadisticas.fecha_minima} - {estadisticas.fecha_maxima})")
+        print(f"   • Con edad: {sum(estadisticas.edades.values())}")
+        print(f"   • Solicitudes de extradición: {estadisticas.extradicion['Sí']}")
+        print(f"   • Grupos únicos: {len(estadisticas.grupos)}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error generando estadísticas: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # --completo ignora el estado guardado y recalcula desde la primera fila
+    if not generar_estadisticas_gabinete(completo='--completo' in sys.argv):
+        sys.exit(1)
@@ -5,10 +5,112 @@ Script para homologar nombres de grupos criminales en el CSV
 Consolida variaciones de nombres en un nombre estándar
 """
 
+import os
+import re
 import pandas as pd
 import json
+from collections import Counter
 from pathlib import Path
 
+from jerarquia_grupos import cargar_overrides, agregados_por_grupo, analisis_grupos_json
+from normalizacion_texto import normalizar_texto
+
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+HOMOLOGACIONES_FILE = Path('data/homologaciones_grupos.csv')
+CANDIDATOS_FILE = Path('data/grupos_candidatos_homologacion.csv')
+
+# Palabras genéricas que no distinguen a un grupo de otro
+PALABRAS_GENERICAS = {'cartel', 'de', 'del', 'el', 'la', 'las', 'los', 'y'}
+
+# Trigramas presentes en más de esta fracción de nombres no sirven para bloquear
+FRECUENCIA_MAXIMA_TRIGRAMA = 0.2
+
+
+def cargar_homologaciones(archivo=HOMOLOGACIONES_FILE):
+    """Lee la tabla de alias (variacion → nombre_estandar) desde el archivo de datos"""
+    tabla = pd.read_csv(archivo, encoding='utf-8')
+    return dict(zip(tabla['variacion'].str.strip(), tabla['nombre_estandar'].str.strip()))
+
+
+def aplicar_homologaciones(grupos, homologaciones):
+    """
+    Aplica la tabla de alias en una sola pasada sobre la columna categórica:
+    el mapeo se evalúa una vez por categoría distinta, no por fila.
+    Devuelve (serie homologada, {variacion: registros cambiados})
+    """
+    categoricos = grupos.astype('category')
+    conteos = categoricos.value_counts()
+    cambios = {v: int(conteos[v]) for v in homologaciones if v in conteos.index and conteos[v] > 0}
+    homologados = categoricos.map(lambda grupo: homologaciones.get(grupo, grupo)).astype(object)
+    return homologados, cambios
+
+
+def _clave_grupo(nombre):
+    """Nombre normalizado sin palabras genéricas ('Cártel de Sinaloa (Los Chapitos)' → 'sinaloa chapitos')"""
+    tokens = re.findall(r'[a-z0-9]+', normalizar_texto(nombre))
+    return ' '.join(t for t in tokens if t not in PALABRAS_GENERICAS)
+
+
+def _trigramas(clave):
+    relleno = f'  {clave} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def proponer_variantes(conteos, homologaciones, umbral=0.6):
+    """
+    Propone pares de nombres probablemente equivalentes que la tabla de alias no cubre.
+    Usa un índice invertido de trigramas como bloqueo: cada nombre solo se compara con
+    los nombres con los que comparte algún trigrama poco frecuente, nunca con todos.
+    La similitud es el coeficiente de traslape |A∩B| / min(|A|, |B|), que detecta
+    contención ('Los Chapitos' dentro de 'Cártel de Sinaloa (Los Chapitos)').
+    """
+    nombres = [n for n in conteos.index if _clave_grupo(n)]
+    trigramas = {n: _trigramas(_clave_grupo(n)) for n in nombres}
+
+    indice = {}
+    for nombre, tris in trigramas.items():
+        for tri in tris:
+            indice.setdefault(tri, []).append(nombre)
+    limite = max(2, int(len(nombres) * FRECUENCIA_MAXIMA_TRIGRAMA))
+
+    candidatos = []
+    for nombre in nombres:
+        compartidos = Counter()
+        for tri in trigramas[nombre]:
+            bloque = indice[tri]
+            if len(bloque) <= limite:
+                compartidos.update(b for b in bloque if b > nombre)
+        for otro, comunes in compartidos.items():
+            # Nombres que ya terminan en el mismo estándar no necesitan revisión
+            if homologaciones.get(nombre, nombre) == homologaciones.get(otro, otro):
+                continue
+            similitud = comunes / min(len(trigramas[nombre]), len(trigramas[otro]))
+            if similitud < umbral:
+                continue
+            # Se sugiere llevar el nombre menos frecuente al más frecuente
+            variante, estandar = sorted([nombre, otro], key=lambda n: (conteos[n], n))
+            candidatos.append({
+                'variacion': variante,
+                'nombre_estandar_sugerido': homologaciones.get(estandar, estandar),
+                'similitud': round(similitud, 3),
+                'trigramas_compartidos': comunes,
+                'casos_variacion': int(conteos[variante]),
+                'casos_estandar': int(conteos[estandar]),
+            })
+
+    columnas = ['variacion', 'nombre_estandar_sugerido', 'similitud', 'trigramas_compartidos',
+                'casos_variacion', 'casos_estandar']
+    return pd.DataFrame(candidatos, columns=columnas).sort_values(
+        ['similitud', 'casos_variacion'], ascending=[False, False])
+
+
+def guardar_csv_atomico(df, csv_file):
+    """Escribe a un archivo temporal y lo reemplaza, para no dejar el CSV a medias"""
+    temporal = csv_file.with_suffix(csv_file.suffix + '.tmp')
+    df.to_csv(temporal, index=False, encoding='utf-8')
+    os.replace(temporal, csv_file)
+
+
 def homologar_grupos_criminales():
     """Homologa nombres de grupos criminales en el CSV"""
     
@@ -16,38 +118,36 @@ def homologar_grupos_criminales():
         print("🔄 Homologando nombres de grupos criminales...")
         
         # Leer el CSV
-        csv_file = Path('data/gabinete_detenidos_final.csv')
+        csv_file = CSV_DETENIDOS
         df = pd.read_csv(csv_file, encoding='utf-8')
         print(f"✅ CSV leído: {len(df)} filas")
         
-        # Diccionario de homologaciones
-        homologaciones = {
-            # Consolidar variaciones de Los Mayos
-            'Los Mayos': 'Cártel del Pacífico (Los Mayos)',
-            'Cártel del Pacífico (Los Menores)': 'Cártel del Pacífico (Los Chapitos)',
-            'Los Chapitos': 'Cártel del Pacífico (Los Chapitos)',
-            'Cártel de Sinaloa (Los Chapitos)': 'Cártel del Pacífico (Los Chapitos)'
-            
-            # Agregar más homologaciones aquí según sea necesario
-            # 'Variación 1': 'Nombre estándar',
-            # 'Variación 2': 'Nombre estándar',
-        }
+        # Tabla de homologaciones (agregar nuevas variaciones en data/homologaciones_grupos.csv)
+        homologaciones = cargar_homologaciones()
+        print(f"📋 Homologaciones cargadas: {len(homologaciones)} ({HOMOLOGACIONES_FILE})")
         
         # Aplicar homologaciones
-        cambios_aplicados = 0
-        for variacion, nombre_estandar in homologaciones.items():
-            # Contar cuántos registros tienen esta variación
-            registros_antes = len(df[df['criminal_group'] == variacion])
-            if registros_antes > 0:
-                print(f"🔄 Homologando '{variacion}' → '{nombre_estandar}' ({registros_antes} registros)")
-                df.loc[df['criminal_group'] == variacion, 'criminal_group'] = nombre_estandar
-                cambios_aplicados += registros_antes
+        df['criminal_group'], cambios = aplicar_homologaciones(df['criminal_group'], homologaciones)
+        for variacion, registros in cambios.items():
+            print(f"🔄 Homologando '{variacion}' → '{homologaciones[variacion]}' ({registros} registros)")
+        cambios_aplicados = sum(cambios.values())
         
         print(f"✅ Total de cambios aplicados: {cambios_aplicados}")
         
-        # Guardar CSV actualizado
-        df.to_csv(csv_file, index=False, encoding='utf-8')
-        print(f"💾 CSV actualizado guardado en: {csv_file}")
+        # Guardar CSV actualizado solo si hubo cambios
+        if cambios_aplicados > 0:
+            guardar_csv_atomico(df, csv_file)
+            print(f"💾 CSV actualizado guardado en: {csv_file}")
+        else:
+            print("✅ El CSV ya estaba homologado, no se reescribe")
+        
+        # Proponer variantes aún no cubiertas por la tabla
+        conteos = df['criminal_group'].dropna().value_counts()
+        df_candidatos = proponer_variantes(conteos, homologaciones)
+        df_candidatos.to_csv(CANDIDATOS_FILE, index=False, encoding='utf-8')
+        print(f"🔎 Variantes candidatas para revisar: {len(df_candidatos)} ({CANDIDATOS_FILE})")
+        for _, fila in df_candidatos.head(10).iterrows():
+            print(f"   • '{fila['variacion']}' → '{fila['nombre_estandar_sugerido']}' (similitud {fila['similitud']})")
         
         # Regenerar análisis de grupos criminales
         print("🔄 Regenerando análisis de grupos criminales...")
@@ -60,41 +160,36 @@ def homologar_grupos_criminales():
         return False
 
 def regenerar_analisis_grupos():
-    """Regenera el análisis de grupos criminales con los nombres homologados"""
+    """
+    Regenera el análisis de grupos criminales con los nombres homologados:
+    ranking plano por grupo y árbol cártel → facción → célula con casos,
+    porcentajes, extradición y edades en cada nivel
+    """
     
     try:
         # Leer el CSV actualizado
-        csv_file = Path('data/gabinete_detenidos_final.csv')
+        csv_file = CSV_DETENIDOS
         df = pd.read_csv(csv_file, encoding='utf-8')
         
-        # Filtrar registros con grupo criminal
-        df_con_grupo = df[df['criminal_group'].notna() & (df['criminal_group'] != '')]
-        
-        # Contar grupos únicos
-        grupos_count = df_con_grupo['criminal_group'].value_counts()
+        # Códigos de grupo (-1 = sin grupo); todo lo demás se calcula sobre estos códigos
+        grupos_col = df['criminal_group'].where(df['criminal_group'].str.strip() != '')
+        codigos, grupos = pd.factorize(grupos_col)
+        agregados = agregados_por_grupo(
+            codigos,
+            len(grupos),
+            df['US_request_extradition'].to_numpy(dtype=object),
+            pd.to_numeric(df['detainee_age'], errors='coerce').to_numpy(dtype=float),
+        )
+        
+        # Ranking plano + jerarquía cártel → facción → célula
+        resultado = analisis_grupos_json(list(grupos), agregados, cargar_overrides())
+        grupos_data = resultado['grupos']
+        jerarquia = resultado['jerarquia']
         
         # Calcular estadísticas
         total_registros = len(df)
-        total_con_grupo = len(df_con_grupo)
-        total_grupos = len(grupos_count)
-        
-        # Crear estructura de datos
-        grupos_data = []
-        for i, (grupo, casos) in enumerate(grupos_count.items(), 1):
-            porcentaje = round((casos / total_con_grupo) * 100, 1)
-            grupos_data.append({
-                'rank': i,
-                'grupo': grupo,
-                'casos': int(casos),
-                'porcentaje': porcentaje
-            })
-        
-        # Crear JSON final
-        resultado = {
-            'total_grupos': total_grupos,
-            'total_casos_con_grupo': total_con_grupo,
-            'grupos': grupos_data
-        }
+        total_con_grupo = resultado['total_casos_con_grupo']
+        total_grupos = resultado['total_grupos']
         
         # Guardar JSON
         json_file = Path('data/all_criminal_groups.json')
@@ -106,12 +201,20 @@ def regenerar_analisis_grupos():
         print(f"   • Total registros: {total_registros}")
         print(f"   • Con grupo reportado: {total_con_grupo} ({round((total_con_grupo/total_registros)*100, 1)}%)")
         print(f"   • Grupos únicos: {total_grupos}")
+        print(f"   • Cárteles (nivel superior): {len(jerarquia)}")
         
         # Mostrar top 5
         print(f"\n📋 TOP 5 GRUPOS ACTUALIZADOS:")
         for grupo in grupos_data[:5]:
             print(f"   {grupo['rank']}. {grupo['grupo']}: {grupo['casos']} casos ({grupo['porcentaje']}%)")
         
+        # Mostrar top 5 del árbol
+        print(f"\n🌳 TOP 5 CÁRTELES (CON FACCIONES):")
+        for cartel in jerarquia[:5]:
+            print(f"   • {cartel['nombre']}: {cartel['casos']} casos ({cartel['porcentaje']}%)")
+            for faccion in cartel['hijos'][:3]:
+                print(f"      └─ {faccion['nombre']}: {faccion['casos']} casos")
+        
         return True
         
     except Exception as e:
@@ -119,4 +222,5 @@ def regenerar_analisis_grupos():
         return False
 
 if __name__ == "__main__":
-    homologar_grupos_criminales()
+    if not homologar_grupos_criminales():
+        exit(1)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Punto de entrada único del pipeline de incidencia delictiva
+  python python/ideff.py build [grupo|script ...]     regenera las salidas de data/ (--lista muestra las etapas)
+  python python/ideff.py serve [--puerto 8000]        servidor local con las APIs
+  python python/ideff.py bench [script ...]           benchmarks de los scripts con --bench
+  python python/ideff.py diff [anterior nuevo]        celdas revisadas entre dos vintages de IDEFF
+  python python/ideff.py query --dims CONCEPTO,AÑO    sumas agrupadas desde la caché de agregaciones
+Todas las rutas se resuelven desde la raíz del proyecto (--raiz), sin importar el directorio actual.
+Cada subcomando importa solo lo que necesita: --help y las consultas que ya están en
+data/cache_agregaciones/ no cargan pandas ni numpy.
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+DIR_SCRIPTS = Path(__file__).resolve().parent
+RAIZ = DIR_SCRIPTS.parent
+
+# Etapas de build por grupo, en orden de dependencias
+ETAPAS = {
+    'ideff': [
+        'process_database',
+        'create_percentage_analysis',
+        'create_national_analysis',
+        'create_monthly_analysis',
+        'create_type_distribution_analysis',
+        'create_monthly_type_distribution_analysis',
+        'create_entidad_concepto_analysis',
+        'create_entidad_concepto_percentage_analysis',
+        'create_entidad_tipo_analysis',
+        'create_entidad_tipo_percentage_analysis',
+        'create_monthly_entidad_concepto_analysis',
+        'create_monthly_entidad_concepto_percentage_analysis',
+        'create_monthly_entidad_tipo_analysis',
+        'create_monthly_entidad_tipo_percentage_analysis',
+        'create_estatal_analysis',
+        'create_estatal_top10_monthly_analysis',
+        'data_analyzer',
+    ],
+    'cubo': [
+        'anomalias_incidencia',
+        'pronosticos_incidencia',
+        'rankings_estatales',
+        'jerarquia_ideff',
+        'vintages_ideff',
+    ],
+    'mapas': [
+        'construir_geometrias',
+        'clases_mapas',
+        'autocorrelacion_espacial',
+    ],
+    'gabinete': [
+        'crear_csv_analisis_detenidos',
+        'analizar_cargos_carteles',
+        'homologar_grupos_criminales',  # reescribe criminal_group: antes de las estadísticas por grupo
+        'generar_estadisticas_gabinete',
+        'normalizar_instituciones',
+        'latencia_detenciones',
+        'extraer_aseguramientos',
+        'cruce_entidad_mes',
+        'deduplicar_detenidos',
+        'indice_busqueda_detenidos',
+    ],
+}
+
+BENCHMARKS = [
+    'lector_ideff',
+    'cubo_compartido',
+    'vintages_ideff',
+    'anomalias_incidencia',
+    'pronosticos_incidencia',
+    'clases_mapas',
+    'deduplicar_detenidos',
+    'extraer_aseguramientos',
+]
+
+MESES = ['ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO', 'JULIO',
+         'AGOSTO', 'SEPTIEMBRE', 'OCTUBRE', 'NOVIEMBRE', 'DICIEMBRE']
+FUENTE_CONSULTAS = Path('data/IDEFF_processed.csv')
+DIMENSIONES_CONSULTA = ['AÑO', 'ENTIDAD', 'LEY', 'CONCEPTO', 'TIPO']
+
+
+def ejecutar_script(nombre, argumentos=()):
+    """
+    Corre python/<nombre>.py como `python python/<nombre>.py`; devuelve (ok, segundos).
+    Los scripts atrapan sus propios errores y terminan con exit(1) si fallan.
+    """
+    import runpy
+
+    argv = sys.argv
+    sys.argv = [str(DIR_SCRIPTS / f'{nombre}.py'), *argumentos]
+    inicio = time.perf_counter()
+    try:
+        runpy.run_path(sys.argv[0], run_name='__main__')
+        ok = True
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+    except Exception as e:
+        print(f"❌ Error en {nombre}: {e}")
+        ok = False
+    finally:
+        sys.argv = argv
+    return ok, time.perf_counter() - inicio
+
+
+def expandir_etapas(nombres):
+    """Grupos y scripts → lista de scripts en orden, sin repetir"""
+    etapas = []
+    for nombre in nombres or list(ETAPAS):
+        if nombre in ETAPAS:
+            etapas += ETAPAS[nombre]
+        elif (DIR_SCRIPTS / f'{nombre}.py').exists():
+            etapas.append(nombre)
+        else:
+            raise ValueError(f"etapa desconocida: {nombre} (grupos: {', '.join(ETAPAS)})")
+    return list(dict.fromkeys(etapas))
+
+
+def ejecutar_etapas(etapas, argumentos=()):
+    """Corre cada script en el mismo proceso (pandas se importa una sola vez); código de salida 0/1"""
+    resultados = []
+    for etapa in etapas:
+        print(f"\n{'=' * 60}\n▶️  {etapa}\n{'=' * 60}")
+        resultados.append((etapa,) + ejecutar_script(etapa, argumentos))
+
+    print(f"\n📊 RESUMEN:")
+    for etapa, ok, duracion in resultados:
+        print(f"   {'✅' if ok else '❌'} {etapa} ({duracion:.1f} s)")
+    return 0 if all(ok for _, ok, _ in resultados) else 1
+
+
+# ---- Subcomandos ----
+
+def comando_build(args):
+    try:
+        etapas = expandir_etapas(args.etapas)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if args.lista:
+        for grupo, scripts in ETAPAS.items():
+            print(f"{grupo}:")
+            for script in scripts:
+                print(f"   {'•' if script in etapas else ' '} {script}")
+        return 0
+    return ejecutar_etapas(etapas)
+
+
+def comando_serve(args):
+    from server import run_server
+
+    run_server(args.puerto, args.raiz)
+    return 0
+
+
+def comando_bench(args):
+    desconocidos = [s for s in args.scripts if s not in BENCHMARKS]
+    if desconocidos:
+        print(f"❌ Sin benchmark: {', '.join(desconocidos)} (disponibles: {', '.join(BENCHMARKS)})")
+        return 1
+    return ejecutar_etapas(args.scripts or BENCHMARKS, ['--bench'])
+
+
+def comando_diff(args):
+    from entidades import nombre_entidad
+    from vintages_ideff import AlmacenVintages, VINTAGES_DIR
+
+    almacen = AlmacenVintages()
+    if len(args.vintages) == 2:
+        anterior, nuevo = args.vintages
+    elif not args.vintages:
+        manifiestos = almacen.manifiestos()
+        if len(manifiestos) < 2:
+            print(f"⚠️  Se necesitan dos vintages en {VINTAGES_DIR} (hay {len(manifiestos)})")
+            return 1
+        anterior, nuevo = manifiestos[-2]['nombre'], manifiestos[-1]['nombre']
+    else:
+        print("❌ Indica dos vintages (anterior y nuevo) o ninguno para comparar los dos últimos")
+        return 1
+
+    cambios = almacen.comparar(anterior, nuevo)
+    print(f"📊 {anterior} → {nuevo}: {len(cambios):,} celdas distintas")
+    por_anio = {}
+    for anio, *_ in cambios:
+        por_anio[anio] = por_anio.get(anio, 0) + 1
+    for anio, n in sorted(por_anio.items()):
+        print(f"   • {anio}: {n:,}")
+    for anio, clave, (_, _, tipo), mes, antes, despues in cambios[:args.limite]:
+        print(f"   {anio}-{mes:02d} {nombre_entidad(clave)} - {tipo}: {antes:g} → {despues:g}")
+    return 0
+
+
+def comando_query(args):
+    import json
+    from cache_agregaciones import CACHE, clave_consulta, suma_agrupada
+
+    if not 1 <= args.meses <= 12:
+        print("❌ --meses debe estar entre 1 y 12")
+        return 1
+    dimensiones = [d for d in args.dims.split(',') if d]
+    if not dimensiones or not set(dimensiones) <= set(DIMENSIONES_CONSULTA):
+        print(f"❌ --dims debe ser una lista de {', '.join(DIMENSIONES_CONSULTA)}")
+        return 1
+    if not args.fuente.exists():
+        print(f"❌ No existe {args.fuente} (python python/ideff.py build process_database)")
+        return 1
+    meses = MESES[:args.meses]
+    filtros = [('AÑO', operador, valor) for operador, valor in [('>=', args.desde), ('<=', args.hasta)]
+               if valor is not None]
+
+    guardado = CACHE.leer_de_disco(clave_consulta(args.fuente, dimensiones, meses, filtros))
+    if guardado is not None:
+        columnas, filas, origen = guardado['columnas'], guardado['filas'], 'caché'
+    else:
+        try:
+            resultado = suma_agrupada(args.fuente, dimensiones, meses, filtros)
+        except KeyError as e:
+            print(f"❌ Columna desconocida en {args.fuente}: {e}")
+            return 1
+        columnas, filas, origen = list(resultado.columns), resultado.values.tolist(), 'calculado'
+
+    if args.json:
+        print(json.dumps({'columnas': columnas, 'filas': filas}, ensure_ascii=False))
+        return 0
+    anchos = [max(len(str(c)), *(len(_celda(f[i])) for f in filas)) for i, c in enumerate(columnas)]
+    print('  '.join(str(c).ljust(a) for c, a in zip(columnas, anchos)))
+    for fila in filas:
+        print('  '.join(_celda(v).rjust(a) if not isinstance(v, str) else v.ljust(a) for v, a in zip(fila, anchos)))
+    print(f"\n📊 {len(filas)} filas ({origen})", file=sys.stderr)
+    return 0
+
+
+def _celda(valor):
+    return f'{valor:,.0f}' if isinstance(valor, float) and valor == valor else str(valor)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='ideff', description='Pipeline de incidencia delictiva federal')
+    parser.add_argument('--raiz', type=Path, default=RAIZ, help='raíz del proyecto (contiene data/)')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    build = subparsers.add_parser('build', help='regenera las salidas de data/')
+    build.add_argument('etapas', nargs='*', help=f"grupos ({', '.join(ETAPAS)}) o scripts; todos por defecto")
+    build.add_argument('--lista', action='store_true', help='muestra las etapas sin ejecutarlas')
+    build.set_defaults(funcion=comando_build)
+
+    serve = subparsers.add_parser('serve', help='servidor local con las APIs')
+    serve.add_argument('--puerto', type=int, default=8000)
+    serve.set_defaults(funcion=comando_serve)
+
+    bench = subparsers.add_parser('bench', help='benchmarks (--bench) de los scripts')
+    bench.add_argument('scripts', nargs='*', help=f"por defecto: {', '.join(BENCHMARKS)}")
+    bench.set_defaults(funcion=comando_bench)
+
+    diff = subparsers.add_parser('diff', help='celdas revisadas entre dos vintages de IDEFF')
+    diff.add_argument('vintages', nargs='*', help='anterior y nuevo; por defecto los dos últimos')
+    diff.add_argument('--limite', type=int, default=20, help='celdas a mostrar')
+    diff.set_defaults(funcion=comando_diff)
+
+    query = subparsers.add_parser('query', help='sumas agrupadas (desde la caché si ya se calcularon)')
+    query.add_argument('--dims', default='CONCEPTO,AÑO', help='dimensiones separadas por coma')
+    query.add_argument('--meses', type=int, default=12, help='meses desde enero a sumar')
+    query.add_argument('--desde', type=int, help='primer año')
+    query.add_argument('--hasta', type=int, help='último año')
+    query.add_argument('--fuente', type=Path, default=FUENTE_CONSULTAS)
+    query.add_argument('--json', action='store_true', help='salida JSON')
+    query.set_defaults(funcion=comando_query)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    os.chdir(args.raiz)
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para construir un índice invertido de texto completo sobre los campos
+narrativos de gabinete_detenidos_final.csv (aseguramientos, detalles, cargos, alias)
+Tokens en minúsculas y sin acentos, postings posicionales y ranking BM25
+"""
+
+import csv
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+from normalizacion_texto import tokenizar
+
+# Campos de texto libre que se indexan
+CAMPOS_INDEXADOS = [
+    'items_seized',
+    'additional_details',
+    'charges_or_supposed_role',
+    'detainee_alias',
+    'city_municipality',
+]
+
+# Campos que se devuelven con cada resultado
+CAMPOS_RESULTADO = [
+    'conference_id',
+    'conference_date',
+    'detainee_name',
+    'criminal_group',
+    'state_of_arrest',
+    'original_row_id',
+]
+
+# Parámetros estándar de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+INDICE_FILE = Path('data/indice_detenidos.json')
+
+
+class IndiceInvertido:
+    """Índice invertido posicional con ranking BM25"""
+
+    def __init__(self):
+        # token -> {doc_id: [posiciones]}
+        self.postings = {}
+        self.longitudes = []
+        self.documentos = []
+        self.idf = {}
+        self.longitud_promedio = 0.0
+
+    def agregar_documento(self, texto, metadatos):
+        """Agrega un documento y devuelve su id"""
+        doc_id = len(self.documentos)
+        tokens = tokenizar(texto)
+        for posicion, token in enumerate(tokens):
+            self.postings.setdefault(token, {}).setdefault(doc_id, []).append(posicion)
+        self.longitudes.append(len(tokens))
+        self.documentos.append(metadatos)
+        return doc_id
+
+    def finalizar(self):
+        """Precalcula IDF y longitud promedio; se llama una vez tras agregar documentos"""
+        total_docs = len(self.documentos)
+        self.longitud_promedio = (sum(self.longitudes) / total_docs) if total_docs else 0.0
+        self.idf = {
+            token: math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+
+    def _coincide_frase(self, doc_id, tokens):
+        """Verifica que los tokens aparezcan consecutivos en el documento"""
+        posiciones_inicio = self.postings[tokens[0]][doc_id]
+        for inicio in posiciones_inicio:
+            if all(inicio + i in self.postings[tok][doc_id] for i, tok in enumerate(tokens[1:], 1)):
+                return True
+        return False
+
+    def buscar(self, consulta, limite=20):
+        """
+        Busca la consulta y devuelve [(score, metadatos)] ordenado por BM25.
+        Las partes entre comillas dobles se tratan como frases exactas.
+        """
+        frases = [tokenizar(f) for f in consulta.split('"')[1::2]]
+        frases = [f for f in frases if f]
+        terminos = tokenizar(consulta)
+
+        scores = {}
+        for token in set(terminos):
+            docs = self.postings.get(token)
+            if not docs:
+                continue
+            idf = self.idf[token]
+            for doc_id, posiciones in docs.items():
+                tf = len(posiciones)
+                norma = BM25_K1 * (1 - BM25_B + BM25_B * self.longitudes[doc_id] / self.longitud_promedio)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norma)
+
+        # Las frases solo filtran: todos sus tokens deben existir y ser consecutivos
+        for frase in frases:
+            if any(tok not in self.postings for tok in frase):
+                return []
+            candidatos = set(self.postings[frase[0]])
+            for tok in frase[1:]:
+                candidatos &= self.postings[tok].keys()
+            scores = {d: s for d, s in scores.items() if d in candidatos and self._coincide_frase(d, frase)}
+
+        mejores = sorted(scores.items(), key=lambda par: (-par[1], par[0]))[:limite]
+        return [(round(score, 4), self.documentos[doc_id]) for doc_id, score in mejores]
+
+    def a_dict(self):
+        """Representación serializable (postings como listas planas doc, posiciones)"""
+        return {
+            'campos': CAMPOS_INDEXADOS,
+            'longitudes': self.longitudes,
+            'documentos': self.documentos,
+            'postings': {
+                token: [[doc_id, posiciones] for doc_id, posiciones in docs.items()]
+                for token, docs in self.postings.items()
+            },
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        indice = cls()
+        indice.longitudes = datos['longitudes']
+        indice.documentos = datos['documentos']
+        indice.postings = {
+            token: {doc_id: posiciones for doc_id, posiciones in docs}
+            for token, docs in datos['postings'].items()
+        }
+        indice.finalizar()
+        return indice
+
+
+def construir_indice(csv_file=CSV_DETENIDOS):
+    """Lee el CSV de detenidos y construye el índice en memoria"""
+    indice = IndiceInvertido()
+    with open(csv_file, encoding='utf-8', newline='') as f:
+        for fila in csv.DictReader(f):
+            texto = ' '.join(fila.get(campo) or '' for campo in CAMPOS_INDEXADOS)
+            indice.agregar_documento(texto, {campo: fila.get(campo, '') for campo in CAMPOS_RESULTADO})
+    indice.finalizar()
+    return indice
+
+
+def cargar_indice(indice_file=INDICE_FILE, csv_file=CSV_DETENIDOS):
+    """
+    Carga el índice persistido; lo reconstruye si no existe
+    o si el CSV de detenidos es más reciente que el índice
+    """
+    indice_file = Path(indice_file)
+    csv_file = Path(csv_file)
+    if indice_file.exists() and (not csv_file.exists() or indice_file.stat().st_mtime >= csv_file.stat().st_mtime):
+        with open(indice_file, encoding='utf-8') as f:
+            return IndiceInvertido.desde_dict(json.load(f))
+    indice = construir_indice(csv_file)
+    guardar_indice(indice, indice_file)
+    return indice
+
+
+def guardar_indice(indice, indice_file=INDICE_FILE):
+    with open(indice_file, 'w', encoding='utf-8') as f:
+        json.dump(indice.a_dict(), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def construir_indice_detenidos():
+    """Construye y persiste el índice de búsqueda de detenidos"""
+
+    try:
+        print("🔄 Construyendo índice de búsqueda de detenidos...")
+
+        inicio = time.perf_counter()
+        indice = construir_indice()
+        duracion = (time.perf_counter() - inicio) * 1000
+        print(f"✅ Documentos indexados: {len(indice.documentos)} ({duracion:.1f} ms)")
+        print(f"📋 Campos indexados: {', '.join(CAMPOS_INDEXADOS)}")
+        print(f"🔤 Tokens únicos: {len(indice.postings)}")
+
+        guardar_indice(indice)
+        print(f"💾 Índice guardado en: {INDICE_FILE}")
+
+        # Consulta de ejemplo con tiempo de respuesta
+        consulta = 'fentanilo Culiacán'
+        inicio = time.perf_counter()
+        resultados = indice.buscar(consulta, limite=5)
+        duracion = (time.perf_counter() - inicio) * 1000
+        print(f"\n🔍 Consulta de ejemplo '{consulta}': {len(resultados)} resultados ({duracion:.3f} ms)")
+        for score, doc in resultados:
+            print(f"   • [{score}] {doc['detainee_name']} - {doc['state_of_arrest']} ({doc['conference_date']})")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error construyendo índice: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Uso: python python/indice_busqueda_detenidos.py "fentanilo Culiacán"
+        indice = cargar_indice()
+        for score, doc in indice.buscar(' '.join(sys.argv[1:])):
+            print(f"[{score}] {doc['detainee_name']} | {doc['criminal_group']} | {doc['state_of_arrest']} | {doc['conference_date']}")
+    else:
+        if not construir_indice_detenidos():
+            sys.exit(1)
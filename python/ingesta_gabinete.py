@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de ingesta incremental de nuevas conferencias del Gabinete de Seguridad
+Solo se agregan filas al final (append-only):
+  1. Toma de la exportación solo las filas crudas con original_row_id mayor a la marca de agua
+     y cuyo conference_id no se ha ingerido, y limpia solo esas
+  2. Anexa esos registros a gabinete_detenidos_final.csv y a analisis_detenidos.csv
+  3. Pliega solo las filas nuevas en el estado acumulado (conteos, sumas, histogramas, top-k)
+     y regenera los JSON de resumen
+  4. Registra la ingesta en data/gabinete_ingesta_log.jsonl
+Cada VERIFICAR_CADA ingestas (o con --verificar) se recalcula todo desde cero y se compara
+con el estado incremental.
+"""
+
+import csv
+import sys
+import json
+from datetime import datetime
+from pathlib import Path
+
+from limpiar_export_gabinete import (
+    EXPORT_FILE, COLUMNAS_FINALES, COLUMNAS_PROPAGADAS, leer_export, limpiar_celda, limpiar_export,
+)
+from homologar_grupos_criminales import cargar_homologaciones
+from generar_estadisticas_gabinete import (
+    CSV_DETENIDOS, actualizar_estadisticas, recalcular_estadisticas, resumenes, escribir_resumenes,
+)
+
+CSV_ANALISIS = Path('data/analisis_detenidos.csv')
+LOG_FILE = Path('data/gabinete_ingesta_log.jsonl')
+
+# Columnas de analisis_detenidos.csv (ver crear_csv_analisis_detenidos.py)
+COLUMNAS_ANALISIS = ['detainee_name', 'criminal_group', 'charges_or_supposed_role', 'state_of_arrest']
+
+VERIFICAR_CADA = 10
+
+
+def filas_nuevas(filas, estadisticas, omitidas=None):
+    """
+    Filas crudas posteriores a la marca de agua y de conferencias no ingeridas.
+    Las filas anteriores solo se leen para propagar conference_id / conference_date
+    a la primera fila nueva; no se limpian. Si se pasa el conjunto omitidas, recibe los
+    conference_id posteriores a la marca de agua que se descartan por estar ya ingeridos.
+    """
+    propagado = dict.fromkeys(COLUMNAS_PROPAGADAS, '')
+    for fila in filas:
+        for columna in COLUMNAS_PROPAGADAS:
+            valor = limpiar_celda(fila.get(columna))
+            if valor:
+                propagado[columna] = valor
+        if fila['original_row_id'] <= estadisticas.marca_agua:
+            continue
+        if propagado['conference_id'] in estadisticas.conferencias:
+            if omitidas is not None:
+                omitidas.add(propagado['conference_id'])
+            continue
+        yield {**fila, **propagado}
+
+
+def registros_nuevos(estadisticas, origen=EXPORT_FILE, omitidas=None):
+    """Registros limpios de la exportación que aún no están en el estado acumulado"""
+    return limpiar_export(filas_nuevas(leer_export(origen), estadisticas, omitidas), cargar_homologaciones())
+
+
+def anexar_csv(archivo, columnas, registros):
+    """Anexa registros a un CSV existente sin reescribirlo"""
+    with open(archivo, 'a', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=columnas, extrasaction='ignore', lineterminator='\n')
+        escritor.writerows(registros)
+
+
+def leer_log():
+    if not LOG_FILE.exists():
+        return []
+    with open(LOG_FILE, encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def anexar_log(entrada):
+    with open(LOG_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+
+
+def verificar_estado(estadisticas, csv_file=CSV_DETENIDOS):
+    """Compara el estado incremental con un recálculo completo; devuelve la lista de diferencias"""
+    completo = recalcular_estadisticas(csv_file)
+    incrementales = resumenes(estadisticas)
+    diferencias = [
+        str(archivo) for archivo, datos in resumenes(completo).items()
+        if incrementales[archivo] != datos
+    ]
+    if estadisticas.a_dict() != completo.a_dict():
+        diferencias.append('estado acumulado')
+    return diferencias
+
+
+def ingerir_conferencias(origen=EXPORT_FILE, verificar=False):
+    """Ingiere las conferencias nuevas de la exportación con costo proporcional a las filas nuevas"""
+
+    try:
+        print("🔄 Ingesta incremental del Gabinete de Seguridad...")
+
+        # Sincronizar el estado con el CSV actual (normalmente no hay bytes pendientes)
+        estadisticas, _, _ = actualizar_estadisticas()
+        print(f"✅ Estado: {estadisticas.total_registros} registros, "
+              f"{len(estadisticas.conferencias)} conferencias, marca de agua original_row_id={estadisticas.marca_agua}")
+
+        omitidas = set()
+        nuevos = list(registros_nuevos(estadisticas, origen, omitidas))
+        if omitidas:
+            print(f"⚠️  Filas posteriores a la marca de agua de conferencias ya ingeridas (omitidas): "
+                  f"{', '.join(sorted(omitidas, key=lambda c: (len(c), c)))}")
+        if nuevos:
+            anexar_csv(CSV_DETENIDOS, COLUMNAS_FINALES, nuevos)
+            anexar_csv(CSV_ANALISIS, COLUMNAS_ANALISIS, nuevos)
+            print(f"💾 {len(nuevos)} registros anexados a: {CSV_DETENIDOS}, {CSV_ANALISIS}")
+
+            estadisticas, filas, _ = actualizar_estadisticas()
+            escribir_resumenes(estadisticas)
+            print(f"✅ Filas plegadas en el estado: {filas}; resúmenes regenerados")
+
+            conferencias = sorted({r['conference_id'] for r in nuevos}, key=lambda c: (len(c), c))
+            anexar_log({
+                'fecha_ingesta': datetime.now().isoformat(timespec='seconds'),
+                'conferencias': conferencias,
+                'registros': len(nuevos),
+                'original_row_id_desde': min(r['original_row_id'] for r in nuevos),
+                'original_row_id_hasta': max(r['original_row_id'] for r in nuevos),
+                'total_registros': estadisticas.total_registros,
+            })
+            print(f"   • Conferencias nuevas: {', '.join(conferencias)}")
+        else:
+            print("✅ Sin conferencias nuevas en la exportación")
+
+        ingestas = len(leer_log())
+        if verificar or (nuevos and ingestas % VERIFICAR_CADA == 0):
+            print("🔄 Verificando estado incremental contra recálculo completo...")
+            diferencias = verificar_estado(estadisticas)
+            if diferencias:
+                print(f"❌ El estado incremental difiere en: {', '.join(diferencias)}; se recalcula")
+                estadisticas, _, _ = actualizar_estadisticas(completo=True)
+                escribir_resumenes(estadisticas)
+            else:
+                print("✅ Estado incremental idéntico al recálculo completo")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en la ingesta: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Uso: python python/ingesta_gabinete.py [exportacion.csv] [--verificar]
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not ingerir_conferencias(
+        Path(argumentos[0]) if argumentos else EXPORT_FILE,
+        verificar='--verificar' in sys.argv,
+    ):
+        sys.exit(1)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Jerarquía de grupos criminales (cártel → facción → célula)
+Se construye a partir de los nombres homologados ('Cártel del Pacífico (Los Mayos, Los Demonios)')
+más una tabla pequeña de excepciones en data/jerarquia_grupos_overrides.csv
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+OVERRIDES_FILE = Path('data/jerarquia_grupos_overrides.csv')
+
+NIVELES = ['cartel', 'faccion', 'celula']
+
+# 'Nombre base (Facción, Célula)'
+PATRON_NOMBRE = re.compile(r'^\s*(?P<base>[^()]+?)\s*\((?P<detalle>[^()]+)\)\s*$')
+
+RANGOS_EDAD = [
+    ('Menores (< 18)', 0, 18),
+    ('Jóvenes (18-29)', 18, 30),
+    ('Adultos (30-44)', 30, 45),
+    ('Adultos mayores (45-59)', 45, 60),
+    ('Tercera edad (60+)', 60, np.inf),
+]
+
+
+def cargar_overrides(archivo=OVERRIDES_FILE):
+    """Lee la tabla de excepciones grupo → (cartel, faccion, celula)"""
+    archivo = Path(archivo)
+    if not archivo.exists():
+        return {}
+    tabla = pd.read_csv(archivo, encoding='utf-8', dtype=str).fillna('')
+    return {
+        fila['grupo']: tuple(fila[nivel] or None for nivel in NIVELES)
+        for _, fila in tabla.iterrows()
+    }
+
+
+def parsear_nombre(nombre, overrides=None):
+    """
+    Devuelve la ruta (cartel, faccion, celula) de un nombre homologado.
+    'Cártel del Pacífico (Los Mayos, Los Demonios)' → ('Cártel del Pacífico', 'Los Mayos', 'Los Demonios')
+    """
+    if overrides and nombre in overrides:
+        return overrides[nombre]
+    coincidencia = PATRON_NOMBRE.match(nombre)
+    if not coincidencia:
+        return (nombre.strip(), None, None)
+    partes = [p.strip() for p in coincidencia.group('detalle').split(',') if p.strip()]
+    faccion = partes[0] if partes else None
+    celula = ', '.join(partes[1:]) or None
+    return (coincidencia.group('base'), faccion, celula)
+
+
+def construir_jerarquia(grupos, overrides=None):
+    """
+    Construye los nodos del árbol para los grupos dados.
+    Devuelve (nodos, codigos_por_nivel): nodos es una lista de dicts
+    {id, nivel, nombre, ruta, padre}; codigos_por_nivel[nivel] es un arreglo
+    que asigna a cada grupo (en el orden recibido) el id de su nodo en ese nivel, o -1.
+    """
+    nodos = []
+    ids = {}
+    codigos_por_nivel = {nivel: np.full(len(grupos), -1, dtype=np.int64) for nivel in NIVELES}
+
+    for i, grupo in enumerate(grupos):
+        ruta = parsear_nombre(grupo, overrides)
+        padre = -1
+        for profundidad, nivel in enumerate(NIVELES):
+            nombre = ruta[profundidad]
+            if not nombre:
+                break
+            clave = ruta[:profundidad + 1]
+            if clave not in ids:
+                ids[clave] = len(nodos)
+                nodos.append({
+                    'id': ids[clave],
+                    'nivel': nivel,
+                    'nombre': nombre,
+                    'ruta': ' > '.join(clave),
+                    'padre': padre,
+                })
+            padre = ids[clave]
+            codigos_por_nivel[nivel][i] = padre
+
+    return nodos, codigos_por_nivel
+
+
+def rango_edad(edades):
+    """Índice del rango de edad de cada valor (-1 si no hay edad)"""
+    rango = np.full(len(edades), -1, dtype=np.int64)
+    for r, (_, minimo, maximo) in enumerate(RANGOS_EDAD):
+        rango[(edades >= minimo) & (edades < maximo)] = r
+    return rango
+
+
+def agregados_por_grupo(codigos_grupo, n_grupos, extradicion, edades):
+    """
+    Agregados por grupo con bincount sobre los códigos precalculados.
+    codigos_grupo: código de grupo por detenido (-1 sin grupo); extradicion: 'Sí'/'No'/NaN;
+    edades: float con NaN cuando no se reportó.
+    """
+    con_grupo = codigos_grupo >= 0
+    codigos = codigos_grupo[con_grupo]
+    extradicion = extradicion[con_grupo]
+    edades = edades[con_grupo]
+    con_edad = ~np.isnan(edades)
+    rango = rango_edad(edades)
+
+    return {
+        'casos': np.bincount(codigos, minlength=n_grupos),
+        'extradicion_si': np.bincount(codigos[extradicion == 'Sí'], minlength=n_grupos),
+        'extradicion_no': np.bincount(codigos[extradicion == 'No'], minlength=n_grupos),
+        'edad_conteo': np.bincount(codigos[con_edad], minlength=n_grupos),
+        'edad_suma': np.bincount(codigos[con_edad], weights=edades[con_edad], minlength=n_grupos),
+        'edad_rangos': np.bincount(
+            codigos[con_edad] * len(RANGOS_EDAD) + rango[con_edad],
+            minlength=n_grupos * len(RANGOS_EDAD),
+        ).reshape(n_grupos, len(RANGOS_EDAD)),
+    }
+
+
+def estadisticas_por_nodo(agregados, nodos, codigos_por_nivel):
+    """
+    Suma los agregados por grupo en cada nodo del árbol: cada grupo aporta
+    a su cártel, a su facción y a su célula (suma indexada sobre los grupos)
+    """
+    n_nodos = len(nodos)
+    resultado = {}
+    for clave, valores in agregados.items():
+        valores = np.asarray(valores)
+        forma = (n_nodos,) + valores.shape[1:]
+        total = np.zeros(forma, dtype=valores.dtype)
+        for nivel in NIVELES:
+            nodo = codigos_por_nivel[nivel]
+            valido = nodo >= 0
+            np.add.at(total, nodo[valido], valores[valido])
+        resultado[clave] = total
+    return resultado
+
+
+def arbol_json(nodos, estadisticas, total_con_grupo):
+    """Anida los nodos como árbol JSON con sus estadísticas, hijos ordenados por casos"""
+    salida = []
+    for nodo in nodos:
+        i = nodo['id']
+        casos = int(estadisticas['casos'][i])
+        edad_conteo = int(estadisticas['edad_conteo'][i])
+        salida.append({
+            'nombre': nodo['nombre'],
+            'nivel': nodo['nivel'],
+            'ruta': nodo['ruta'],
+            'casos': casos,
+            'porcentaje': round((casos / total_con_grupo) * 100, 1) if total_con_grupo else 0.0,
+            'extradicion': {
+                'si': int(estadisticas['extradicion_si'][i]),
+                'no': int(estadisticas['extradicion_no'][i]),
+                'sin_dato': casos - int(estadisticas['extradicion_si'][i]) - int(estadisticas['extradicion_no'][i]),
+            },
+            'edad': {
+                'con_dato': edad_conteo,
+                'promedio': round(float(estadisticas['edad_suma'][i]) / edad_conteo, 1) if edad_conteo else None,
+                'rangos': {
+                    nombre: int(valor)
+                    for (nombre, _, _), valor in zip(RANGOS_EDAD, estadisticas['edad_rangos'][i])
+                },
+            },
+            'hijos': [],
+        })
+
+    raices = []
+    for nodo, item in zip(nodos, salida):
+        if nodo['padre'] >= 0:
+            salida[nodo['padre']]['hijos'].append(item)
+        else:
+            raices.append(item)
+
+    def ordenar(items):
+        items.sort(key=lambda item: (-item['casos'], item['nombre']))
+        for item in items:
+            ordenar(item['hijos'])
+
+    ordenar(raices)
+    return raices
+
+
+def analisis_grupos_json(grupos, agregados, overrides=None):
+    """
+    Estructura de all_criminal_groups.json a partir de los agregados por grupo:
+    ranking plano (empates en orden de aparición) y árbol con estadísticas por nivel
+    """
+    casos_por_grupo = np.asarray(agregados['casos'])
+    total_con_grupo = int(casos_por_grupo.sum())
+
+    grupos_data = []
+    orden = np.argsort(-casos_por_grupo, kind='stable')
+    for i, g in enumerate(orden, 1):
+        casos = int(casos_por_grupo[g])
+        grupos_data.append({
+            'rank': i,
+            'grupo': grupos[g],
+            'casos': casos,
+            'porcentaje': round((casos / total_con_grupo) * 100, 1)
+        })
+
+    nodos, codigos_por_nivel = construir_jerarquia(grupos, overrides)
+    estadisticas = estadisticas_por_nodo(agregados, nodos, codigos_por_nivel)
+
+    return {
+        'total_grupos': len(grupos),
+        'total_casos_con_grupo': total_con_grupo,
+        'grupos': grupos_data,
+        'jerarquia': arbol_json(nodos, estadisticas, total_con_grupo)
+    }
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para materializar la jerarquía LEY → CONCEPTO → TIPO de IDEFF
+La jerarquía se guarda una sola vez como matrices de agregación 0/1 dispersas (CSR):
+  - TIPO → CONCEPTO, CONCEPTO → LEY, LEY → TOTAL
+  - entidad → nacional y mes → año
+Cada nivel es un producto disperso × denso sobre el cubo base a nivel TIPO, y se verifica
+que cada nivel sume a su padre.
+Salidas: data/jerarquia_ideff.npz (matrices) y data/jerarquia_ideff_anual.csv (rollups por año)
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from entidades import N_CLAVES, nombre_entidad
+from cubo_ideff import DIMENSIONES, MESES, cargar_cubo, leer_ideff
+
+JERARQUIA_FILE = Path('data/jerarquia_ideff.npz')
+ROLLUPS_FILE = Path('data/jerarquia_ideff_anual.csv')
+
+NIVELES = ['TIPO', 'CONCEPTO', 'LEY', 'TOTAL']
+TODOS = 'TODOS'
+CLAVE_NACIONAL = 0
+
+
+# ---- Matrices de agregación ----
+
+def matriz_agregacion(codigos_padre, n_padres):
+    """CSR 0/1 [padre, hijo]: la fila p tiene un 1 en cada hijo con codigos_padre == p"""
+    codigos_padre = np.asarray(codigos_padre)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(codigos_padre, minlength=n_padres))])
+    indices = np.argsort(codigos_padre, kind='stable')
+    return {'indptr': indptr.astype(np.int32), 'indices': indices.astype(np.int32),
+            'forma': (n_padres, len(codigos_padre))}
+
+
+def padres(matriz):
+    """Código de padre de cada hijo (-1 si no tiene)"""
+    codigos = np.full(matriz['forma'][1], -1)
+    codigos[matriz['indices']] = np.repeat(np.arange(matriz['forma'][0]), np.diff(matriz['indptr']))
+    return codigos
+
+
+def componer(superior, inferior):
+    """superior @ inferior para matrices de agregación (hijo → padre → abuelo)"""
+    return matriz_agregacion(padres(superior)[padres(inferior)], superior['forma'][0])
+
+
+def _sumar_filas(matriz, x):
+    # Suma de los hijos de cada fila con sumas acumuladas (filas vacías = 0)
+    acumulado = np.concatenate([np.zeros((1,) + x.shape[1:]), np.cumsum(x[matriz['indices']], axis=0)])
+    return acumulado[matriz['indptr'][1:]] - acumulado[matriz['indptr'][:-1]]
+
+
+def producto(matriz, x, eje):
+    """
+    matriz @ x a lo largo de `eje` (disperso × denso).
+    Los NaN cuentan como 0; el resultado es NaN solo si ningún hijo tiene dato.
+    """
+    x = np.moveaxis(x, eje, 0)
+    validos = ~np.isnan(x)
+    suma = _sumar_filas(matriz, np.where(validos, x, 0.0))
+    con_dato = _sumar_filas(matriz, validos.astype(float)) > 0
+    return np.moveaxis(np.where(con_dato, suma, np.nan), 0, eje)
+
+
+# ---- Jerarquía ----
+
+def construir_jerarquia(delitos, n_meses, anio_inicial):
+    """Nodos de cada nivel y matrices de agregación a partir de los delitos (LEY, CONCEPTO, TIPO) del cubo"""
+    tipos = pd.DataFrame(delitos, columns=DIMENSIONES)
+    codigos_concepto, conceptos = pd.factorize(pd.MultiIndex.from_frame(tipos[['LEY', 'CONCEPTO']]))
+    conceptos = pd.DataFrame(list(conceptos), columns=['LEY', 'CONCEPTO'])
+    codigos_ley, leyes = pd.factorize(conceptos['LEY'])
+
+    nodos = {
+        'TIPO': tipos,
+        'CONCEPTO': conceptos.assign(TIPO=TODOS),
+        'LEY': pd.DataFrame({'LEY': leyes, 'CONCEPTO': TODOS, 'TIPO': TODOS}),
+        'TOTAL': pd.DataFrame({'LEY': [TODOS], 'CONCEPTO': [TODOS], 'TIPO': [TODOS]}),
+    }
+    matrices = {
+        'CONCEPTO': matriz_agregacion(codigos_concepto, len(conceptos)),
+        'LEY': matriz_agregacion(codigos_ley, len(leyes)),
+        'TOTAL': matriz_agregacion(np.zeros(len(leyes), dtype=np.int64), 1),
+        # Todas las claves (incluida 'Extranjero') suman al total nacional
+        'NACIONAL': matriz_agregacion(np.zeros(N_CLAVES, dtype=np.int64), 1),
+        'ANIO': matriz_agregacion(np.arange(n_meses) // 12, n_meses // 12),
+    }
+    anios = [anio_inicial + a for a in range(n_meses // 12)]
+    return {'nodos': nodos, 'matrices': matrices, 'anios': anios}
+
+
+def rollups(cubo, jerarquia):
+    """{nivel: arreglo [clave, nodo, mes]} con la posición CLAVE_NACIONAL como suma de todas las entidades"""
+    matrices = jerarquia['matrices']
+    base = cubo['valores'].copy()
+    base[CLAVE_NACIONAL] = producto(matrices['NACIONAL'], base, 0)[0]
+    niveles = {'TIPO': base}
+    for anterior, nivel in zip(NIVELES, NIVELES[1:]):
+        niveles[nivel] = producto(matrices[nivel], niveles[anterior], 1)
+    return niveles
+
+
+def verificar_consistencia(jerarquia, niveles):
+    """Lista de (verificación, ok): cada hijo tiene un padre y cada nivel suma a su padre"""
+    matrices = jerarquia['matrices']
+    verificaciones = []
+    for nombre in ['CONCEPTO', 'LEY', 'TOTAL', 'NACIONAL', 'ANIO']:
+        un_padre = bool((np.bincount(matrices[nombre]['indices'], minlength=matrices[nombre]['forma'][1]) == 1).all())
+        verificaciones.append((f'cada hijo de {nombre} tiene un solo padre', un_padre))
+
+    tipo_a_ley = componer(matrices['LEY'], matrices['CONCEPTO'])
+    verificaciones.append(('LEY desde TIPO == LEY desde CONCEPTO', np.allclose(
+        producto(tipo_a_ley, niveles['TIPO'], 1), niveles['LEY'], equal_nan=True)))
+    directo = np.where(np.isnan(niveles['TIPO']).all(axis=1), np.nan, np.nansum(niveles['TIPO'], axis=1))
+    verificaciones.append(('TOTAL == suma de todos los TIPO', np.allclose(
+        niveles['TOTAL'][:, 0], directo, equal_nan=True)))
+    for nivel in NIVELES:
+        entidades = niveles[nivel][1:]
+        nacional = np.where(np.isnan(entidades).all(axis=0), np.nan, np.nansum(entidades, axis=0))
+        verificaciones.append((f'{nivel}: nacional == suma de entidades', np.allclose(
+            niveles[nivel][CLAVE_NACIONAL], nacional, equal_nan=True)))
+    return verificaciones
+
+
+def verificar_contra_pandas(jerarquia, niveles):
+    """Totales anuales nacionales por (LEY, CONCEPTO) contra un groupby de pandas sobre la base original"""
+    df = leer_ideff()
+    esperado = df.groupby(['AÑO', 'LEY', 'CONCEPTO'], sort=False)[MESES].sum().sum(axis=1)
+    anual = producto(jerarquia['matrices']['ANIO'], niveles['CONCEPTO'][CLAVE_NACIONAL], 1)
+    conceptos = jerarquia['nodos']['CONCEPTO']
+    obtenido = pd.Series({
+        (anio, ley, concepto): anual[c, a]
+        for a, anio in enumerate(jerarquia['anios'])
+        for c, (ley, concepto) in enumerate(zip(conceptos['LEY'], conceptos['CONCEPTO']))
+    })
+    comparables = esperado.index.intersection(obtenido.index)
+    return bool(np.allclose(esperado[comparables], obtenido[comparables].fillna(0)))
+
+
+def tabla_anual(jerarquia, niveles):
+    """Una fila por nivel × nodo × entidad (0 = nacional) con una columna por año"""
+    anio = jerarquia['matrices']['ANIO']
+    bloques = []
+    for nivel in NIVELES:
+        anual = producto(anio, niveles[nivel], 2)  # [clave, nodo, año]
+        claves, nodos = np.nonzero(~np.isnan(anual).all(axis=2))
+        bloque = jerarquia['nodos'][nivel].iloc[nodos].reset_index(drop=True)
+        bloque.insert(0, 'nivel', nivel)
+        bloque.insert(1, 'clave_entidad', claves)
+        bloque.insert(2, 'ENTIDAD', ['Nacional' if c == CLAVE_NACIONAL else nombre_entidad(c) for c in claves])
+        columnas = pd.DataFrame(anual[claves, nodos], columns=[str(a) for a in jerarquia['anios']])
+        bloque = pd.concat([bloque, columnas.astype('Int64')], axis=1)
+        bloques.append(bloque)
+    return pd.concat(bloques, ignore_index=True)
+
+
+def guardar_jerarquia(jerarquia, archivo=JERARQUIA_FILE):
+    datos = {}
+    for nombre, matriz in jerarquia['matrices'].items():
+        datos[f'{nombre}_indptr'] = matriz['indptr']
+        datos[f'{nombre}_indices'] = matriz['indices']
+    for nivel in ['TIPO', 'CONCEPTO', 'LEY']:
+        for columna in DIMENSIONES:
+            datos[f'nodos_{nivel}_{columna}'] = jerarquia['nodos'][nivel][columna].to_numpy(dtype=str)
+    np.savez(archivo, anios=np.array(jerarquia['anios']), **datos)
+
+
+def generar_jerarquia(verificar=False):
+    """Construye las matrices de agregación, calcula los rollups y verifica la consistencia"""
+
+    try:
+        print("🔄 Construyendo la jerarquía LEY → CONCEPTO → TIPO...")
+
+        cubo = cargar_cubo()
+        jerarquia = construir_jerarquia(cubo['delitos'], len(cubo['meses']), cubo['anio_inicial'])
+        for nivel in NIVELES:
+            print(f"   • {nivel}: {len(jerarquia['nodos'][nivel])} nodos")
+
+        inicio = time.perf_counter()
+        niveles = rollups(cubo, jerarquia)
+        print(f"⏱️  Rollups de todos los niveles en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+        verificaciones = verificar_consistencia(jerarquia, niveles)
+        if verificar:
+            verificaciones.append(('CONCEPTO anual == groupby de pandas', verificar_contra_pandas(jerarquia, niveles)))
+        for descripcion, ok in verificaciones:
+            print(f"   {'✅' if ok else '❌'} {descripcion}")
+        if not all(ok for _, ok in verificaciones):
+            print("❌ La jerarquía no es consistente; no se guardan resultados")
+            return False
+
+        guardar_jerarquia(jerarquia)
+        print(f"💾 Matrices de agregación guardadas en: {JERARQUIA_FILE}")
+        tabla = tabla_anual(jerarquia, niveles)
+        tabla.to_csv(ROLLUPS_FILE, index=False, encoding='utf-8')
+        print(f"💾 Rollups anuales guardados en: {ROLLUPS_FILE} ({len(tabla)} filas)")
+
+        total = tabla[(tabla['nivel'] == 'TOTAL') & (tabla['clave_entidad'] == CLAVE_NACIONAL)].iloc[0]
+        print(f"\n📊 TOTAL NACIONAL POR AÑO:")
+        for anio in jerarquia['anios']:
+            print(f"   • {anio}: {total[str(anio)]:,.0f}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error construyendo la jerarquía: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if not generar_jerarquia(verificar='--verificar' in sys.argv):
+        sys.exit(1)
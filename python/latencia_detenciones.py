@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para analizar la latencia entre la detención (date_of_arrest) y su anuncio
+en la conferencia (conference_date) del Gabinete de Seguridad
+  - Las fechas se parsean una sola vez a arreglos datetime64
+  - Distribución de la latencia por institución, estado y grupo criminal
+  - Series semanales y mensuales de detenciones
+  - Caché compacto (data/latencia_detenciones.npz) ordenado por fecha de detención,
+    que el servidor puede recortar por rango de fechas sin volver a parsear texto
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from normalizar_instituciones import NOMBRES_INSTITUCIONES, calcular_mascaras, matriz_bits
+
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+CACHE_FILE = Path('data/latencia_detenciones.npz')
+RESUMEN_FILE = Path('data/latencia_detenciones.json')
+
+# Días desde 1970-01-01 en int32; NaT se guarda como SIN_FECHA (queda al final al ordenar)
+SIN_FECHA = np.iinfo(np.int32).max
+SIN_LATENCIA = -1
+
+PERCENTILES = [25, 50, 75, 90]
+
+
+def parsear_fechas(serie):
+    """
+    Texto → datetime64[D]; en rangos ('2025-06-22 a 2025-06-25') se toma la última fecha.
+    Inválidas o vacías → NaT.
+    """
+    iso = serie.astype('string').str.extract(r'(\d{4}-\d{2}-\d{2})\s*$', expand=False)
+    return pd.to_datetime(iso, format='%Y-%m-%d', errors='coerce').to_numpy().astype('datetime64[D]')
+
+
+def a_dias(fechas):
+    """datetime64[D] → int32 días desde 1970-01-01 (NaT → SIN_FECHA)"""
+    dias = fechas.astype(np.int64)
+    dias[np.isnat(fechas)] = SIN_FECHA
+    return dias.astype(np.int32)
+
+
+def construir_cache(csv_file=CSV_DETENIDOS):
+    """Arreglos por detenido, ordenados por fecha de detención (sin fecha al final)"""
+    df = pd.read_csv(csv_file, encoding='utf-8')
+    detencion = parsear_fechas(df['date_of_arrest'])
+    conferencia = parsear_fechas(df['conference_date'])
+
+    latencia = (conferencia - detencion).astype(np.int64)
+    valida = ~np.isnat(detencion) & ~np.isnat(conferencia) & (latencia >= 0)
+    latencia = np.where(valida, latencia, SIN_LATENCIA).astype(np.int16)
+
+    codigos_estado, estados = pd.factorize(df['state_of_arrest'])
+    codigos_grupo, grupos = pd.factorize(df['criminal_group'])
+
+    dias_detencion = a_dias(detencion)
+    orden = np.argsort(dias_detencion, kind='stable')
+    return {
+        'fecha_detencion': dias_detencion[orden],
+        'fecha_conferencia': a_dias(conferencia)[orden],
+        'latencia': latencia[orden],
+        'estado': codigos_estado.astype(np.int16)[orden],
+        'grupo': codigos_grupo.astype(np.int16)[orden],
+        'instituciones': calcular_mascaras(df['involved_institutions'])[orden],
+        'estados': np.array(estados, dtype=str),
+        'grupos': np.array(grupos, dtype=str),
+        'nombres_instituciones': np.array(NOMBRES_INSTITUCIONES),
+    }
+
+
+def cargar_cache(cache_file=CACHE_FILE, csv_file=CSV_DETENIDOS):
+    """Carga el caché; lo reconstruye si no existe o si el CSV de detenidos es más reciente"""
+    cache_file = Path(cache_file)
+    csv_file = Path(csv_file)
+    if cache_file.exists() and (not csv_file.exists() or cache_file.stat().st_mtime >= csv_file.stat().st_mtime):
+        with np.load(cache_file) as datos:
+            return {clave: datos[clave] for clave in datos.files}
+    cache = construir_cache(csv_file)
+    np.savez_compressed(cache_file, **cache)
+    return cache
+
+
+def recortar(cache, desde=None, hasta=None):
+    """Índices [inicio, fin) de los detenidos con fecha de detención en el rango (búsqueda binaria)"""
+    fechas = cache['fecha_detencion']
+    inicio = 0 if desde is None else np.searchsorted(fechas, a_dias(np.array([desde], dtype='datetime64[D]'))[0])
+    fin = (np.searchsorted(fechas, SIN_FECHA) if hasta is None
+           else np.searchsorted(fechas, a_dias(np.array([hasta], dtype='datetime64[D]'))[0], side='right'))
+    return slice(int(inicio), int(fin))
+
+
+def distribucion(latencias):
+    """Resumen de una muestra de latencias en días"""
+    latencias = latencias[latencias != SIN_LATENCIA]
+    if len(latencias) == 0:
+        return {'detenidos_con_latencia': 0}
+    percentiles = np.percentile(latencias, PERCENTILES)
+    return {
+        'detenidos_con_latencia': int(len(latencias)),
+        'promedio_dias': round(float(latencias.mean()), 1),
+        **{f'p{p}_dias': round(float(v), 1) for p, v in zip(PERCENTILES, percentiles)},
+        'max_dias': int(latencias.max()),
+    }
+
+
+def distribucion_por_codigo(codigos, latencias, nombres):
+    """
+    Distribución por categoría con un solo ordenamiento: se ordena por (código, latencia)
+    y se parte el arreglo en los límites de cada código
+    """
+    valida = (codigos >= 0) & (latencias != SIN_LATENCIA)
+    codigos, latencias = codigos[valida], latencias[valida]
+    orden = np.lexsort((latencias, codigos))
+    codigos, latencias = codigos[orden], latencias[orden]
+    limites = np.searchsorted(codigos, np.arange(len(nombres) + 1))
+    resultado = {
+        str(nombres[c]): distribucion(latencias[limites[c]:limites[c + 1]])
+        for c in range(len(nombres)) if limites[c + 1] > limites[c]
+    }
+    return dict(sorted(resultado.items(), key=lambda par: -par[1]['detenidos_con_latencia']))
+
+
+def distribucion_por_institucion(mascaras, latencias, nombres):
+    """Cada detenido cuenta para todas las instituciones que participaron"""
+    bits = matriz_bits(mascaras)[:, :len(nombres)]
+    resultado = {str(n): distribucion(latencias[bits[:, i]]) for i, n in enumerate(nombres) if bits[:, i].any()}
+    return dict(sorted(resultado.items(), key=lambda par: -par[1]['detenidos_con_latencia']))
+
+
+def series_detenciones(fechas_dias):
+    """Detenciones por semana (lunes) y por mes, con bincount sobre los días ya parseados"""
+    dias = fechas_dias[fechas_dias != SIN_FECHA].astype('datetime64[D]')
+    if len(dias) == 0:
+        return {'semanal': {}, 'mensual': {}}
+    # 1970-01-01 fue jueves: desplazar 3 días para que las semanas empiecen en lunes
+    semanas = (dias.astype(np.int64) + 3) // 7
+    conteo_semanas = np.bincount(semanas - semanas.min())
+    meses = dias.astype('datetime64[M]').astype(np.int64)
+    conteo_meses = np.bincount(meses - meses.min())
+    return {
+        'semanal': {
+            str(np.datetime64(int((semanas.min() + i) * 7 - 3), 'D')): int(c) for i, c in enumerate(conteo_semanas)
+        },
+        'mensual': {
+            str(np.datetime64(int(meses.min() + i), 'M')): int(c) for i, c in enumerate(conteo_meses)
+        },
+    }
+
+
+def resumen_rango(cache, desde=None, hasta=None):
+    """Todas las distribuciones y series para los detenidos del rango de fechas"""
+    rango = recortar(cache, desde, hasta)
+    latencias = cache['latencia'][rango]
+    return {
+        'desde': str(desde) if desde else None,
+        'hasta': str(hasta) if hasta else None,
+        'detenidos': int(rango.stop - rango.start),
+        'nacional': distribucion(latencias),
+        'por_institucion': distribucion_por_institucion(
+            cache['instituciones'][rango], latencias, cache['nombres_instituciones']),
+        'por_estado': distribucion_por_codigo(cache['estado'][rango], latencias, cache['estados']),
+        'por_grupo': distribucion_por_codigo(cache['grupo'][rango], latencias, cache['grupos']),
+        'series': series_detenciones(cache['fecha_detencion'][rango]),
+    }
+
+
+def analizar_latencia_detenciones():
+    """Construye el caché de fechas y guarda el resumen de latencias y series"""
+
+    try:
+        print("🔄 Analizando latencia entre detención y anuncio...")
+
+        cache = construir_cache()
+        np.savez_compressed(CACHE_FILE, **cache)
+        print(f"💾 Caché de fechas guardado en: {CACHE_FILE} ({len(cache['latencia'])} detenidos)")
+
+        resumen = resumen_rango(cache)
+        with open(RESUMEN_FILE, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resumen guardado en: {RESUMEN_FILE}")
+
+        nacional = resumen['nacional']
+        print(f"\n📊 LATENCIA NACIONAL:")
+        print(f"   • Detenidos con ambas fechas: {nacional['detenidos_con_latencia']} de {len(cache['latencia'])}")
+        print(f"   • Promedio: {nacional['promedio_dias']} días, mediana: {nacional['p50_dias']} días, "
+              f"p90: {nacional['p90_dias']} días")
+
+        print(f"\n📊 MEDIANA POR INSTITUCIÓN:")
+        for institucion, datos in resumen['por_institucion'].items():
+            print(f"   • {institucion}: {datos['p50_dias']} días ({datos['detenidos_con_latencia']} detenidos)")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error analizando latencia: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if not analizar_latencia_detenciones():
+        exit(1)
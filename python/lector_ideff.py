@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lector rápido de la base IDEFF (data/IDEFF_jul25.csv)
+El esquema es fijo: AÑO, INEGI, ENTIDAD, LEY, CONCEPTO, TIPO y 12 columnas de meses.
+En lugar del lector genérico de pandas (que infiere tipos y crea un objeto por celda):
+  - se trabaja sobre los bytes con NumPy, por bloques que terminan en fin de línea
+  - las comas dentro de comillas ('"FALSEDAD, TITULO DECIMO TERCERO"') se descartan
+    ubicándolas entre pares de comillas con searchsorted
+  - cada campo numérico se lee como una palabra de 8 bytes y se convierte con SWAR; el bloque
+    de meses queda en int32 con una máscara de meses publicados
+  - las 5 columnas de texto se agrupan por hash de su rango de bytes; solo cada
+    combinación distinta se decodifica (latin-1) y se separa con el módulo csv
+Si un bloque no tiene la forma esperada se lee con el módulo csv.
+Con procesos > 1 los bloques se reparten en un ProcessPoolExecutor: cada proceso abre el archivo
+con mmap y lee solo sus rangos de bytes (no se envía texto entre procesos).
+"""
+
+import io
+import os
+import csv
+import sys
+import mmap
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+IDEFF_ORIGINAL = Path('data/IDEFF_jul25.csv')
+
+MESES = ['ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO', 'JULIO',
+         'AGOSTO', 'SEPTIEMBRE', 'OCTUBRE', 'NOVIEMBRE', 'DICIEMBRE']
+COLUMNAS_TEXTO = ['INEGI', 'ENTIDAD', 'LEY', 'CONCEPTO', 'TIPO']
+N_CAMPOS = 2 + len(COLUMNAS_TEXTO) - 1 + len(MESES)  # AÑO + texto + meses = 18
+
+TAMANO_BLOQUE = 1 << 22
+COMA, COMILLA, SALTO, RETORNO, CERO = (ord(c) for c in ',"\n\r0')
+
+# Hash polinomial de 64 bits (módulo 2^64) sobre palabras de 8 bytes de las columnas de texto
+BASE_HASH = np.uint64(0x9E3779B97F4A7C15)
+MAXIMO_PALABRAS = 64
+POTENCIAS_HASH = np.full(MAXIMO_PALABRAS, BASE_HASH, dtype=np.uint64)
+POTENCIAS_HASH[0] = 1
+POTENCIAS_HASH = np.cumprod(POTENCIAS_HASH, dtype=np.uint64)
+
+# Constantes SWAR para convertir hasta 8 dígitos ASCII en una sola operación por palabra
+CEROS_ASCII = np.uint64(0x3030303030303030)
+NIBBLES_ALTOS = np.uint64(0xF0F0F0F0F0F0F0F0)
+MAS_SEIS = np.uint64(0x0606060606060606)
+TRESES = np.uint64(0x3333333333333333)
+BYTES_0_Y_4 = np.uint64(0x000000FF000000FF)
+FACTOR_PARES = np.uint64(100 + (1000000 << 32))
+FACTOR_CUARTETOS = np.uint64(1 + (10000 << 32))
+
+
+class FormatoInesperado(ValueError):
+    pass
+
+
+def _palabras(arr):
+    """Vista de arr como palabras de 8 bytes que empiezan en cada byte (lectura no alineada)"""
+    relleno = np.concatenate([arr, np.zeros(8, dtype=np.uint8)])
+    return np.ndarray((len(arr),), dtype='<u8', buffer=relleno, strides=(1,))
+
+
+def _mascaras(n_bytes):
+    """Máscara con los n_bytes (0-8) bytes bajos encendidos"""
+    bits = np.asarray(n_bytes, dtype=np.uint64) * np.uint64(8)
+    return np.where(bits >= 64, ~np.uint64(0), (np.uint64(1) << (bits & np.uint64(63))) - np.uint64(1))
+
+
+# Tablas por largo del campo (0-8): máscara, desplazamiento y relleno de '0' a la izquierda
+LARGOS = np.arange(9)
+MASCARAS = _mascaras(LARGOS)
+DESPLAZAMIENTOS = ((8 - LARGOS) * 8 % 64).astype(np.uint64)
+RELLENOS = CEROS_ASCII & _mascaras(8 - LARGOS)
+
+
+def _enteros(palabras, inicio, fin):
+    """
+    Enteros sin signo de hasta 8 dígitos en los rangos [inicio, fin); devuelve (valores int32, no_vacio).
+    Cada campo se lee como una palabra, se rellena con '0' a la izquierda y se convierte con SWAR.
+    """
+    largo = fin - inicio
+    if (largo > 8).any():
+        raise FormatoInesperado('campo numérico de más de 8 dígitos')
+    # '0' * (8 - largo) + campo, en orden de memoria (el primer carácter va en el byte bajo)
+    texto = ((palabras[inicio] & MASCARAS[largo]) << DESPLAZAMIENTOS[largo]) | RELLENOS[largo]
+    vacio = largo == 0
+    texto[vacio] = CEROS_ASCII
+    digitos = ((texto & NIBBLES_ALTOS) | (((texto + MAS_SEIS) & NIBBLES_ALTOS) >> np.uint64(4))) == TRESES
+    if not digitos.all():
+        raise FormatoInesperado('campo numérico con caracteres no numéricos')
+    valores = texto - CEROS_ASCII
+    valores = valores * np.uint64(10) + (valores >> np.uint64(8))
+    valores = ((valores & BYTES_0_Y_4) * FACTOR_PARES + ((valores >> np.uint64(16)) & BYTES_0_Y_4) * FACTOR_CUARTETOS) \
+        >> np.uint64(32)
+    return valores.astype(np.int32), ~vacio
+
+
+def _hash_rangos(palabras, inicio, fin):
+    """
+    Hash de cada rango [inicio, fin): Σ palabra_k · BASE^k (módulo 2^64) sobre sus palabras de 8 bytes,
+    con la última enmascarada; independiente de la posición del rango
+    """
+    largo = fin - inicio
+    n_palabras = np.maximum((largo + 7) // 8, 1)
+    if (n_palabras > MAXIMO_PALABRAS).any():
+        raise FormatoInesperado('columnas de texto demasiado largas')
+    primera = np.cumsum(n_palabras) - n_palabras
+    k = np.arange(int(n_palabras.sum())) - np.repeat(primera, n_palabras)
+    valores = palabras[np.repeat(inicio, n_palabras) + 8 * k]
+    ultima = primera + n_palabras - 1
+    valores[ultima] &= MASCARAS[largo - 8 * (n_palabras - 1)]
+    return np.add.reduceat(valores * POTENCIAS_HASH[k], primera) * BASE_HASH + largo.astype(np.uint64)
+
+
+def _separar_texto(crudo):
+    return tuple(next(csv.reader([crudo.decode('latin-1')])))
+
+
+def parsear_bloque(buffer):
+    """
+    Bloque de líneas completas (sin encabezado) → {anios, cabezas, codigos, meses, publicado}.
+    cabezas: tuplas (INEGI, ENTIDAD, LEY, CONCEPTO, TIPO) en orden de aparición; codigos: índice por línea.
+    """
+    arr = np.frombuffer(buffer, dtype=np.uint8)
+    if len(arr) > TAMANO_BLOQUE:
+        raise FormatoInesperado('bloque mayor que TAMANO_BLOQUE')
+    saltos = np.flatnonzero(arr == SALTO)
+    if len(saltos) == 0 or saltos[-1] != len(arr) - 1:
+        saltos = np.append(saltos, len(arr))
+
+    # Comas separadoras: las que quedan fuera de un par de comillas
+    comas = np.flatnonzero(arr == COMA)
+    comillas = np.flatnonzero(arr == COMILLA)
+    if len(comillas) % 2:
+        raise FormatoInesperado('comillas sin cerrar')
+    if len(comillas):
+        # Índices de las comas entre cada par de comillas
+        desde = np.searchsorted(comas, comillas[0::2])
+        cuantas = np.searchsorted(comas, comillas[1::2]) - desde
+        primera = np.cumsum(cuantas) - cuantas
+        dentro = np.repeat(desde - primera, cuantas) + np.arange(int(cuantas.sum()))
+        comas = np.delete(comas, dentro)
+    n = len(saltos)
+    if len(comas) != n * (N_CAMPOS - 1):
+        raise FormatoInesperado('número de campos distinto de 18 en alguna línea')
+    comas = comas.reshape(n, N_CAMPOS - 1)
+
+    inicio_linea = np.concatenate([[0], saltos[:-1] + 1])
+    fin_linea = saltos - (arr[np.clip(saltos - 1, 0, len(arr) - 1)] == RETORNO)
+    if (comas[:, 0] < inicio_linea).any() or (comas[:, -1] > fin_linea).any():
+        raise FormatoInesperado('comas fuera de su línea')
+
+    palabras = _palabras(arr)
+    anios, _ = _enteros(palabras, inicio_linea, comas[:, 0])
+    fin_meses = np.concatenate([comas[:, 6:], fin_linea[:, None]], axis=1)
+    meses, publicado = _enteros(palabras, (comas[:, 5:] + 1).ravel(), fin_meses.ravel())
+
+    # Columnas de texto: un hash por línea sobre los bytes de INEGI..TIPO
+    desde, hasta = comas[:, 0] + 1, comas[:, 5]
+    llaves = _hash_rangos(palabras, desde, hasta)
+    _, primera, codigos = np.unique(llaves, return_index=True, return_inverse=True)
+    if ((hasta - desde) != (hasta - desde)[primera][codigos]).any():
+        raise FormatoInesperado('colisión de hash en las columnas de texto')
+    # Reordenar por primera aparición
+    orden = np.argsort(primera)
+    rango = np.empty_like(orden)
+    rango[orden] = np.arange(len(orden))
+    cabezas = [_separar_texto(arr[desde[i]:hasta[i]].tobytes()) for i in primera[orden]]
+    return {
+        'anios': anios.astype(np.int16),
+        'cabezas': cabezas,
+        'codigos': rango[codigos].astype(np.int32),
+        'meses': meses.reshape(n, len(MESES)),
+        'publicado': publicado.reshape(n, len(MESES)),
+    }
+
+
+def parsear_bloque_csv(buffer):
+    """Mismo resultado que parsear_bloque, con el módulo csv (respaldo para bloques irregulares)"""
+    anios, codigos, meses, publicado = [], [], [], []
+    indice = {}
+    for fila in csv.reader(io.StringIO(buffer.decode('latin-1'))):
+        if not fila:
+            continue
+        cabeza = tuple(fila[1:6])
+        codigos.append(indice.setdefault(cabeza, len(indice)))
+        anios.append(int(fila[0]))
+        meses.append([int(v) if v.strip() else 0 for v in fila[6:]])
+        publicado.append([bool(v.strip()) for v in fila[6:]])
+    return {
+        'anios': np.array(anios, dtype=np.int16),
+        'cabezas': list(indice),
+        'codigos': np.array(codigos, dtype=np.int32),
+        'meses': np.array(meses, dtype=np.int32).reshape(-1, len(MESES)),
+        'publicado': np.array(publicado, dtype=bool).reshape(-1, len(MESES)),
+    }
+
+
+def leer_bloque(buffer):
+    try:
+        return parsear_bloque(buffer)
+    except FormatoInesperado:
+        return parsear_bloque_csv(buffer)
+
+
+def bloques(datos, inicio, tamano=TAMANO_BLOQUE):
+    """Rangos (desde, hasta) de hasta `tamano` bytes que terminan en fin de línea"""
+    rangos = []
+    while inicio < len(datos):
+        hasta = min(inicio + tamano, len(datos))
+        if hasta < len(datos):
+            salto = datos.rfind(b'\n', inicio, hasta)
+            if salto < 0:
+                raise FormatoInesperado(f'línea de más de {tamano} bytes')
+            hasta = salto + 1
+        rangos.append((inicio, hasta))
+        inicio = hasta
+    return rangos
+
+
+def combinar(partes):
+    """Une los resultados por bloque con un solo catálogo de cabezas (orden de aparición)"""
+    indice = {}
+    codigos = []
+    for parte in partes:
+        mapa = np.array([indice.setdefault(c, len(indice)) for c in parte['cabezas']], dtype=np.int32)
+        codigos.append(mapa[parte['codigos']] if len(mapa) else parte['codigos'])
+    cabezas = list(indice)
+
+    # Cada columna de texto como código categórico sobre las cabezas distintas
+    dimensiones = {}
+    for i, columna in enumerate(COLUMNAS_TEXTO):
+        codigos_columna, categorias = pd.factorize(pd.Index([c[i] for c in cabezas]))
+        dimensiones[columna] = (codigos_columna.astype(np.int16), list(categorias))
+    return {
+        'anios': np.concatenate([p['anios'] for p in partes]),
+        'cabezas': cabezas,
+        'codigos': np.concatenate(codigos),
+        'dimensiones': dimensiones,  # columna → (código por cabeza, categorías)
+        'meses': np.concatenate([p['meses'] for p in partes]),
+        'publicado': np.concatenate([p['publicado'] for p in partes]),
+    }
+
+
+_MAPAS = {}  # archivo → mmap abierto en el proceso actual
+
+
+def _mapa(archivo):
+    if archivo not in _MAPAS:
+        with open(archivo, 'rb') as f:
+            _MAPAS[archivo] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _MAPAS[archivo]
+
+
+def _leer_rango(tarea):
+    archivo, desde, hasta = tarea
+    return leer_bloque(_mapa(archivo)[desde:hasta])
+
+
+def leer_ideff_rapido(archivo=IDEFF_ORIGINAL, procesos=1):
+    """
+    Lectura completa: {anios int16, codigos int32 (cabeza por fila), cabezas, dimensiones,
+    meses int32 [fila, 12], publicado bool [fila, 12]}.
+    procesos: número de procesos para los bloques (None = todos los núcleos).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    with open(archivo, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+        inicio = datos.find(b'\n') + 1  # encabezado
+        rangos = bloques(datos, inicio)
+        if procesos == 1 or len(rangos) == 1:
+            return combinar([leer_bloque(datos[desde:hasta]) for desde, hasta in rangos])
+
+    tareas = [(str(archivo), desde, hasta) for desde, hasta in rangos]
+    with ProcessPoolExecutor(max_workers=min(procesos, len(tareas))) as ejecutor:
+        return combinar(list(ejecutor.map(_leer_rango, tareas)))
+
+
+def codigos_por_fila(lectura, columna):
+    """Código categórico de `columna` en cada fila y sus categorías"""
+    codigos_cabeza, categorias = lectura['dimensiones'][columna]
+    return codigos_cabeza[lectura['codigos']], categorias
+
+
+def a_dataframe(lectura):
+    """DataFrame con las columnas de la fuente: texto categórico y meses float (NaN = no publicado)"""
+    df = pd.DataFrame({'AÑO': lectura['anios']})
+    for columna in COLUMNAS_TEXTO:
+        codigos, categorias = codigos_por_fila(lectura, columna)
+        df[columna] = pd.Categorical.from_codes(codigos, categories=categorias)
+    meses = np.where(lectura['publicado'], lectura['meses'], np.nan)
+    return pd.concat([df, pd.DataFrame(meses, columns=MESES)], axis=1)
+
+
+# ---- Benchmark ----
+
+def archivo_sintetico(destino, repeticiones=100, origen=IDEFF_ORIGINAL):
+    """Copia de la base con las filas repetidas `repeticiones` veces"""
+    datos = Path(origen).read_bytes()
+    corte = datos.index(b'\n') + 1
+    with open(destino, 'wb') as f:
+        f.write(datos[:corte])
+        for _ in range(repeticiones):
+            f.write(datos[corte:])
+
+
+def _medir(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def comparar_procesos(archivo, lista_procesos):
+    """Tiempo del lector rápido con distintos números de procesos; verifica que el resultado no cambie"""
+    base, _ = _medir(leer_ideff_rapido, archivo, 1)
+    tiempos = {}
+    for procesos in lista_procesos:
+        lectura, tiempos[procesos] = _medir(leer_ideff_rapido, archivo, procesos)
+        if not all(np.array_equal(lectura[k], base[k]) for k in ['anios', 'codigos', 'meses', 'publicado']) \
+                or lectura['cabezas'] != base['cabezas']:
+            raise ValueError(f'el resultado con {procesos} procesos no coincide con 1 proceso')
+    return tiempos
+
+
+def comparar_con_pandas(archivo):
+    """Tiempo de pd.read_csv (con meses a float como process_database.py) contra el lector rápido"""
+    df, t_pandas = _medir(lambda: pd.read_csv(archivo, encoding='latin-1'))
+    lectura, t_rapido = _medir(leer_ideff_rapido, archivo)
+
+    esperado = df[MESES].to_numpy(dtype=float)
+    obtenido = np.where(lectura['publicado'], lectura['meses'], np.nan)
+    iguales = (
+        np.array_equal(esperado, obtenido, equal_nan=True)
+        and np.array_equal(df.iloc[:, 0].to_numpy(), lectura['anios'])
+        and all((df[c].fillna('').astype(str).to_numpy()
+                 == np.array(codigos_por_fila(lectura, c)[1], dtype=object)[codigos_por_fila(lectura, c)[0]]
+                 .astype(str)).all() for c in ['ENTIDAD', 'LEY', 'CONCEPTO', 'TIPO'])
+    )
+    return t_pandas, t_rapido, len(df), iguales
+
+
+def benchmark_lector(repeticiones=100):
+    """Compara el lector rápido con pd.read_csv en la base real y en una copia repetida"""
+    print("⏱️  Lector IDEFF: pd.read_csv contra lector rápido")
+    with tempfile.TemporaryDirectory() as directorio:
+        sintetico = Path(directorio) / 'IDEFF_sintetico.csv'
+        archivo_sintetico(sintetico, repeticiones)
+        for nombre, archivo in [('real', IDEFF_ORIGINAL), (f'{repeticiones}×', sintetico)]:
+            t_pandas, t_rapido, filas, iguales = comparar_con_pandas(archivo)
+            print(f"   • {nombre} ({filas:,} filas): pandas {t_pandas:.3f} s, rápido {t_rapido:.3f} s "
+                  f"({t_pandas / t_rapido:.1f}×) {'✅ mismos valores' if iguales else '❌ valores distintos'}")
+
+        nucleos = os.cpu_count() or 1
+        lista_procesos = sorted({1, 2, 4, 8, nucleos} & set(range(1, max(nucleos, 2) + 1)))
+        tiempos = comparar_procesos(sintetico, lista_procesos)
+        print(f"   • {repeticiones}× por procesos ({nucleos} núcleos disponibles):")
+        for procesos, duracion in tiempos.items():
+            print(f"      - {procesos}: {duracion:.3f} s ({tiempos[1] / duracion:.1f}×)")
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_lector()
+    else:
+        lectura, duracion = _medir(leer_ideff_rapido, IDEFF_ORIGINAL)
+        print(f"✅ {IDEFF_ORIGINAL}: {len(lectura['anios']):,} filas, {len(lectura['cabezas'])} combinaciones "
+              f"de texto en {duracion * 1000:.1f} ms")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para limpiar la exportación cruda de la hoja del Gabinete de Seguridad
+(Gabinete_Seguridad_Capturas_Relevantes - Sheet1.csv) y anexar a gabinete_detenidos_final.csv
+solo las conferencias que aún no existen. Se procesa fila por fila con generadores, por lo que la
+memoria no crece con el tamaño de la exportación.
+  - Corrige el encabezado dañado ('. Cconference_id')
+  - Propaga conference_id / conference_date a las filas de la misma conferencia
+  - Separa las filas con varias personas (viñetas '—') en un registro por detenido
+  - Extrae el alias ('(alias “El Pepino”)') a detainee_alias
+  - Normaliza guiones, espacios, '?' y la columna de extradición
+  - Conserva original_row_id (fila de la exportación) como linaje
+"""
+
+import csv
+import re
+import sys
+from pathlib import Path
+
+from homologar_grupos_criminales import cargar_homologaciones
+
+EXPORT_FILE = Path('data/Gabinete_Seguridad_Capturas_Relevantes - Sheet1.csv')
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+
+COLUMNAS_FINALES = [
+    'conference_id', 'conference_date', 'detainee_name', 'detainee_age', 'detainee_alias',
+    'criminal_group', 'charges_or_supposed_role', 'date_of_arrest', 'city_municipality',
+    'state_of_arrest', 'involved_institutions', 'US_request_extradition', 'items_seized',
+    'additional_details', 'other', 'original_row_id',
+]
+
+# Columnas que se repiten en las filas siguientes de la misma conferencia
+COLUMNAS_PROPAGADAS = ['conference_id', 'conference_date']
+
+IDENTIDAD_DESCONOCIDA = 'Identidad desconocida'
+SIN_DATO = {'', '?'}
+
+# Viñeta al inicio de línea: guion largo, en dash, guion simple o punto
+PATRON_VINETA = re.compile(r'^\s*[—–\-•]\s*')
+PATRON_ESPACIOS = re.compile(r'[ \t ]+')
+# El paréntesis de cierre a veces falta en la hoja ('(alias "Gordo de Sempuala"')
+PATRON_ALIAS = re.compile(r'^(?P<nombre>.*?)\s*\(\s*alias\s+(?P<alias>[^)]*)\)?\s*$', re.IGNORECASE)
+PATRON_PERSONAS = re.compile(r'^(?P<cantidad>\d+)\s+(?P<otras>otras?\s+)?personas?$', re.IGNORECASE)
+EXTRADICION_SI = {'sí', 'si'}
+
+
+def normalizar_encabezado(columna):
+    """'. Cconference_id' → 'conference_id'; el resto solo se recorta"""
+    columna = columna.strip().lstrip('.').strip()
+    if columna.lower().endswith('conference_id'):
+        return 'conference_id'
+    return columna
+
+
+def normalizar_linea(linea):
+    """Viñeta inicial como '—' y espacios colapsados"""
+    linea = PATRON_ESPACIOS.sub(' ', linea).strip()
+    if PATRON_VINETA.match(linea):
+        linea = '—' + PATRON_VINETA.sub('', linea)
+    return linea
+
+
+def limpiar_celda(texto):
+    """
+    Une las líneas de una celda y vacía los marcadores sin dato. Las viñetas se pegan tal cual
+    ('—a—b', como en gabinete_detenidos_final.csv); las demás líneas se separan con un espacio.
+    """
+    unido = ''
+    for linea in (texto or '').replace('\r', '').split('\n'):
+        linea = normalizar_linea(linea)
+        if linea:
+            unido += linea if not unido or linea.startswith('—') else ' ' + linea
+    return '' if unido in SIN_DATO else unido
+
+
+def separar_vinetas(texto):
+    """Lista de elementos de una celda con viñetas en varias líneas (sin el '—')"""
+    elementos = []
+    for linea in (texto or '').replace('\r', '').split('\n'):
+        linea = PATRON_VINETA.sub('', normalizar_linea(linea))
+        if linea and linea not in SIN_DATO:
+            elementos.append(linea)
+    return elementos
+
+
+def separar_alias(nombre):
+    """
+    'Luis Mario "N" (alias “El Pepino”)' → ('Luis Mario "N"', '“El Pepino”').
+    Como en gabinete_detenidos_final.csv, solo se quitan las comillas rectas de los extremos
+    de la línea y del alias ('Pedro "N"' → 'Pedro "N', '"Don Alex", "Chupón"' → 'Don Alex", "Chupón').
+    """
+    nombre = nombre.strip('"')
+    coincidencia = PATRON_ALIAS.match(nombre)
+    if not coincidencia:
+        return nombre, ''
+    return coincidencia.group('nombre'), coincidencia.group('alias').strip().strip('"')
+
+
+def normalizar_extradicion(texto):
+    """
+    'Sí'/'Si' → 'Sí', 'No' → 'No'; cualquier otro texto ('?', vacío o una descripción
+    de la orden de EE.UU.) queda vacío para revisarlo a mano.
+    """
+    texto = PATRON_ESPACIOS.sub(' ', texto or '').strip().lower()
+    if texto in EXTRADICION_SI:
+        return 'Sí'
+    if texto == 'no':
+        return 'No'
+    return ''
+
+
+def personas_de_fila(nombres, edades):
+    """
+    Genera (nombre, alias, edad) por detenido de la fila.
+    Como en gabinete_detenidos_final.csv, cada mención es un registro salvo '4 otras personas',
+    que se expande a 'Otra persona 1..4'; '1 otra persona' y '7 personas' quedan literales.
+    Las edades en viñetas se asignan por posición a los detenidos con nombre.
+    """
+    nombres = separar_vinetas(nombres) or [IDENTIDAD_DESCONOCIDA]
+    edades = separar_vinetas(edades)
+    posicion = 0
+    for nombre in nombres:
+        personas = PATRON_PERSONAS.match(nombre)
+        if personas and personas.group('otras') and int(personas.group('cantidad')) > 1:
+            for i in range(1, int(personas.group('cantidad')) + 1):
+                yield f'Otra persona {i}', '', ''
+            continue
+        nombre, alias = separar_alias(nombre)
+        edad = edades[posicion] if posicion < len(edades) else ''
+        posicion += 1
+        yield nombre, alias, edad
+
+
+def leer_export(archivo=EXPORT_FILE):
+    """Genera las filas crudas de la exportación como dicts con encabezado corregido y original_row_id"""
+    with open(archivo, encoding='utf-8', newline='') as f:
+        lector = csv.reader(f)
+        columnas = [normalizar_encabezado(c) for c in next(lector)]
+        for original_row_id, valores in enumerate(lector):
+            fila = dict(zip(columnas, valores))
+            fila['original_row_id'] = original_row_id
+            yield fila
+
+
+def limpiar_export(filas, homologaciones=None):
+    """Genera un registro limpio por detenido a partir de las filas crudas"""
+    homologaciones = homologaciones or {}
+    propagado = dict.fromkeys(COLUMNAS_PROPAGADAS, '')
+
+    for fila in filas:
+        for columna in COLUMNAS_PROPAGADAS:
+            valor = limpiar_celda(fila.get(columna))
+            if valor:
+                propagado[columna] = valor
+
+        base = {columna: limpiar_celda(fila.get(columna)) for columna in COLUMNAS_FINALES[:-1]}
+        base.update(propagado)
+        base['criminal_group'] = homologaciones.get(base['criminal_group'], base['criminal_group'])
+        base['US_request_extradition'] = normalizar_extradicion(fila.get('US_request_extradition'))
+        base['original_row_id'] = fila['original_row_id']
+
+        for nombre, alias, edad in personas_de_fila(fila.get('detainee_name'), fila.get('detainee_age')):
+            yield {**base, 'detainee_name': nombre, 'detainee_alias': alias, 'detainee_age': edad}
+
+
+def conferencias_existentes(destino=CSV_DETENIDOS):
+    """Conjunto de conference_id ya presentes en el CSV final (lectura en streaming)"""
+    if not Path(destino).exists():
+        return set()
+    with open(destino, encoding='utf-8', newline='') as f:
+        return {fila['conference_id'] for fila in csv.DictReader(f)}
+
+
+def anexar_conferencias_nuevas(origen=EXPORT_FILE, destino=CSV_DETENIDOS):
+    """Limpia la exportación y anexa al CSV final solo las conferencias no vistas"""
+
+    try:
+        print("🔄 Limpiando exportación del Gabinete de Seguridad...")
+
+        existentes = conferencias_existentes(destino)
+        print(f"✅ Conferencias ya registradas: {len(existentes)}")
+
+        nuevo_archivo = not Path(destino).exists()
+        registros = 0
+        conferencias = set()
+        with open(destino, 'a', encoding='utf-8', newline='') as f:
+            escritor = csv.DictWriter(f, fieldnames=COLUMNAS_FINALES, lineterminator='\n')
+            if nuevo_archivo:
+                escritor.writeheader()
+            for registro in limpiar_export(leer_export(origen), cargar_homologaciones()):
+                if registro['conference_id'] in existentes:
+                    continue
+                escritor.writerow(registro)
+                registros += 1
+                conferencias.add(registro['conference_id'])
+
+        if registros:
+            print(f"💾 {registros} detenidos de {len(conferencias)} conferencias nuevas anexados a: {destino}")
+            print(f"   • Conferencias: {', '.join(sorted(conferencias, key=lambda c: (len(c), c)))}")
+        else:
+            print("✅ Sin conferencias nuevas en la exportación")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error limpiando exportación: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    # Uso: python python/limpiar_export_gabinete.py [exportacion.csv] [destino.csv]
+    argumentos = sys.argv[1:]
+    if not anexar_conferencias_nuevas(
+        Path(argumentos[0]) if len(argumentos) > 0 else EXPORT_FILE,
+        Path(argumentos[1]) if len(argumentos) > 1 else CSV_DETENIDOS,
+    ):
+        sys.exit(1)
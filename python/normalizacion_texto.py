@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades compartidas de normalización de texto
+Minúsculas, eliminación de acentos y tokenización para búsquedas y homologaciones
+"""
+
+import re
+import unicodedata
+
+# Tokens: secuencias de letras/dígitos (después de quitar acentos)
+PATRON_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def quitar_acentos(texto):
+    """Elimina acentos y diacríticos conservando la letra base (á → a, ñ → n)"""
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def normalizar_texto(texto):
+    """Convierte a minúsculas sin acentos; valores nulos se vuelven cadena vacía"""
+    if texto is None or texto != texto:  # None o NaN
+        return ''
+    return quitar_acentos(str(texto)).lower()
+
+
+def tokenizar(texto):
+    """Lista de tokens normalizados (minúsculas, sin acentos) en orden de aparición"""
+    return PATRON_TOKEN.findall(normalizar_texto(texto))
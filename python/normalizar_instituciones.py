@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para normalizar involved_institutions a un catálogo canónico de instituciones
+Cada detenido se codifica como una máscara de bits (un bit por institución), de modo que
+combinaciones, totales, co-ocurrencias y consultas ("SEMAR sin SEDENA") son operaciones
+de bits sobre un arreglo NumPy. Regenera:
+  - data/gabinete_institutions_normalized.json
+  - data/todas_las_combinaciones_instituciones.txt
+  - data/instituciones_individuales_unicas.json / .txt
+"""
+
+import re
+import sys
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from normalizacion_texto import normalizar_texto
+
+# Catálogo canónico: la posición en la lista es el bit de la institución.
+# Cada institución tiene un patrón sobre el fragmento normalizado (minúsculas, sin acentos);
+# un fragmento puede activar varias ('Defensa Nacional SSPC', 'CENFI/CNI').
+INSTITUCIONES = [
+    ('SEDENA', r'defensa|ejercito|sedena|militar'),
+    ('SEMAR', r'semar|marina|naval'),
+    ('SSPC', r'\bsspc\b|\bsscp\b|^secretaria de seguridad$|seguridad y proteccion ciudadana'),
+    ('FGR', r'\bfgr\b|republica|\baic\b|^agencia de investigacion criminal|delincuencia organizada'),
+    ('Guardia Nacional', r'guardia nacional'),
+    ('CNI', r'\bcni\b|centro nacional de inteligencia'),
+    ('Fiscalía General del Estado',
+     r'^fiscal(?!.*(republica|delincuencia organizada))|\bfge|\bfgj|procuraduria|agencia ministerial|\bamic\b'),
+    ('Policía Estatal',
+     r'policia estatal|fuerza civil|\bsspe\b|ssedomex|seguridad (publica )?estatal|'
+     r'secretarias? de seguridad (de|del) |seguridad ciudadana de |pakal|reaccion inmediata|subsecretaria de seguridad'),
+    ('Secretaría de Seguridad Ciudadana CDMX', r'\bssc.?cdmx|policia de la cdmx'),
+    ('Policía Municipal', r'municipal'),
+    ('INM', r'\binm\b|instituto nacional de migracion'),
+    ('CENFI', r'cenfi|cerfi'),
+    ('Centro Nacional de Vigilancia Aérea', r'centro nacional de vigilancia|espacio aereo'),
+    ('Gabinete de Seguridad', r'gabinete'),
+    ('Pemex', r'pemex'),
+    ('Interpol', r'interpol'),
+]
+
+NOMBRES_INSTITUCIONES = [nombre for nombre, _ in INSTITUCIONES]
+PATRONES_INSTITUCIONES = [re.compile(patron) for _, patron in INSTITUCIONES]
+BITS = {nombre: np.uint32(1) << np.uint32(i) for i, nombre in enumerate(NOMBRES_INSTITUCIONES)}
+
+# Separadores de instituciones dentro del texto original
+PATRON_SEPARADOR = re.compile(r',|/|\s+y\s+|\s+más\s+')
+
+CSV_DETENIDOS = Path('data/gabinete_detenidos_final.csv')
+NORMALIZADO_FILE = Path('data/gabinete_institutions_normalized.json')
+COMBINACIONES_FILE = Path('data/todas_las_combinaciones_instituciones.txt')
+INDIVIDUALES_JSON = Path('data/instituciones_individuales_unicas.json')
+INDIVIDUALES_TXT = Path('data/instituciones_individuales_unicas.txt')
+COOCURRENCIA_FILE = Path('data/instituciones_coocurrencia.csv')
+MASCARAS_FILE = Path('data/instituciones_mascaras.npz')
+
+
+def mascara_de_texto(texto):
+    """Convierte 'FGR, SEDENA, SEMAR, SSPC' en la máscara de bits de sus instituciones"""
+    mascara = 0
+    for fragmento in PATRON_SEPARADOR.split(texto):
+        fragmento = normalizar_texto(fragmento).strip()
+        if not fragmento:
+            continue
+        for bit, patron in enumerate(PATRONES_INSTITUCIONES):
+            if patron.search(fragmento):
+                mascara |= 1 << bit
+    return mascara
+
+
+def calcular_mascaras(instituciones):
+    """Máscara uint32 por fila; cada texto distinto se parsea una sola vez"""
+    codigos, unicos = pd.factorize(instituciones.fillna(''))
+    mascaras_unicas = np.array([mascara_de_texto(t) for t in unicos], dtype=np.uint32)
+    return mascaras_unicas[codigos]
+
+
+def matriz_bits(mascaras):
+    """Matriz booleana (filas × instituciones) a partir de las máscaras"""
+    posiciones = np.arange(len(NOMBRES_INSTITUCIONES), dtype=np.uint32)
+    return ((mascaras[:, None] >> posiciones) & 1).astype(bool)
+
+
+def contar_bits(mascaras):
+    """Número de instituciones por fila (popcount)"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(mascaras).astype(np.int64)
+    return matriz_bits(mascaras).sum(axis=1)
+
+
+def mascara_de_nombres(nombres):
+    mascara = np.uint32(0)
+    for nombre in nombres:
+        mascara |= BITS[nombre]
+    return mascara
+
+
+def consultar(mascaras, incluye=(), excluye=()):
+    """
+    Filas donde participan todas las instituciones de `incluye` y ninguna de `excluye`.
+    Ej.: consultar(mascaras, incluye=['SEMAR'], excluye=['SEDENA'])
+    """
+    requerida = mascara_de_nombres(incluye)
+    prohibida = mascara_de_nombres(excluye)
+    return ((mascaras & requerida) == requerida) & ((mascaras & prohibida) == 0)
+
+
+def nombre_combinacion(mascara):
+    return ', '.join(sorted(n for i, n in enumerate(NOMBRES_INSTITUCIONES) if (int(mascara) >> i) & 1))
+
+
+def normalizar_instituciones():
+    """Normaliza instituciones a máscaras de bits y regenera los archivos derivados"""
+
+    try:
+        print("🔄 Normalizando instituciones participantes...")
+
+        df = pd.read_csv(CSV_DETENIDOS, encoding='utf-8')
+        print(f"✅ CSV leído: {len(df)} filas")
+
+        mascaras = calcular_mascaras(df['involved_institutions'])
+        con_dato = mascaras != 0
+        total_registros = len(df)
+        registros_con_dato = int(con_dato.sum())
+        print(f"✅ Registros con institución reconocida: {registros_con_dato}")
+
+        # Persistir máscaras para otras etapas (latencias por institución, consultas)
+        np.savez_compressed(
+            MASCARAS_FILE,
+            mascaras=mascaras,
+            original_row_id=df['original_row_id'].to_numpy(),
+            instituciones=np.array(NOMBRES_INSTITUCIONES),
+        )
+        print(f"💾 Máscaras guardadas en: {MASCARAS_FILE}")
+
+        # Totales por institución y co-ocurrencias
+        bits = matriz_bits(mascaras[con_dato]).astype(np.int64)
+        totales = bits.sum(axis=0)
+        coocurrencia = bits.T @ bits
+        df_coocurrencia = pd.DataFrame(coocurrencia, index=NOMBRES_INSTITUCIONES, columns=NOMBRES_INSTITUCIONES)
+        df_coocurrencia.index.name = 'institucion'
+        df_coocurrencia.to_csv(COOCURRENCIA_FILE, encoding='utf-8')
+        print(f"💾 Matriz de co-ocurrencia guardada en: {COOCURRENCIA_FILE}")
+
+        ranking = sorted(
+            ((nombre, int(total)) for nombre, total in zip(NOMBRES_INSTITUCIONES, totales) if total > 0),
+            key=lambda par: -par[1],
+        )
+
+        # Combinaciones exactas: valores distintos de la máscara
+        valores, conteos = np.unique(mascaras[con_dato], return_counts=True)
+        orden = np.argsort(-conteos, kind='stable')
+        combinaciones = [(nombre_combinacion(valores[i]), int(conteos[i])) for i in orden]
+
+        valores_originales = int(df['involved_institutions'].dropna().nunique())
+        total_menciones = int(totales.sum())
+
+        normalizado = {
+            'total_registros': total_registros,
+            'registros_con_institution': registros_con_dato,
+            'porcentaje_cobertura': round((registros_con_dato / total_registros) * 100, 1),
+            'valores_unicos_originales': valores_originales,
+            'valores_unicos_normalizados': len(combinaciones),
+            'reduccion_porcentaje': round((1 - len(combinaciones) / valores_originales) * 100, 1),
+            'top_combinaciones': [list(c) for c in combinaciones[:15]],
+            'top_instituciones_individuales': [list(r) for r in ranking[:15]],
+        }
+        with open(NORMALIZADO_FILE, 'w', encoding='utf-8') as f:
+            json.dump(normalizado, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resumen normalizado guardado en: {NORMALIZADO_FILE}")
+
+        with open(COMBINACIONES_FILE, 'w', encoding='utf-8') as f:
+            f.write(f"TODAS LAS {len(combinaciones)} COMBINACIONES ÚNICAS DE INSTITUCIONES NORMALIZADAS\n")
+            f.write("=" * 80 + "\n")
+            f.write(f"Total de registros con institución: {registros_con_dato}\n")
+            f.write(f"Total de combinaciones únicas: {len(combinaciones)}\n\n")
+            for i, (combinacion, casos) in enumerate(combinaciones, 1):
+                porcentaje = round((casos / registros_con_dato) * 100, 1)
+                f.write(f"{i:2d}. '{combinacion}' → {casos} casos ({porcentaje}%)\n")
+        print(f"💾 Combinaciones guardadas en: {COMBINACIONES_FILE}")
+
+        individuales = {
+            'total_registros': total_registros,
+            'registros_con_datos': registros_con_dato,
+            'total_menciones': total_menciones,
+            'instituciones_unicas': len(ranking),
+            'promedio_por_operacion': round(total_menciones / registros_con_dato, 1),
+            'catalogo': {nombre: patron for nombre, patron in INSTITUCIONES},
+            'instituciones_ranking': [list(r) for r in ranking],
+        }
+        with open(INDIVIDUALES_JSON, 'w', encoding='utf-8') as f:
+            json.dump(individuales, f, ensure_ascii=False, indent=2)
+
+        with open(INDIVIDUALES_TXT, 'w', encoding='utf-8') as f:
+            f.write("INSTITUCIONES INDIVIDUALES ÚNICAS (CATÁLOGO CANÓNICO)\n")
+            f.write("=" * 60 + "\n")
+            f.write(f"Registros con datos: {registros_con_dato}\n")
+            f.write(f"Total menciones: {total_menciones:,}\n")
+            f.write(f"Instituciones únicas: {len(ranking)}\n")
+            f.write(f"Promedio por operación: {individuales['promedio_por_operacion']}\n\n")
+            for i, (nombre, menciones) in enumerate(ranking, 1):
+                porcentaje = round((menciones / registros_con_dato) * 100, 1)
+                f.write(f"{i:2d}. {nombre}: {menciones} menciones ({porcentaje}%)\n")
+        print(f"💾 Instituciones individuales guardadas en: {INDIVIDUALES_JSON} y {INDIVIDUALES_TXT}")
+
+        # Resumen
+        print(f"\n📊 INSTITUCIONES (de {registros_con_dato} registros):")
+        for nombre, menciones in ranking:
+            print(f"   • {nombre}: {menciones}")
+        print(f"\n📋 Combinaciones únicas: {len(combinaciones)} (de {valores_originales} textos originales)")
+        print(f"🔍 Operaciones con SEMAR sin SEDENA: {int(consultar(mascaras, ['SEMAR'], ['SEDENA']).sum())}")
+        print(f"📈 Promedio de instituciones por operación: {contar_bits(mascaras[con_dato]).mean():.1f}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error normalizando instituciones: {e}")
+        return False
+
+
+def consultar_desde_archivo(incluye, excluye):
+    """Consulta rápida sobre las máscaras persistidas, sin releer el CSV"""
+    datos = np.load(MASCARAS_FILE)
+    seleccion = consultar(datos['mascaras'], incluye, excluye)
+    print(f"🔍 Incluye {incluye or '-'} / excluye {excluye or '-'}: {int(seleccion.sum())} detenidos")
+    return datos['original_row_id'][seleccion]
+
+
+if __name__ == "__main__":
+    # Uso: python python/normalizar_instituciones.py --incluye SEMAR --excluye SEDENA
+    if '--incluye' in sys.argv or '--excluye' in sys.argv:
+        argumentos = sys.argv[1:]
+        incluye = [argumentos[i + 1] for i, a in enumerate(argumentos) if a == '--incluye']
+        excluye = [argumentos[i + 1] for i, a in enumerate(argumentos) if a == '--excluye']
+        consultar_desde_archivo(incluye, excluye)
+    elif not normalizar_instituciones():
+        sys.exit(1)
@@ -99,4 +99,5 @@ def process_ideff_database():
         return False
 
 if __name__ == "__main__":
-    process_ideff_database()
\ No newline at end of file
+    if not process_ideff_database():
+        exit(1)
\ No newline at end of file
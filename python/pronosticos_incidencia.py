@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para pronosticar el siguiente trimestre de todas las series de incidencia
+Ajusta Holt-Winters aditivo (nivel, tendencia y estacionalidad de 12 meses) a todas las
+series entidad × LEY/CONCEPTO/TIPO del cubo mensual a la vez:
+  - la búsqueda de (alpha, beta, gamma) corre sobre una rejilla [combinación, serie]
+    y después se refina alrededor del mejor punto de cada serie
+  - los intervalos de predicción usan la varianza analítica del modelo ETS(A,A,A)
+Salidas: data/pronosticos_incidencia.csv y data/mapas/pronosticos_incidencia.json
+(mismo formato que construir_geometrias.py, para mapas y gráficas). El arreglo es de valores
+pronosticados: clases_mapas.py le calcula clases, pero autocorrelacion_espacial.py no lo lee.
+"""
+
+import sys
+import json
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from entidades import N_CLAVES
+from cubo_ideff import cargar_cubo, etiquetas_series, meses_publicados, series_del_cubo
+
+PRONOSTICOS_FILE = Path('data/pronosticos_incidencia.csv')
+MAPA_PRONOSTICOS_FILE = Path('data/mapas/pronosticos_incidencia.json')
+
+PERIODO = 12
+HORIZONTE = 3
+
+ALFAS = [0.05, 0.15, 0.3, 0.5, 0.8]
+BETAS = [0.0, 0.03, 0.1, 0.25]
+GAMMAS = [0.0, 0.1, 0.25, 0.5]
+PASO_REFINAMIENTO = 0.03
+
+# Cuantiles normales de los intervalos de predicción
+NIVELES = {80: 1.2816, 95: 1.9600}
+
+
+def inicio_de_series(matriz):
+    """Primer mes con dato de cada serie"""
+    return np.argmax(~np.isnan(matriz), axis=1)
+
+
+def inicializar(matriz, inicio):
+    """
+    Estado inicial con las dos primeras temporadas de cada serie:
+    nivel = media de la primera, tendencia = diferencia de medias / PERIODO,
+    estacionalidad = primera temporada - nivel (indexada por mes calendario)
+    """
+    n_series = len(matriz)
+    primeras = np.take_along_axis(matriz, inicio[:, None] + np.arange(2 * PERIODO)[None, :], axis=1)
+    nivel = primeras[:, :PERIODO].mean(axis=1)
+    tendencia = (primeras[:, PERIODO:].mean(axis=1) - nivel) / PERIODO
+    estacional = np.empty((PERIODO, n_series))
+    meses = (inicio[None, :] + np.arange(PERIODO)[:, None]) % PERIODO
+    np.put_along_axis(estacional, meses, (primeras[:, :PERIODO] - nivel[:, None]).T, axis=0)
+    return nivel, tendencia, estacional
+
+
+def filtrar(matriz, inicio, fin, alfa, beta, gamma):
+    """
+    Recursión de Holt-Winters aditivo para todas las series y combinaciones a la vez.
+    matriz [serie, mes] (el mes 0 es enero); alfa/beta/gamma [combinación, serie].
+    Cada serie arranca en su inicio; el error se acumula a partir de su segunda temporada.
+    Devuelve (nivel, tendencia, estacional [mes, combinación, serie], sse, n) al cierre del mes fin - 1.
+    """
+    forma = alfa.shape
+    nivel0, tendencia0, estacional0 = inicializar(matriz, inicio)
+    nivel = np.broadcast_to(nivel0, forma).copy()
+    tendencia = np.broadcast_to(tendencia0, forma).copy()
+    estacional = np.broadcast_to(estacional0[:, None, :], (PERIODO,) + forma).copy()
+    sse = np.zeros(forma)
+    n = np.zeros(forma[1])
+
+    for t in range(int(inicio.min()), fin):
+        y = matriz[:, t]
+        # Pesos por serie: sin dato el paso no actualiza; antes del inicio tampoco avanza la tendencia
+        activo = (t >= inicio).astype(float)
+        valido = activo * ~np.isnan(y)
+        contar = valido * (t >= inicio + PERIODO)
+        y = np.nan_to_num(y)
+        s = estacional[t % PERIODO]
+        previsto = nivel + tendencia * activo
+
+        error = y - previsto - s
+        sse += contar * error * error
+        n += contar
+
+        nuevo_nivel = previsto + alfa * valido * (y - s - previsto)
+        tendencia += beta * valido * (nuevo_nivel - nivel - tendencia)
+        s += gamma * valido * (y - nuevo_nivel - s)
+        nivel = nuevo_nivel
+
+    return nivel, tendencia, estacional, sse, n
+
+
+def buscar_parametros(matriz, inicio, fin):
+    """Rejilla de (alfa, beta, gamma) para todas las series y un refinamiento local alrededor del mejor"""
+    rejilla = np.array(list(itertools.product(ALFAS, BETAS, GAMMAS)))  # [combinación, 3]
+    n_series = len(matriz)
+
+    def evaluar(parametros):
+        # parametros [combinación, serie, 3] → (sse, parametros)
+        *_, sse, _ = filtrar(matriz, inicio, fin, *np.moveaxis(parametros, 2, 0))
+        return sse, parametros
+
+    sse, candidatos = evaluar(np.broadcast_to(rejilla[:, None, :], (len(rejilla), n_series, 3)))
+    mejor = candidatos[np.argmin(sse, axis=0), np.arange(n_series)]
+
+    desplazamientos = np.array(list(itertools.product([-1, 0, 1], repeat=3))) * PASO_REFINAMIENTO
+    vecinos = np.clip(mejor[None, :, :] + desplazamientos[:, None, :], [0.01, 0.0, 0.0], [0.99, 0.99, 0.99])
+    sse_vecinos, _ = evaluar(vecinos)
+    return vecinos[np.argmin(sse_vecinos, axis=0), np.arange(n_series)]
+
+
+def pronosticar(matriz, inicio, fin, parametros, horizonte=HORIZONTE):
+    """
+    Pronóstico e intervalos para los meses fin .. fin + horizonte - 1.
+    Varianza a h pasos: σ² (1 + Σ_{j<h} c_j²), c_j = α (1 + j β) + γ [j múltiplo de PERIODO].
+    Devuelve (pronostico [serie, h], {nivel: (inferior, superior)}, rmse)
+    """
+    alfa, beta, gamma = (parametros[None, :, i] for i in range(3))
+    nivel, tendencia, estacional, sse, n = filtrar(matriz, inicio, fin, alfa, beta, gamma)
+    nivel, tendencia, estacional, sse = nivel[0], tendencia[0], estacional[:, 0], sse[0]
+
+    h = np.arange(1, horizonte + 1)
+    meses = (fin + h - 1) % PERIODO
+    pronostico = nivel[:, None] + h[None, :] * tendencia[:, None] + estacional[meses].T
+
+    sigma2 = sse / np.maximum(n - 3, 1)
+    j = np.arange(1, horizonte)
+    c = parametros[:, 0:1] * (1 + j[None, :] * parametros[:, 1:2]) \
+        + parametros[:, 2:3] * (j[None, :] % PERIODO == 0)
+    varianza = sigma2[:, None] * (1 + np.concatenate([np.zeros((len(c), 1)), np.cumsum(c * c, axis=1)], axis=1))
+    intervalos = {
+        nivel_confianza: (np.maximum(pronostico - z * np.sqrt(varianza), 0), pronostico + z * np.sqrt(varianza))
+        for nivel_confianza, z in NIVELES.items()
+    }
+    # Las series son conteos: ni el pronóstico ni los límites inferiores bajan de cero
+    return np.maximum(pronostico, 0), intervalos, np.sqrt(sse / np.maximum(n, 1))
+
+
+def ajustar_y_pronosticar(matriz, fin, horizonte=HORIZONTE):
+    """Ajuste completo; solo series con dos temporadas antes de fin. Devuelve (ajustables, parametros, resultado)"""
+    inicio = inicio_de_series(matriz)
+    ajustables = inicio + 2 * PERIODO <= fin
+    sub, inicio = matriz[ajustables], inicio[ajustables]
+    parametros = buscar_parametros(sub, inicio, fin)
+    return ajustables, parametros, pronosticar(sub, inicio, fin, parametros, horizonte)
+
+
+def tabla_pronosticos(cubo, etiquetas, fin, parametros, pronostico, intervalos, rmse):
+    """Formato largo: una fila por serie × mes pronosticado"""
+    horizonte = pronostico.shape[1]
+    meses = [f'{cubo["anio_inicial"] + m // PERIODO:04d}-{m % PERIODO + 1:02d}' for m in range(fin, fin + horizonte)]
+    tabla = etiquetas.loc[etiquetas.index.repeat(horizonte)].reset_index(drop=True)
+    tabla['mes'] = np.tile(meses, len(etiquetas))
+    tabla['pronostico'] = pronostico.ravel().round(1)
+    for nivel_confianza, (inferior, superior) in intervalos.items():
+        tabla[f'inferior_{nivel_confianza}'] = inferior.ravel().round(1)
+        tabla[f'superior_{nivel_confianza}'] = superior.ravel().round(1)
+    for i, nombre in enumerate(['alpha', 'beta', 'gamma']):
+        tabla[nombre] = np.repeat(parametros[:, i], horizonte).round(3)
+    tabla['rmse'] = np.repeat(rmse, horizonte).round(2)
+    return tabla, meses
+
+
+def mapa_pronosticos(tabla, meses):
+    """valores[corte][periodo][clave] con cortes 'CONCEPTO | TIPO', como data/mapas/"""
+    cortes = tabla['CONCEPTO'] + ' | ' + tabla['TIPO']
+    codigos_corte, unicos = pd.factorize(cortes)
+    valores = np.full((len(unicos), len(meses), N_CLAVES), np.nan)
+    periodo = tabla['mes'].map({m: i for i, m in enumerate(meses)}).to_numpy()
+    valores[codigos_corte, periodo, tabla['clave_entidad'].to_numpy()] = tabla['pronostico'].to_numpy()
+    return {
+        'fuente': PRONOSTICOS_FILE.name,
+        'dimensiones': ['CONCEPTO', 'TIPO'],
+        'cortes': list(unicos),
+        'periodos': meses,
+        'valores': np.where(np.isnan(valores), None, valores).tolist(),
+    }
+
+
+def generar_pronosticos(horizonte=HORIZONTE):
+    """Ajusta Holt-Winters a todas las series y guarda los pronósticos del siguiente trimestre"""
+
+    try:
+        print("🔄 Pronosticando el siguiente trimestre de todas las series de incidencia...")
+
+        cubo = cargar_cubo()
+        matriz, claves, codigos_delito = series_del_cubo(cubo)
+        fin = int(np.flatnonzero(meses_publicados(cubo))[-1]) + 1
+
+        inicio_reloj = time.perf_counter()
+        ajustables, parametros, (pronostico, intervalos, rmse) = ajustar_y_pronosticar(matriz, fin, horizonte)
+        duracion = time.perf_counter() - inicio_reloj
+        print(f"⏱️  {ajustables.sum()} series ajustadas en {duracion:.2f} s "
+              f"({len(matriz) - ajustables.sum()} con menos de dos temporadas se omiten)")
+
+        etiquetas = etiquetas_series(cubo, claves[ajustables], codigos_delito[ajustables])
+        tabla, meses = tabla_pronosticos(cubo, etiquetas, fin, parametros, pronostico, intervalos, rmse)
+        tabla.to_csv(PRONOSTICOS_FILE, index=False, encoding='utf-8')
+        print(f"💾 Pronósticos guardados en: {PRONOSTICOS_FILE} ({len(tabla)} filas, {meses[0]} - {meses[-1]})")
+
+        MAPA_PRONOSTICOS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(MAPA_PRONOSTICOS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(mapa_pronosticos(tabla, meses), f, ensure_ascii=False, separators=(',', ':'))
+        print(f"💾 Arreglos para mapas en: {MAPA_PRONOSTICOS_FILE}")
+
+        print(f"\n📊 TOTAL NACIONAL PRONOSTICADO:")
+        for mes, total in tabla.groupby('mes')['pronostico'].sum().items():
+            print(f"   • {mes}: {total:,.0f} delitos")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error generando pronósticos: {e}")
+        return False
+
+
+def benchmark_pronosticos(n_series=5_000, n_anios=14, n_statsmodels=20):
+    """
+    Mide el ajuste vectorizado sobre n_series series sintéticas y, si statsmodels está instalado,
+    lo compara con un ciclo de ExponentialSmoothing serie por serie (extrapolado a n_series)
+    """
+    rng = np.random.default_rng(0)
+    meses = np.arange(n_anios * PERIODO)
+    niveles = rng.lognormal(2, 1.5, (n_series, 1))
+    estacion = 1 + 0.2 * np.sin(2 * np.pi * meses / PERIODO)[None, :]
+    matriz = rng.poisson(niveles * estacion).astype(float)
+
+    inicio = time.perf_counter()
+    ajustar_y_pronosticar(matriz, matriz.shape[1])
+    vectorizado = time.perf_counter() - inicio
+    print(f"⏱️  Holt-Winters vectorizado, {n_series:,} series × {matriz.shape[1]} meses: {vectorizado:.2f} s")
+
+    try:
+        from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    except ImportError:
+        print("⚠️  statsmodels no está instalado; se omite la comparación serie por serie")
+        return vectorizado
+
+    inicio = time.perf_counter()
+    for serie in matriz[:n_statsmodels]:
+        ExponentialSmoothing(serie, trend='add', seasonal='add', seasonal_periods=PERIODO).fit().forecast(HORIZONTE)
+    por_serie = (time.perf_counter() - inicio) / n_statsmodels
+    print(f"⏱️  statsmodels serie por serie: {por_serie * 1000:.0f} ms/serie → "
+          f"~{por_serie * n_series:.0f} s para {n_series:,} series ({por_serie * n_series / vectorizado:.0f}×)")
+    return vectorizado
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_pronosticos()
+    else:
+        if not generar_pronosticos():
+            sys.exit(1)
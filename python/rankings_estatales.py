@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para calcular la dinámica de los rankings estatales
+Para cada mes × CONCEPTO × TIPO (más el total 'TODOS' de cada concepto) ordena las 32 entidades
+completas con un solo lexsort sobre el cubo mensual y deriva:
+  - rangos int8 [corte, mes, entidad] (1 = más casos; 0 = sin dato)
+  - cambio de rango contra el mes anterior (positivo = sube)
+  - entradas y salidas del top 10 y rachas consecutivas dentro del top 10
+Los empates se resuelven por clave INEGI. Solo cuentan para el top 10 las entidades con casos.
+Salidas: data/rankings_estatales.npz y data/rankings_estatales_ultimo_mes.json
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+
+from entidades import ENTIDADES, nombre_entidad
+from cubo_ideff import cargar_cubo, meses_publicados
+
+RANKINGS_FILE = Path('data/rankings_estatales.npz')
+ULTIMO_MES_FILE = Path('data/rankings_estatales_ultimo_mes.json')
+
+TOP = 10
+TODOS = 'TODOS'
+CLAVES = np.array(sorted(ENTIDADES))  # 1-32; 'Extranjero' no entra al ranking
+
+
+def cortes_de_ranking(cubo):
+    """
+    Valores [corte, mes, entidad] para cada (CONCEPTO, TIPO) y el total de cada concepto.
+    Devuelve (valores, cortes) con cortes como lista de (CONCEPTO, TIPO).
+    """
+    valores = cubo['valores'][CLAVES]  # [entidad, delito, mes]
+    conceptos, codigos_concepto = np.unique([d[1] for d in cubo['delitos']], return_inverse=True)
+    # Total por concepto: NaN solo si ningún tipo del concepto tiene dato
+    indicador = (codigos_concepto[None, :] == np.arange(len(conceptos))[:, None]).astype(float)
+    totales = np.einsum('cd,edm->cme', indicador, np.nan_to_num(valores))
+    con_dato = np.einsum('cd,edm->cme', indicador, (~np.isnan(valores)).astype(float)) > 0
+    totales[~con_dato] = np.nan
+
+    cortes = [(d[1], d[2]) for d in cubo['delitos']] + [(c, TODOS) for c in conceptos]
+    return np.concatenate([valores.transpose(1, 2, 0), totales]), cortes
+
+
+def rangos_lexsort(valores):
+    """
+    Rangos completos [corte, mes, entidad] con un solo lexsort sobre todo el cubo:
+    llaves (corte, mes, -valor, clave); cada grupo corte × mes ocupa n_entidades posiciones
+    consecutivas, así que el rango es la posición dentro del grupo.
+    """
+    n_cortes, n_meses, n_entidades = valores.shape
+    corte, mes, entidad = np.indices(valores.shape).reshape(3, -1)
+    # -NaN queda al final de su grupo
+    orden = np.lexsort((entidad, -valores.ravel(), mes, corte))
+    rangos = np.empty(valores.size, dtype=np.int8)
+    rangos[orden] = np.arange(valores.size) % n_entidades + 1
+    rangos = rangos.reshape(valores.shape)
+    rangos[np.isnan(valores)] = 0
+    return rangos
+
+
+def dinamica(valores, rangos, top=TOP):
+    """Cambios de rango, pertenencia al top, entradas, salidas y rachas [corte, mes, entidad]"""
+    anterior = np.concatenate([np.zeros_like(rangos[:, :1]), rangos[:, :-1]], axis=1)
+    con_ambos = (rangos > 0) & (anterior > 0)
+    delta = np.where(con_ambos, anterior - rangos, 0).astype(np.int8)
+
+    en_top = (rangos > 0) & (rangos <= top) & (np.nan_to_num(valores) > 0)
+    top_anterior = np.concatenate([np.zeros_like(en_top[:, :1]), en_top[:, :-1]], axis=1)
+    # Entradas y salidas solo entre dos meses con dato en el corte
+    publicado = (rangos > 0).any(axis=2, keepdims=True)
+    anterior_publicado = np.concatenate([np.zeros_like(publicado[:, :1]), publicado[:, :-1]], axis=1)
+    entra = en_top & ~top_anterior & anterior_publicado
+    sale = ~en_top & top_anterior & publicado
+
+    # Racha: meses desde la última vez que la entidad no estuvo en el top
+    t = np.arange(rangos.shape[1])[None, :, None]
+    ultima_ausencia = np.maximum.accumulate(np.where(en_top, -1, t), axis=1)
+    racha = np.where(en_top, t - ultima_ausencia, 0).astype(np.int16)
+    return delta, en_top, entra, sale, racha
+
+
+def construir_rankings(cubo):
+    valores, cortes = cortes_de_ranking(cubo)
+    publicados = meses_publicados(cubo)
+    valores = valores[:, publicados]
+    meses = [m for m, p in zip(cubo['meses'], publicados) if p]
+    rangos = rangos_lexsort(valores)
+    delta, en_top, entra, sale, racha = dinamica(valores, rangos)
+    return {
+        'valores': valores, 'rangos': rangos, 'delta': delta, 'en_top': en_top,
+        'entra': entra, 'sale': sale, 'racha': racha,
+        'cortes': cortes, 'meses': meses, 'claves': CLAVES,
+    }
+
+
+def guardar_rankings(rankings, archivo=RANKINGS_FILE):
+    np.savez_compressed(
+        archivo,
+        valores=rankings['valores'], rangos=rankings['rangos'], delta=rankings['delta'],
+        en_top=rankings['en_top'], entra=rankings['entra'], sale=rankings['sale'], racha=rankings['racha'],
+        conceptos=np.array([c for c, _ in rankings['cortes']]), tipos=np.array([t for _, t in rankings['cortes']]),
+        meses=np.array(rankings['meses']), claves=rankings['claves'],
+    )
+
+
+def cargar_rankings(archivo=RANKINGS_FILE):
+    with np.load(archivo) as datos:
+        rankings = {k: datos[k] for k in ['valores', 'rangos', 'delta', 'en_top', 'entra', 'sale', 'racha', 'claves']}
+        rankings['cortes'] = list(zip(datos['conceptos'].tolist(), datos['tipos'].tolist()))
+        rankings['meses'] = datos['meses'].tolist()
+    return rankings
+
+
+def top_del_mes(rankings, c, m, top=TOP):
+    """Top del corte c en el mes m con cambio de rango, racha y si es entrada; más las salidas"""
+    claves = rankings['claves']
+    orden = np.argsort(rankings['rangos'][c, m])
+    lista = [
+        {
+            'clave_entidad': int(claves[e]),
+            'entidad': nombre_entidad(claves[e]),
+            'rango': int(rankings['rangos'][c, m, e]),
+            'casos': int(rankings['valores'][c, m, e]),
+            'cambio': int(rankings['delta'][c, m, e]),
+            'racha': int(rankings['racha'][c, m, e]),
+            'nueva': bool(rankings['entra'][c, m, e]),
+        }
+        for e in orden if rankings['en_top'][c, m, e]
+    ][:top]
+    salidas = [nombre_entidad(claves[e]) for e in np.flatnonzero(rankings['sale'][c, m])]
+    return {'top': lista, 'salen': salidas}
+
+
+def calcular_rankings_estatales():
+    """Calcula los rankings completos de todas las entidades y su dinámica mes a mes"""
+
+    try:
+        print("🔄 Calculando rankings estatales por mes, concepto y tipo...")
+
+        rankings = construir_rankings(cargar_cubo())
+        n_cortes, n_meses, n_entidades = rankings['rangos'].shape
+        print(f"✅ Rangos: {n_cortes} cortes × {n_meses} meses × {n_entidades} entidades "
+              f"({rankings['meses'][0]} - {rankings['meses'][-1]})")
+
+        guardar_rankings(rankings)
+        print(f"💾 Rankings guardados en: {RANKINGS_FILE}")
+
+        m = n_meses - 1
+        ultimo = {
+            'mes': rankings['meses'][m],
+            'mes_anterior': rankings['meses'][m - 1],
+            'rankings': {},
+        }
+        for c, (concepto, tipo) in enumerate(rankings['cortes']):
+            ultimo['rankings'].setdefault(concepto, {})[tipo] = top_del_mes(rankings, c, m)
+        with open(ULTIMO_MES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(ultimo, f, ensure_ascii=False, indent=2)
+        print(f"💾 Top {TOP} del último mes con movimientos en: {ULTIMO_MES_FILE}")
+
+        print(f"\n📊 MOVIMIENTOS {rankings['meses'][m - 1]} → {rankings['meses'][m]}:")
+        for c, (concepto, tipo) in enumerate(rankings['cortes']):
+            if tipo != TODOS:
+                continue
+            resumen = top_del_mes(rankings, c, m)
+            nuevas = [e['entidad'] for e in resumen['top'] if e['nueva']]
+            print(f"   • {concepto}: entran {', '.join(nuevas) or '-'}; salen {', '.join(resumen['salen']) or '-'}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error calculando rankings: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if not calcular_rankings_estatales():
+        exit(1)
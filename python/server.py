@@ -6,22 +6,124 @@ Run this script to serve your HTML template on localhost
 """
 
 import http.server
+import json
 import socketserver
 import webbrowser
 import os
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 
-def run_server(port=8000):
-    """Run a simple HTTP server on the specified port"""
+from indice_busqueda_detenidos import cargar_indice
+from latencia_detenciones import cargar_cache, resumen_rango
+from cache_agregaciones import CACHE, suma_agrupada
+
+BUSQUEDA_LIMITE_MAXIMO = 100
+AGREGADO_FUENTE = Path('data/IDEFF_processed.csv')
+AGREGADO_MESES = ['ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO', 'JULIO',
+                  'AGOSTO', 'SEPTIEMBRE', 'OCTUBRE', 'NOVIEMBRE', 'DICIEMBRE']
+AGREGADO_DIMENSIONES = {'AÑO', 'ENTIDAD', 'LEY', 'CONCEPTO', 'TIPO'}
+
+
+class ApiHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler plus JSON endpoints under /api/"""
+
+    # Search index over detainee narrative fields, loaded once at startup
+    indice_detenidos = None
+    # Date arrays for arrest-to-announcement latency, loaded once at startup
+    cache_latencia = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/api/buscar':
+            self.handle_search(parse_qs(url.query))
+        elif url.path == '/api/latencia':
+            self.handle_latency(parse_qs(url.query))
+        elif url.path == '/api/agregado':
+            self.handle_aggregate(parse_qs(url.query))
+        elif url.path == '/api/cache':
+            self.send_json(CACHE.resumen())
+        else:
+            super().do_GET()
+
+    def handle_search(self, params):
+        """GET /api/buscar?q=fentanilo+Culiacán&limite=20 (limite clamped to 1..BUSQUEDA_LIMITE_MAXIMO)"""
+        consulta = params.get('q', [''])[0]
+        try:
+            limite = int(params.get('limite', ['20'])[0])
+        except ValueError:
+            limite = 20
+        limite = min(max(limite, 1), BUSQUEDA_LIMITE_MAXIMO)
+        resultados = self.indice_detenidos.buscar(consulta, limite=limite)
+        self.send_json({
+            'consulta': consulta,
+            'total': len(resultados),
+            'resultados': [dict(doc, score=score) for score, doc in resultados],
+        })
+
+    def handle_latency(self, params):
+        """GET /api/latencia?desde=2025-01-01&hasta=2025-03-31 (both optional)"""
+        desde = params.get('desde', [None])[0]
+        hasta = params.get('hasta', [None])[0]
+        try:
+            resumen = resumen_rango(self.cache_latencia, desde, hasta)
+        except ValueError:
+            self.send_json({'error': 'Dates must be YYYY-MM-DD'}, status=400)
+            return
+        self.send_json(resumen)
+
+    def handle_aggregate(self, params):
+        """GET /api/agregado?dims=CONCEPTO,AÑO&meses=7&desde=2019&hasta=2025 (cached group-by sums)"""
+        dimensiones = [d for d in params.get('dims', ['CONCEPTO,AÑO'])[0].split(',') if d]
+        if not dimensiones or not set(dimensiones) <= AGREGADO_DIMENSIONES:
+            self.send_json({'error': f'dims must be a subset of {sorted(AGREGADO_DIMENSIONES)}'}, status=400)
+            return
+        try:
+            n_meses = int(params.get('meses', ['12'])[0])
+            filtros = [('AÑO', operador, int(params[nombre][0]))
+                       for nombre, operador in [('desde', '>='), ('hasta', '<=')] if nombre in params]
+        except ValueError:
+            self.send_json({'error': 'meses, desde and hasta must be integers'}, status=400)
+            return
+        if not 1 <= n_meses <= len(AGREGADO_MESES):
+            self.send_json({'error': 'meses must be between 1 and 12'}, status=400)
+            return
+        meses = AGREGADO_MESES[:n_meses]
+        try:
+            resultado = suma_agrupada(AGREGADO_FUENTE, dimensiones, meses, filtros=filtros)
+        except FileNotFoundError:
+            self.send_json({'error': f'{AGREGADO_FUENTE} not found; run process_database.py'}, status=404)
+            return
+        self.send_json({
+            'dimensiones': dimensiones,
+            'meses': meses,
+            'filas': resultado.to_dict('records'),
+        })
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run_server(port=8000, root=None):
+    """Run a simple HTTP server on the specified port, serving `root` (the project root by default)"""
     
-    # Get the current directory
-    current_dir = Path(__file__).parent.absolute()
+    # Serve from the project root so index.html and data/ are reachable
+    current_dir = Path(root or Path(__file__).parent.parent).absolute()
     
-    # Change to the current directory
+    # Change to the project root
     os.chdir(current_dir)
     
+    # Load the search index once (rebuilt if the detainee CSV changed)
+    ApiHandler.indice_detenidos = cargar_indice()
+    print(f"🔎 Search index loaded: {len(ApiHandler.indice_detenidos.documentos)} documents")
+    ApiHandler.cache_latencia = cargar_cache()
+    
     # Create HTTP server
-    Handler = http.server.SimpleHTTPRequestHandler
+    Handler = ApiHandler
     
     with socketserver.TCPServer(("", port), Handler) as httpd:
         print(f"🚀 Server running at http://localhost:{port}")
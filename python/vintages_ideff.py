@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén de versiones (vintages) mensuales de IDEFF para estudiar revisiones
+Cada publicación se lleva al cubo de cubo_ideff.py y se parte en bloques (año, entidad)
+de forma [delito, 12]. Cada bloque se identifica por el hash de su contenido y se guarda
+una sola vez, así que entre publicaciones solo ocupan espacio los bloques que cambiaron
+(el año en curso y los años revisados):
+  - data/vintages/bloques.bin: bloques float32 únicos, uno tras otro (los conteos caben exactos)
+  - data/vintages/indice_bloques.json: hash → (posición, filas) dentro de bloques.bin
+  - data/vintages/manifiestos/<vintage>.json: delitos, meses y hash de cada (año, entidad)
+Un vintage se abre como un cubo perezoso que lee con memmap solo los bloques que se piden;
+los bloques repetidos entre vintages se leen una sola vez.
+"""
+
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import numpy as np
+from pathlib import Path
+
+from entidades import N_CLAVES, nombre_entidad
+from cubo_ideff import IDEFF_ORIGINAL, cargar_cubo, meses_publicados
+
+VINTAGES_DIR = Path('data/vintages')
+TIPO_BLOQUE = np.float32
+
+
+def _hash_bloque(bloque):
+    encabezado = f'{bloque.dtype.str}{bloque.shape}'.encode('utf-8')
+    return hashlib.blake2b(encabezado + bloque.tobytes(), digest_size=16).hexdigest()
+
+
+def _escribir_json(archivo, datos):
+    temporal = archivo.with_suffix('.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False)
+    temporal.replace(archivo)
+
+
+def nombre_de_archivo(archivo):
+    """'data/IDEFF_jul25.csv' → 'jul25'"""
+    return Path(archivo).stem.removeprefix('IDEFF_')
+
+
+class CuboVintage:
+    """Cubo de un vintage que se arma bajo demanda a partir de sus bloques (año, entidad)"""
+
+    def __init__(self, almacen, manifiesto):
+        self.almacen = almacen
+        self.nombre = manifiesto['nombre']
+        self.corte = manifiesto['corte']
+        self.delitos = [tuple(d) for d in manifiesto['delitos']]
+        self.anio_inicial = manifiesto['anio_inicial']
+        self.meses = manifiesto['meses']
+        self.hashes = manifiesto['bloques']  # {año: [hash o None por clave]}
+
+    def bloque(self, anio, clave):
+        """[delito, 12] del año y la entidad (NaN si el vintage no tiene datos)"""
+        llave = self.hashes.get(str(anio), [None] * N_CLAVES)[clave]
+        if llave is None:
+            return np.full((len(self.delitos), 12), np.nan, dtype=TIPO_BLOQUE)
+        return self.almacen.leer_bloque(llave)
+
+    def serie(self, clave, delito):
+        """Serie mensual [mes] de una entidad y un delito, leyendo un bloque por año"""
+        n_anios = len(self.meses) // 12
+        return np.concatenate([self.bloque(self.anio_inicial + a, clave)[delito]
+                               for a in range(n_anios)]).astype(float)
+
+    def valores(self):
+        """Arreglo completo [N_CLAVES, delito, mes] float (lee todos los bloques)"""
+        n_anios = len(self.meses) // 12
+        valores = np.empty((N_CLAVES, len(self.delitos), n_anios, 12))
+        for a in range(n_anios):
+            for clave in range(N_CLAVES):
+                valores[clave, :, a] = self.bloque(self.anio_inicial + a, clave)
+        return valores.reshape(N_CLAVES, len(self.delitos), n_anios * 12)
+
+    def cubo(self):
+        """Mismo formato que cubo_ideff.cargar_cubo"""
+        return {'valores': self.valores(), 'delitos': self.delitos,
+                'anio_inicial': self.anio_inicial, 'meses': self.meses}
+
+
+class AlmacenVintages:
+    """Bloques únicos en un solo archivo más un manifiesto por vintage"""
+
+    def __init__(self, directorio=VINTAGES_DIR):
+        self.directorio = Path(directorio)
+        self.archivo_bloques = self.directorio / 'bloques.bin'
+        self.archivo_indice = self.directorio / 'indice_bloques.json'
+        self.dir_manifiestos = self.directorio / 'manifiestos'
+        self.indice = {}
+        if self.archivo_indice.exists():
+            with open(self.archivo_indice, encoding='utf-8') as f:
+                self.indice = json.load(f)
+        self._mapa = None
+        self._leidos = {}  # hash → bloque ya leído (compartido entre vintages)
+
+    # ---- Escritura ----
+
+    def agregar_cubo(self, nombre, cubo):
+        """Guarda el vintage `nombre`; devuelve (bloques nuevos, bloques reutilizados)"""
+        valores = cubo['valores']
+        n_anios = valores.shape[2] // 12
+        anual = valores.reshape(N_CLAVES, len(cubo['delitos']), n_anios, 12)
+        publicados = np.flatnonzero(meses_publicados(cubo))
+
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.dir_manifiestos.mkdir(exist_ok=True)
+        bloques, nuevos, reutilizados = {}, 0, 0
+        with open(self.archivo_bloques, 'ab') as salida:
+            posicion = salida.tell() // np.dtype(TIPO_BLOQUE).itemsize
+            for a in range(n_anios):
+                hashes = []
+                for clave in range(N_CLAVES):
+                    bloque = np.ascontiguousarray(anual[clave, :, a], dtype=TIPO_BLOQUE)
+                    if np.isnan(bloque).all():
+                        hashes.append(None)
+                        continue
+                    llave = _hash_bloque(bloque)
+                    if llave in self.indice:
+                        reutilizados += 1
+                    else:
+                        salida.write(bloque.tobytes())
+                        self.indice[llave] = [posicion, bloque.shape[0]]
+                        posicion += bloque.size
+                        nuevos += 1
+                    hashes.append(llave)
+                bloques[str(cubo['anio_inicial'] + a)] = hashes
+
+        # Primero el índice y después el manifiesto: un vintage nunca apunta a bloques sin índice
+        _escribir_json(self.archivo_indice, self.indice)
+        _escribir_json(self.dir_manifiestos / f'{nombre}.json', {
+            'nombre': nombre,
+            'corte': cubo['meses'][publicados[-1]] if len(publicados) else None,
+            'delitos': cubo['delitos'],
+            'anio_inicial': cubo['anio_inicial'],
+            'meses': cubo['meses'],
+            'bloques': bloques,
+        })
+        self._mapa = None
+        return nuevos, reutilizados
+
+    def agregar(self, archivo, nombre=None):
+        return self.agregar_cubo(nombre or nombre_de_archivo(archivo), cargar_cubo(archivo))
+
+    # ---- Lectura ----
+
+    def leer_bloque(self, llave):
+        if llave not in self._leidos:
+            if self._mapa is None:
+                self._mapa = np.memmap(self.archivo_bloques, dtype=TIPO_BLOQUE, mode='r')
+            posicion, filas = self.indice[llave]
+            self._leidos[llave] = self._mapa[posicion:posicion + filas * 12].reshape(filas, 12)
+        return self._leidos[llave]
+
+    def manifiestos(self):
+        """Manifiestos de todos los vintages, ordenados por mes de corte"""
+        if not self.dir_manifiestos.exists():
+            return []
+        lista = []
+        for archivo in self.dir_manifiestos.glob('*.json'):
+            with open(archivo, encoding='utf-8') as f:
+                lista.append(json.load(f))
+        return sorted(lista, key=lambda m: (m['corte'] or '', m['nombre']))
+
+    def abrir(self, nombre):
+        with open(self.dir_manifiestos / f'{nombre}.json', encoding='utf-8') as f:
+            return CuboVintage(self, json.load(f))
+
+    def al_corte(self, corte):
+        """El vintage más reciente publicado hasta `corte` ('YYYY-MM'): la base tal como se conocía entonces"""
+        anteriores = [m for m in self.manifiestos() if m['corte'] and m['corte'] <= corte]
+        if not anteriores:
+            raise KeyError(f'no hay vintages con corte hasta {corte}')
+        return CuboVintage(self, anteriores[-1])
+
+    def revisiones(self, clave, delito):
+        """
+        Valores de una serie en cada vintage: (nombres, meses, matriz [vintage, mes]).
+        delito es (LEY, CONCEPTO, TIPO); NaN donde el vintage no lo tenía publicado.
+        """
+        vintages = [CuboVintage(self, m) for m in self.manifiestos()]
+        vintages = [v for v in vintages if delito in v.delitos]
+        if not vintages:
+            return [], [], np.empty((0, 0))
+        anio_inicial = min(v.anio_inicial for v in vintages)
+        anio_final = max(v.anio_inicial + len(v.meses) // 12 - 1 for v in vintages)
+        meses = [f'{anio_inicial + m // 12:04d}-{m % 12 + 1:02d}' for m in range((anio_final - anio_inicial + 1) * 12)]
+        matriz = np.full((len(vintages), len(meses)), np.nan)
+        for i, vintage in enumerate(vintages):
+            desde = (vintage.anio_inicial - anio_inicial) * 12
+            serie = vintage.serie(clave, vintage.delitos.index(delito))
+            matriz[i, desde:desde + len(serie)] = serie
+        return [v.nombre for v in vintages], meses, matriz
+
+    def comparar(self, anterior, nuevo):
+        """
+        Celdas que cambian entre dos vintages: lista de (año, clave, delito, mes, antes, después).
+        Solo se leen los bloques cuyo hash difiere; los delitos se comparan por nombre.
+        """
+        a, b = self.abrir(anterior), self.abrir(nuevo)
+        filas_a = {d: i for i, d in enumerate(a.delitos)}
+        cambios = []
+        for anio in sorted(set(a.hashes) | set(b.hashes), key=int):
+            for clave in range(N_CLAVES):
+                if a.hashes.get(anio, [None] * N_CLAVES)[clave] == b.hashes.get(anio, [None] * N_CLAVES)[clave] \
+                        and a.delitos == b.delitos:
+                    continue
+                bloque_a, bloque_b = a.bloque(int(anio), clave), b.bloque(int(anio), clave)
+                for fila_b, delito in enumerate(b.delitos):
+                    antes = bloque_a[filas_a[delito]] if delito in filas_a else np.full(12, np.nan)
+                    despues = bloque_b[fila_b]
+                    distinto = (antes != despues) & ~(np.isnan(antes) & np.isnan(despues))
+                    for mes in np.flatnonzero(distinto):
+                        cambios.append((int(anio), clave, delito, int(mes) + 1, float(antes[mes]), float(despues[mes])))
+        return cambios
+
+    def tamano_en_disco(self):
+        return sum(a.stat().st_size for a in self.directorio.rglob('*') if a.is_file())
+
+
+# ---- Benchmark ----
+
+def vintages_simulados(cubo, n_vintages, revisados=0.02, semilla=0):
+    """
+    Publicaciones anteriores simuladas a partir del cubo: el vintage k corta k meses antes
+    y revisa al azar una fracción de los valores de sus últimos 3 meses
+    """
+    rng = np.random.default_rng(semilla)
+    publicados = np.flatnonzero(meses_publicados(cubo))
+    for k in reversed(range(n_vintages)):
+        ultimo = publicados[-1] - k
+        valores = cubo['valores'].copy()
+        valores[:, :, ultimo + 1:] = np.nan
+        recientes = valores[:, :, ultimo - 2:ultimo + 1]
+        cambia = (rng.random(recientes.shape) < revisados) & ~np.isnan(recientes)
+        recientes[cambia] += rng.integers(-3, 4, int(cambia.sum()))
+        np.maximum(recientes, 0, out=recientes, where=~np.isnan(recientes))
+        yield f'sim{n_vintages - k:03d}', dict(cubo, valores=valores)
+
+
+def benchmark_vintages(n_vintages=120):
+    """Espacio y tiempos del almacén con n_vintages publicaciones simuladas"""
+    cubo = cargar_cubo()
+    print(f"⏱️  Almacén de vintages con {n_vintages} publicaciones simuladas")
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = AlmacenVintages(directorio)
+        inicio = time.perf_counter()
+        nuevos = reutilizados = 0
+        for nombre, simulado in vintages_simulados(cubo, n_vintages):
+            n, r = almacen.agregar_cubo(nombre, simulado)
+            nuevos, reutilizados = nuevos + n, reutilizados + r
+        t_agregar = time.perf_counter() - inicio
+
+        csv = IDEFF_ORIGINAL.stat().st_size * n_vintages
+        crudo = cubo['valores'].astype(TIPO_BLOQUE).nbytes * n_vintages
+        print(f"   • {nuevos:,} bloques guardados, {reutilizados:,} reutilizados ({t_agregar:.2f} s)")
+        print(f"   • disco: {almacen.tamano_en_disco() / 1024 ** 2:.1f} MB contra {csv / 1024 ** 2:.0f} MB de CSV "
+              f"y {crudo / 1024 ** 2:.0f} MB de cubos completos")
+
+        delito = cubo['delitos'][0]
+        almacen = AlmacenVintages(directorio)  # sin bloques leídos
+        inicio = time.perf_counter()
+        nombres, meses, matriz = almacen.revisiones(9, delito)
+        t_revisiones = time.perf_counter() - inicio
+        print(f"   • revisiones de una serie en {len(nombres)} vintages: {t_revisiones * 1000:.1f} ms "
+              f"({len(almacen._leidos)} bloques distintos leídos)")
+
+        corte = almacen.manifiestos()[n_vintages // 2]['corte']
+        inicio = time.perf_counter()
+        almacen.al_corte(corte).valores()
+        print(f"   • cubo completo al corte {corte}: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+
+def guardar_vintage(archivos):
+    """Agrega cada archivo IDEFF al almacén y resume las revisiones del último contra el anterior"""
+
+    try:
+        almacen = AlmacenVintages()
+        for archivo in archivos:
+            print(f"🔄 Agregando {archivo} al almacén de vintages...")
+            nuevos, reutilizados = almacen.agregar(archivo)
+            print(f"✅ {nombre_de_archivo(archivo)}: {nuevos} bloques nuevos, {reutilizados} reutilizados")
+
+        manifiestos = almacen.manifiestos()
+        print(f"💾 {len(manifiestos)} vintages en {VINTAGES_DIR} "
+              f"({almacen.tamano_en_disco() / 1024 ** 2:.1f} MB)")
+        for manifiesto in manifiestos:
+            print(f"   • {manifiesto['nombre']}: corte {manifiesto['corte']}")
+
+        if len(manifiestos) >= 2:
+            anterior, ultimo = manifiestos[-2], manifiestos[-1]
+            cambiados = [
+                (anio, clave)
+                for anio, hashes in ultimo['bloques'].items()
+                for clave, llave in enumerate(hashes)
+                if llave != anterior['bloques'].get(anio, [None] * N_CLAVES)[clave]
+            ]
+            print(f"\n📊 BLOQUES DISTINTOS {anterior['nombre']} → {ultimo['nombre']}: {len(cambiados)}")
+            for anio, clave in cambiados[:10]:
+                print(f"   • {anio} {nombre_entidad(clave)}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error guardando vintages: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if '--bench' in sys.argv:
+        benchmark_vintages()
+    else:
+        if not guardar_vintage([a for a in sys.argv[1:] if not a.startswith('--')] or [IDEFF_ORIGINAL]):
+            sys.exit(1)